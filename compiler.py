@@ -4,6 +4,8 @@ from pathlib import Path
 import lib.grammar as gram
 import lib.assembly_map as asm
 import lib.gen_code as gen
+import lib.binary_ir as bir
+import lib.optimizer as opt
 
 X86_64_GAS_INTEL = 'x86-64-gas-Intel'
 
@@ -13,7 +15,7 @@ TARGETS_MAP = {
     X86_64_GAS_INTEL: lambda: asm.GasIntelX8664SystemVMap()
 }
 
-def doWork(target, source, destination):
+def doWork(target, source, destination, jobs=1, level=0):
     if target not in TARGETS_MAP:
         raise Exception('target architecture not found')
     
@@ -24,12 +26,23 @@ def doWork(target, source, destination):
     if (not sourcePath.exists()) or (not sourcePath.is_file()):
         raise Exception('invalid source file path')
     
-    codeText = ''
-    with open(source, 'r') as file:
-        lines = file.readlines()
-        codeText = '\n'.join(lines)
-    
-    code = gen.generateCodeLinesFromText(codeText, asmap)
+    if Path(destination).suffix == bir.BINARY_SUFFIX:
+        if sourcePath.suffix == bir.BINARY_SUFFIX:
+            raise Exception('source is already a binary module')
+
+        exps = opt.getOptimizedExpressions(gen.getFileExpressions(sourcePath, jobs), level, len(asmap.getRegistersToMap()))
+        bir.writeModule(destination, bir.getModule(exps))
+        return
+
+    if sourcePath.suffix == bir.BINARY_SUFFIX:
+        if level != 0:
+            raise Exception('binary modules are optimized when they are written')
+
+        code = gen.generateCodeLinesFromBinary(sourcePath, asmap)
+    elif jobs == 1:
+        code = gen.generateCodeLinesFromFile(sourcePath, asmap, level)
+    else:
+        code = gen.generateCodeLinesFromFileParallel(sourcePath, asmap, jobs, level)
 
     with open(destination, 'w') as file:
         for line in code:
@@ -38,8 +51,10 @@ def doWork(target, source, destination):
 def main():
     parg = arg.ArgumentParser(description='basic compiler options')
     parg.add_argument('-t', '--target', type=str, help='target architecture (' + ', '.join(TARGETS) + ')')
-    parg.add_argument('-s', '--source', type=str, help='source file')
-    parg.add_argument('-d', '--destination', type=str, help='destination file')
+    parg.add_argument('-s', '--source', type=str, help='source file (' + bir.BINARY_SUFFIX + ' for a binary module)')
+    parg.add_argument('-d', '--destination', type=str, help='destination file (' + bir.BINARY_SUFFIX + ' to write a binary module)')
+    parg.add_argument('-j', '--jobs', type=int, default=1, help='parser processes (0 for one per core)')
+    parg.add_argument('-O', '--optimize', type=int, default=0, help='optimization level (0 to ' + str(len(opt.OPTIMIZATION_LEVELS) - 1) + ', applied when a ' + bir.BINARY_SUFFIX + ' module is written, not when one is compiled)')
     parg.add_argument('-de', '--description', type=str, help='description ()')
 
     pargs = parg.parse_args()
@@ -75,7 +90,7 @@ def main():
         print('destination file must be specified')
     
     if target and source and destination:
-        doWork(target, source, destination)
+        doWork(target, source, destination, pargs.jobs, pargs.optimize)
     else:
         parg.print_help()
 
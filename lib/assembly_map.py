@@ -1,6 +1,64 @@
 import lib.grammar as gram
 import lib.lexer as lex
 
+#
+# constant operands
+#
+
+IMMEDIATE_MIN = -(1 << 31)
+IMMEDIATE_MAX = (1 << 31) - 1
+
+# lea adds a register to itself scaled by one of these
+LEA_SCALES = [2, 4, 8]
+
+def getImmediateValue(operand):
+    if gram.isHexInt(operand):
+        return int(operand, 16)
+
+    if gram.isInt(operand):
+        return int(operand)
+
+    return None
+
+def isImmediate(value):
+    return IMMEDIATE_MIN <= value <= IMMEDIATE_MAX
+
+def getPowerOfTwo(value):
+    if value < 1 or (value & (value - 1)) != 0:
+        return None
+
+    return value.bit_length() - 1
+
+# the signed magic number and shift of a 64 bit division by a constant above one, from
+# Hacker's Delight, with the magic number given as the signed value imul reads
+def getSignedMagic(divisor):
+    top = 1 << 63
+    anc = top - 1 - top % divisor
+    p = 63
+    q1, r1 = divmod(top, anc)
+    q2, r2 = divmod(top, divisor)
+
+    while True:
+        p += 1
+        q1, r1 = 2 * q1, 2 * r1
+        if r1 >= anc:
+            q1, r1 = q1 + 1, r1 - anc
+
+        q2, r2 = 2 * q2, 2 * r2
+        if r2 >= divisor:
+            q2, r2 = q2 + 1, r2 - divisor
+
+        delta = divisor - r2
+        if not (q1 < delta or (q1 == delta and r1 == 0)):
+            break
+
+    magic = q2 + 1
+
+    if magic >= top:
+        magic -= 1 << 64
+
+    return magic, p - 64
+
 #
 # default map with x86-64 ISA and Intel syntax
 #
@@ -139,6 +197,9 @@ class AssemblyMap():
     def emitCall(self, proName):
         return []
     
+    def emitTailCall(self, proName):
+        return []
+    
     def emitRet(self):
         return []
     
@@ -393,107 +454,156 @@ class GasIntelX8664SystemVMap(AssemblyMap):
         second = self.getBinOp(op) + ' ' + dest + ', ' + right
         return [first, second]
     
+    # multiplications by a constant become shifts and lea where they can, a constant
+    # that is a power of two, or one shifted from 3, 5 or 9
     def emitMulOp(self, dest, left, right):
+        factor = getImmediateValue(right)
+
+        if (factor is not None) and self.isReg(dest) and self.isReg(left) and isImmediate(factor):
+            return self.emitMulByConst(dest, left, factor)
+
         if dest == left:
             return ['imul ' + dest + ', ' + right]
         
         first = 'mov ' + dest + ', ' + left
         second = 'imul ' + dest + ', ' + right
         return [first, second]
-    
+
+    def emitMulByConst(self, dest, left, factor):
+        shift = getPowerOfTwo(factor)
+
+        if (shift is not None) and (shift > 0):
+            return self.emitCopy(dest, left) + ['shl ' + dest + ', ' + str(shift)]
+
+        for scale in LEA_SCALES:
+            shift = getPowerOfTwo(factor // (scale + 1)) if factor % (scale + 1) == 0 else None
+            if shift is not None:
+                code = ['lea ' + dest + ', [' + left + ' + ' + left + '*' + str(scale) + ']']
+                if shift > 0:
+                    code.append('shl ' + dest + ', ' + str(shift))
+                return code
+
+        return ['imul ' + dest + ', ' + left + ', ' + str(factor)]
+
     def emitDivOp(self, dest, left, right):
+        divisor = getImmediateValue(right)
+
+        if self.isReducibleDivision(dest, left, divisor):
+            if getPowerOfTwo(divisor) is not None:
+                return self.emitDivByPowerOfTwo(dest, left, getPowerOfTwo(divisor))
+            return self.emitDivByConst(dest, left, divisor, False)
+
+        return self.emitIdivOp(dest, left, right, 'rax')
+    
+    def emitModOp(self, dest, left, right):
+        divisor = getImmediateValue(right)
+
+        if self.isReducibleDivision(dest, left, divisor):
+            if getPowerOfTwo(divisor) is not None:
+                return self.emitModByPowerOfTwo(dest, left, getPowerOfTwo(divisor))
+            return self.emitDivByConst(dest, left, divisor, True)
+
+        return self.emitIdivOp(dest, left, right, 'rdx')
+
+    # cqo and idiv overwrite rax and rdx, so both are saved unless one is the destination,
+    # and a divisor held in one of them, or given as an immediate idiv cannot take, goes
+    # through r11
+    def emitIdivOp(self, dest, left, right, result):
         code = []
         pre = []
         post = []
+        saved = [r for r in ['rdx', 'rax'] if r != dest]
+
+        for r in saved:
+            pre.extend(self.emitPush(r))
+
+        ri = right
+
+        if (ri in ['rax', 'rdx']) or (getImmediateValue(ri) is not None):
+            ri = 'r11'
+            code.append('mov ' + ri + ', ' + right)
+            pre.extend(self.emitPush('r11'))
+            post.extend(self.emitPop('r11'))
+
+        for r in reversed(saved):
+            post.extend(self.emitPop(r))
+
+        code.append('mov rax, ' + left)
+        code.append('cqo')
+        code.append('idiv ' + ri)
+
+        if dest != result:
+            code.append('mov ' + dest + ', ' + result)
 
-        if dest == 'rdx':
-            pre.extend(self.emitPush('rax'))
-            post.extend(self.emitPop('rax'))
-
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + right)
-            code.append('mov rdx, rax')
-        elif dest == 'rax':
-            pre.extend(self.emitPush('rdx'))
-            post.extend(self.emitPop('rdx'))
-            
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + right)
-        else:
-            pre.extend(self.emitPush('rdx'))
-            pre.extend(self.emitPush('rax'))
-
-            ri = right
-            
-            if ri in ['rax', 'rdx']:
-                ri = 'r11'
-                code.append('mov ' + ri + ', ' + right)
-                pre.extend(self.emitPush('r11'))
-                post.extend(self.emitPop('r11'))
-
-            post.extend(self.emitPop('rax'))
-            post.extend(self.emitPop('rdx'))
-
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + ri)
-            code.append('mov ' + dest + ', rax')
-        
         return pre + code + post
-    
-    def emitModOp(self, dest, left, right):
-        code = []
+
+    # divisors that are trapping or too wide for an immediate are left to idiv
+    def isReducibleDivision(self, dest, left, divisor):
+        return (divisor is not None) and (divisor > 1) and isImmediate(divisor) and self.isReg(dest) and self.isReg(left)
+
+    # the quotient truncates towards zero, so a negative dividend is biased by the divisor
+    # less one before the arithmetic shift
+    def emitDivByPowerOfTwo(self, dest, left, shift):
+        bias = dest if dest != left else 'r11'
+        code = ['mov ' + bias + ', ' + left]
+
+        if shift > 1:
+            code.append('sar ' + bias + ', 63')
+
+        code.append('shr ' + bias + ', ' + str(64 - shift))
+        code.append('add ' + dest + ', ' + (left if bias == dest else bias))
+        code.append('sar ' + dest + ', ' + str(shift))
+        return code
+
+    def emitModByPowerOfTwo(self, dest, left, shift):
+        code = ['mov r11, ' + left]
+
+        if shift > 1:
+            code.append('sar r11, 63')
+
+        code.append('shr r11, ' + str(64 - shift))
+        code.append('add r11, ' + left)
+        code.append('and r11, ' + str(-(1 << shift)))
+        code.extend(self.emitCopy(dest, left))
+        code.append('sub ' + dest + ', r11')
+        return code
+
+    # the quotient is the high half of the dividend times a magic number, shifted and
+    # corrected by one for a negative dividend, and the remainder is taken back from it
+    def emitDivByConst(self, dest, left, divisor, isMod):
+        magic, shift = getSignedMagic(divisor)
         pre = []
         post = []
+        saved = [r for r in ['rdx', 'rax'] if r != dest]
 
-        if dest == 'rdx':
-            pre.extend(self.emitPush('rax'))
-            post.extend(self.emitPop('rax'))
-
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + right)
-        elif dest == 'rax':
-            pre.extend(self.emitPush('rdx'))
-            post.extend(self.emitPop('rdx'))
-            
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + right)
-            code.append('mov rax, rdx')
+        for r in saved:
+            pre.extend(self.emitPush(r))
+        for r in reversed(saved):
+            post.extend(self.emitPop(r))
+
+        code = ['mov r11, ' + left, 'mov rax, ' + str(magic), 'imul r11']
+
+        if magic < 0:
+            code.append('add rdx, r11')
+        if shift > 0:
+            code.append('sar rdx, ' + str(shift))
+
+        code.extend(['mov rax, r11', 'shr rax, 63', 'add rdx, rax'])
+
+        if isMod:
+            code.extend(['imul rdx, rdx, ' + str(divisor), 'sub r11, rdx'])
+            code.extend(self.emitCopy(dest, 'r11'))
         else:
-            pre.extend(self.emitPush('rdx'))
-            pre.extend(self.emitPush('rax'))
-
-            ri = right
-            
-            if ri in ['rax', 'rdx']:
-                ri = 'r11'
-                code.append('mov ' + ri + ', ' + right)
-                pre.extend(self.emitPush('r11'))
-                post.extend(self.emitPop('r11'))
-
-            post.extend(self.emitPop('rax'))
-            post.extend(self.emitPop('rdx'))
-
-            code.append('mov rax, ' + left)
-            code.append('xor rdx, rdx')
-            code.append('cqo')
-            code.append('idiv ' + ri)
-            code.append('mov ' + dest + ', rdx')
-        
+            code.extend(self.emitCopy(dest, 'rdx'))
+
         return pre + code + post
 
     def emitCall(self, proName):
         return ['call ' + proName]
     
+    def emitTailCall(self, proName):
+        return ['jmp ' + proName]
+    
     def emitRet(self):
         return ['ret']
     
@@ -0,0 +1,286 @@
+import mmap
+import struct
+import sys
+from array import array
+
+import lib.parser as par
+import lib.linear_ir as lir
+import lib.token_buffer as tb
+
+#
+# Binary Module
+#
+
+BINARY_SUFFIX = '.sirb'
+BINARY_MAGIC = b'SIRB'
+BINARY_VERSION = 2
+BINARY_ENCODING = 'utf-8'
+
+BYTE_ORDERS = {
+    'little': 0,
+    'big': 1
+}
+
+HEADER = struct.Struct('<4sHBBII')
+COUNT = struct.Struct('<I')
+FLAGS = struct.Struct('<BB')
+KIND = struct.Struct('<B')
+
+ARRAY_ALIGNMENT = 8
+
+class Module:
+    def __init__(self, memories, procedures, props):
+        self.memories = memories
+        self.procedures = procedures
+        self.props = props
+
+def getModule(exps):
+    memories = []
+    procedures = []
+
+    for exp in lir.getLinearExpressions(exps):
+        if exp.kind == par.EXP_KIND_PRO:
+            procedures.append(exp)
+        else:
+            memories.append(exp)
+
+    return Module(memories, procedures, par.getProcedureProperties(procedures))
+
+#
+# Writer Functions
+#
+
+def writeCount(out, count):
+    out.extend(COUNT.pack(count))
+
+def writeString(out, s):
+    data = s.encode(BINARY_ENCODING)
+    writeCount(out, len(data))
+    out.extend(data)
+
+def writeArray(out, values):
+    writeCount(out, len(values))
+
+    while len(out) % ARRAY_ALIGNMENT != 0:
+        out.append(0)
+
+    out.extend(values.tobytes())
+
+def writeNames(out, table):
+    writeCount(out, len(table))
+
+    for name in table.names[1:]:
+        writeString(out, name)
+
+def writeConsts(out, table):
+    writeCount(out, len(table))
+
+    for kind, value in table.names[1:]:
+        out.extend(KIND.pack(kind))
+        writeString(out, value)
+
+def writeProcedure(out, lpro):
+    writeString(out, lpro.name)
+    out.extend(FLAGS.pack(lpro.isLeaf, lpro.usesInt))
+    writeNames(out, lpro.vars)
+    writeNames(out, lpro.identifiers)
+    writeNames(out, lpro.labels)
+    writeConsts(out, lpro.consts)
+    writeArray(out, array('B', lpro.opcodes))
+
+    for values in [lpro.dests, lpro.lefts, lpro.rights, lpro.args, lpro.argStarts, lpro.params]:
+        writeArray(out, array('I', values))
+
+    writeCount(out, lpro.ret)
+
+def writeMemory(out, mem):
+    out.extend(KIND.pack(mem.kind))
+    writeString(out, mem.name)
+
+    if mem.kind == par.EXP_KIND_MEM_COLLECTION:
+        writeCount(out, len(mem.collection))
+
+        for t in mem.collection:
+            out.extend(KIND.pack(t.kind))
+            writeString(out, t.value)
+    else:
+        writeString(out, mem.size)
+
+def writeProperties(out, props):
+    writeCount(out, len(props.usesInt))
+
+    for name in props.usesInt:
+        writeString(out, name)
+        out.extend(KIND.pack(props.usesInt[name]))
+
+def getModuleBytes(module):
+    out = bytearray(HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, BYTE_ORDERS[sys.byteorder], array('I').itemsize,
+        len(module.procedures), len(module.memories)
+    ))
+
+    for lpro in module.procedures:
+        writeProcedure(out, lpro)
+
+    for mem in module.memories:
+        writeMemory(out, mem)
+
+    writeProperties(out, module.props)
+
+    return bytes(out)
+
+def writeModule(destination, module):
+    with open(destination, 'wb') as file:
+        file.write(getModuleBytes(module))
+
+#
+# Reader Functions
+#
+
+class Reader:
+    def __init__(self, buffer, swap):
+        self.view = memoryview(buffer)
+        self.swap = swap
+        self.i = 0
+
+    def read(self, layout):
+        if self.i + layout.size > len(self.view):
+            raise Exception('binary module is truncated')
+
+        values = layout.unpack_from(self.view, self.i)
+        self.i += layout.size
+        return values
+
+    def readCount(self):
+        return self.read(COUNT)[0]
+
+    def readKind(self):
+        return self.read(KIND)[0]
+
+    def readString(self):
+        length = self.readCount()
+        end = self.i + length
+
+        if end > len(self.view):
+            raise Exception('binary module is truncated')
+
+        s = str(self.view[self.i:end], BINARY_ENCODING)
+        self.i = end
+        return s
+
+    # arrays in the native byte order are views into the buffer, not copies
+    def readArray(self, typecode):
+        count = self.readCount()
+        self.i += (-self.i) % ARRAY_ALIGNMENT
+        itemsize = array(typecode).itemsize
+        end = self.i + count * itemsize
+
+        if end > len(self.view):
+            raise Exception('binary module is truncated')
+
+        view = self.view[self.i:end]
+        self.i = end
+
+        if self.swap and itemsize > 1:
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+
+        return view.cast(typecode)
+
+def getSymbolTable(names):
+    table = tb.SymbolTable()
+
+    for name in names:
+        table.getId(name)
+
+    return table
+
+def readNames(reader):
+    return getSymbolTable([reader.readString() for _ in range(reader.readCount())])
+
+def readConsts(reader):
+    consts = []
+
+    for _ in range(reader.readCount()):
+        kind = reader.readKind()
+        consts.append((kind, reader.readString()))
+
+    return getSymbolTable(consts)
+
+def readProcedure(reader):
+    lpro = lir.LinearPro(reader.readString())
+    isLeaf, usesInt = reader.read(FLAGS)
+    lpro.isLeaf = isLeaf != 0
+    lpro.usesInt = usesInt != 0
+    lpro.vars = readNames(reader)
+    lpro.identifiers = readNames(reader)
+    lpro.labels = readNames(reader)
+    lpro.consts = readConsts(reader)
+    lpro.opcodes = reader.readArray('B')
+    lpro.dests = reader.readArray('I')
+    lpro.lefts = reader.readArray('I')
+    lpro.rights = reader.readArray('I')
+    lpro.args = reader.readArray('I')
+    lpro.argStarts = reader.readArray('I')
+    lpro.params = reader.readArray('I')
+    lpro.ret = reader.readCount()
+    return lpro
+
+def readMemory(reader):
+    kind = reader.readKind()
+    name = reader.readString()
+
+    if kind == par.EXP_KIND_MEM_COLLECTION:
+        collection = []
+
+        for _ in range(reader.readCount()):
+            tokenKind = reader.readKind()
+            collection.append(lir.CONST_TOKENS[tokenKind](reader.readString()))
+
+        return par.EMemCollection(name, collection)
+    elif kind == par.EXP_KIND_MEM_SIZE:
+        return par.EMemSize(name, reader.readString())
+
+    raise Exception('invalid memory block kind in binary module')
+
+def readProperties(reader):
+    usesInt = {}
+
+    for _ in range(reader.readCount()):
+        name = reader.readString()
+        usesInt[name] = reader.readKind() != 0
+
+    return par.ProcedureProperties(usesInt)
+
+def getModuleFromBuffer(buffer):
+    reader = Reader(buffer, False)
+    magic, version, byteOrder, itemsize, proCount, memCount = reader.read(HEADER)
+
+    if magic != BINARY_MAGIC:
+        raise Exception('source is not a binary module')
+
+    if version != BINARY_VERSION:
+        raise Exception('binary module version not supported')
+
+    if itemsize != array('I').itemsize:
+        raise Exception('binary module word size not supported')
+
+    reader.swap = byteOrder != BYTE_ORDERS[sys.byteorder]
+
+    procedures = [readProcedure(reader) for _ in range(proCount)]
+    memories = [readMemory(reader) for _ in range(memCount)]
+    props = readProperties(reader)
+
+    return Module(memories, procedures, props)
+
+# the file stays mapped for as long as the loaded procedures reference it
+def readModule(source):
+    with open(source, 'rb') as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            raise Exception('binary module is truncated')
+
+    return getModuleFromBuffer(buffer)
@@ -0,0 +1,343 @@
+import lib.parser as par
+
+#
+# Basic Blocks
+#
+
+JUMP_KINDS = {
+    par.EXP_KIND_JUMP, par.EXP_KIND_CO_JUMP
+}
+
+class Block:
+    def __init__(self, id, start, expressions):
+        self.id = id
+        self.start = start
+        self.expressions = expressions
+        self.label = None
+        self.preds = []
+        self.succs = []
+
+    def getLast(self):
+        if len(self.expressions) > 0:
+            return self.expressions[-1]
+
+        return None
+
+    def getEnd(self):
+        return self.start + len(self.expressions)
+
+    def toString(self):
+        preds = ' '.join([str(b) for b in self.preds])
+        succs = ' '.join([str(b) for b in self.succs])
+        return 'block ' + str(self.id) + ' [' + preds + '] -> [' + succs + ']'
+
+class Loop:
+    def __init__(self, header, blocks):
+        self.header = header
+        self.blocks = blocks
+        self.parent = None
+        self.children = []
+        self.depth = 1
+
+    def toString(self):
+        blocks = ' '.join([str(b) for b in sorted(self.blocks)])
+        return 'loop ' + str(self.header) + ' depth ' + str(self.depth) + ' [' + blocks + ']'
+
+#
+# Control Flow Graph
+#
+
+# blocks keep the order of the statements, block 0 is the entry and a block without a
+# successor leaves the procedure through ret
+class Cfg:
+    def __init__(self, expressions):
+        self.expressions = expressions
+        self.blocks = []
+        self.labels = {}
+        self.exits = []
+        self.order = []
+        self.idoms = []
+        self.domChildren = []
+        self.loops = []
+        self.blockLoops = []
+
+    def getBlock(self, label):
+        return self.blocks[self.labels[label]]
+
+    def isReachable(self, id):
+        return id == 0 or self.idoms[id] is not None
+
+    def dominates(self, a, b):
+        if not self.isReachable(b):
+            return False
+
+        while b != a:
+            if b == 0:
+                return False
+            b = self.idoms[b]
+
+        return True
+
+    def getLoopDepth(self, id):
+        loop = self.blockLoops[id]
+
+        if loop is None:
+            return 0
+
+        return loop.depth
+
+    def getExpressions(self):
+        exps = []
+
+        for block in self.blocks:
+            exps.extend(block.expressions)
+
+        return exps
+
+    def toString(self):
+        lines = [b.toString() for b in self.blocks]
+        lines.append('idoms ' + ' '.join([str(d) for d in self.idoms]))
+        lines.extend([l.toString() for l in self.loops])
+        return '\n'.join(lines) + '\n'
+
+#
+# Construction Functions
+#
+
+# a procedure starting with a label gets an empty entry block, so the entry never has a
+# predecessor
+def getBlockStarts(exps):
+    starts = [0]
+
+    for i in range(len(exps)):
+        exp = exps[i]
+        if exp.kind == par.EXP_KIND_LABEL:
+            if i == 0 or (starts[-1] != i and exps[i - 1].kind != par.EXP_KIND_LABEL):
+                starts.append(i)
+        elif exp.kind in JUMP_KINDS:
+            starts.append(i + 1)
+
+    if len(starts) > 1 and starts[-1] == len(exps):
+        starts.pop()
+
+    return starts
+
+def setBlocks(cfg):
+    exps = cfg.expressions
+    starts = getBlockStarts(exps)
+    starts.append(len(exps))
+
+    for id in range(len(starts) - 1):
+        block = Block(id, starts[id], exps[starts[id]:starts[id + 1]])
+
+        first = block.expressions[0] if len(block.expressions) > 0 else None
+        if first is not None and first.kind == par.EXP_KIND_LABEL:
+            block.label = first.name
+
+        cfg.blocks.append(block)
+
+    for block in cfg.blocks:
+        # labels that follow each other share one block
+        for exp in block.expressions:
+            if exp.kind != par.EXP_KIND_LABEL:
+                break
+            if exp.name in cfg.labels:
+                raise Exception('label must not be defined more than once')
+            cfg.labels[exp.name] = block.id
+
+def addEdge(cfg, pred, succ):
+    if succ not in cfg.blocks[pred].succs:
+        cfg.blocks[pred].succs.append(succ)
+        cfg.blocks[succ].preds.append(pred)
+
+def getTargetBlock(cfg, exp):
+    target = cfg.labels.get(exp.labelName)
+
+    if target is None:
+        raise Exception('jump label must be defined in procedure')
+
+    return target
+
+def setEdges(cfg):
+    count = len(cfg.blocks)
+
+    for block in cfg.blocks:
+        last = block.getLast()
+        fallsThrough = True
+
+        if last is not None and last.kind == par.EXP_KIND_JUMP:
+            addEdge(cfg, block.id, getTargetBlock(cfg, last))
+            fallsThrough = False
+        elif last is not None and last.kind == par.EXP_KIND_CO_JUMP:
+            target = getTargetBlock(cfg, last)
+            if block.id + 1 < count:
+                addEdge(cfg, block.id, block.id + 1)
+            addEdge(cfg, block.id, target)
+            fallsThrough = False
+
+            if block.id + 1 == count:
+                cfg.exits.append(block.id)
+
+        if fallsThrough:
+            if block.id + 1 < count:
+                addEdge(cfg, block.id, block.id + 1)
+            else:
+                cfg.exits.append(block.id)
+
+# an explicit stack keeps long procedures clear of the recursion limit
+def getReversePostOrder(cfg):
+    visited = [False] * len(cfg.blocks)
+    order = []
+    stack = [(0, 0)]
+    visited[0] = True
+
+    while len(stack) > 0:
+        id, next = stack.pop()
+        succs = cfg.blocks[id].succs
+
+        if next < len(succs):
+            stack.append((id, next + 1))
+            succ = succs[next]
+            if not visited[succ]:
+                visited[succ] = True
+                stack.append((succ, 0))
+        else:
+            order.append(id)
+
+    order.reverse()
+    return order
+
+def getCommonDominator(idoms, positions, a, b):
+    while a != b:
+        while positions[a] > positions[b]:
+            a = idoms[a]
+        while positions[b] > positions[a]:
+            b = idoms[b]
+
+    return a
+
+# iterative dominators over the reverse post order (Cooper, Harvey and Kennedy), the
+# entry is its own dominator while the loop runs and has no idom afterwards
+def setDominators(cfg):
+    count = len(cfg.blocks)
+    cfg.order = getReversePostOrder(cfg)
+    positions = [count] * count
+
+    for i in range(len(cfg.order)):
+        positions[cfg.order[i]] = i
+
+    idoms = [None] * count
+    idoms[0] = 0
+    changed = True
+
+    while changed:
+        changed = False
+        for id in cfg.order[1:]:
+            idom = None
+            for pred in cfg.blocks[id].preds:
+                if idoms[pred] is not None:
+                    idom = pred if idom is None else getCommonDominator(idoms, positions, pred, idom)
+
+            if idoms[id] != idom:
+                idoms[id] = idom
+                changed = True
+
+    idoms[0] = None
+    cfg.idoms = idoms
+    cfg.domChildren = [[] for _ in range(count)]
+
+    for id in cfg.order[1:]:
+        cfg.domChildren[idoms[id]].append(id)
+
+# the blocks where the dominance of each block ends, walked up from the predecessors of
+# every join block
+def getDominanceFrontiers(cfg):
+    frontiers = [set() for _ in cfg.blocks]
+
+    for id in cfg.order:
+        preds = [p for p in cfg.blocks[id].preds if cfg.isReachable(p)]
+        if len(preds) > 1:
+            for pred in preds:
+                runner = pred
+                while runner is not None and runner != cfg.idoms[id]:
+                    frontiers[runner].add(id)
+                    runner = cfg.idoms[runner]
+
+    return frontiers
+
+def getLoopBlocks(cfg, header, tails):
+    blocks = {header}
+    stack = list(tails)
+
+    while len(stack) > 0:
+        id = stack.pop()
+        if id not in blocks:
+            blocks.add(id)
+            stack.extend([p for p in cfg.blocks[id].preds if cfg.isReachable(p)])
+
+    return blocks
+
+# natural loops of back edges, loops sharing a header are merged and each loop is nested
+# in the smallest loop that contains its header
+def setLoops(cfg):
+    tails = {}
+
+    for id in cfg.order:
+        for succ in cfg.blocks[id].succs:
+            if cfg.dominates(succ, id):
+                tails.setdefault(succ, []).append(id)
+
+    loops = [getLoopBlocks(cfg, h, tails[h]) for h in tails]
+    loops = [Loop(h, b) for h, b in zip(tails, loops)]
+    loops.sort(key=lambda l: len(l.blocks))
+    cfg.blockLoops = [None] * len(cfg.blocks)
+
+    for i in range(len(loops)):
+        loop = loops[i]
+        for outer in loops[i + 1:]:
+            if loop.header in outer.blocks and outer.header != loop.header:
+                loop.parent = outer
+                outer.children.append(loop)
+                break
+
+        for id in loop.blocks:
+            if cfg.blockLoops[id] is None:
+                cfg.blockLoops[id] = loop
+
+    for loop in reversed(loops):
+        if loop.parent is not None:
+            loop.depth = loop.parent.depth + 1
+
+    cfg.loops = sorted(loops, key=lambda l: cfg.order.index(l.header))
+
+#
+# Unreachable Code
+#
+
+def getReachableExpressions(cfg):
+    exps = []
+
+    for block in cfg.blocks:
+        if cfg.isReachable(block.id):
+            exps.extend(block.expressions)
+
+    return exps
+
+# a label no jump goes to only splits a block
+def getUnusedLabelsRemoved(exps):
+    used = {exp.labelName for exp in exps if exp.kind in JUMP_KINDS}
+    return [exp for exp in exps if exp.kind != par.EXP_KIND_LABEL or exp.name in used]
+
+def getReachableCode(exps):
+    return getUnusedLabelsRemoved(getReachableExpressions(getCfg(exps)))
+
+def getCfg(exps):
+    cfg = Cfg(exps)
+    setBlocks(cfg)
+    setEdges(cfg)
+    setDominators(cfg)
+    setLoops(cfg)
+    return cfg
+
+def getProCfg(pro):
+    return getCfg(pro.expressions)
@@ -0,0 +1,60 @@
+import lib.parser as par
+import lib.linear_ir as lir
+
+#
+# Local Clobbers
+#
+
+# the caller-saved registers a procedure writes itself: those holding the variables it
+# defines, the argument registers of its calls and the intermediate registers statements
+# are worked out in; callee-saved registers are restored before it returns
+def getLocalClobbers(lpro, generalDict, asmap):
+    regs = set(asmap.getIntermediateRegs())
+    argRegs = asmap.getArgumentRegs()
+
+    for i in range(len(lpro)):
+        flow = lpro.getFlowStatement(i)
+
+        for name in flow.defs:
+            regs.add(generalDict.get(name))
+
+        if flow.kind == par.EXP_KIND_PRO_CALL:
+            regs.update(argRegs[:len(lpro.getCallArgs(i))])
+
+    return regs & set(asmap.getCallerSavedRegs())
+
+def getCallees(lpro):
+    return {lpro.getCallId(i) for i in range(len(lpro)) if lpro.opcodes[i] == lir.OP_CALL}
+
+#
+# Call Graph
+#
+
+# a procedure also clobbers whatever its callees do, which runs around the call graph until
+# no set grows; a call through a variable or to a procedure outside the module may clobber
+# any caller-saved register
+def getClobbers(pros, generalDicts, asmap):
+    callerSaved = set(asmap.getCallerSavedRegs())
+    clobbers = {}
+    callees = {}
+
+    for lpro, generalDict in zip(pros, generalDicts):
+        clobbers[lpro.name] = getLocalClobbers(lpro, generalDict, asmap)
+        callees[lpro.name] = getCallees(lpro)
+
+    changed = True
+
+    while changed:
+        changed = False
+
+        for name in clobbers:
+            for callee in callees[name]:
+                regs = clobbers.get(callee, callerSaved)
+                if not regs <= clobbers[name]:
+                    clobbers[name] |= regs
+                    changed = True
+
+    return clobbers
+
+def getCallClobbers(props, id, asmap):
+    return props.clobbers.get(id, set(asmap.getCallerSavedRegs()))
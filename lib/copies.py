@@ -0,0 +1,89 @@
+import lib.parser as par
+import lib.ssa as ssa
+import lib.statements as st
+import lib.folding as fold
+
+#
+# Copy Sources
+#
+
+def getCopySource(exp):
+    if exp.kind == par.EXP_KIND_COPY and fold.isWordVar(exp.dest) and fold.isWordVar(exp.source):
+        return exp.source.name
+
+    return None
+
+def getResolved(name, sources):
+    while name in sources:
+        name = sources[name]
+
+    return name
+
+# a phi reading one variable on every edge, or itself, is a copy of that variable
+def getPhiSource(phi, sources):
+    if not all(fold.isWordVar(a) for a in phi.args):
+        return None
+
+    names = {getResolved(a.name, sources) for a in phi.args}
+    names.discard(phi.dest.name)
+
+    if len(names) != 1:
+        return None
+
+    return names.pop()
+
+# every variable of the ssa form has a single definition that dominates its uses, so the
+# destination of a copy can be read from its source anywhere
+def getCopySources(form):
+    sources = {}
+
+    for block in form.cfg.blocks:
+        for exp in block.expressions:
+            source = getCopySource(exp)
+            if source is not None:
+                sources[exp.dest.name] = source
+
+    changed = True
+    while changed:
+        changed = False
+
+        for phis in form.phis:
+            for phi in phis:
+                if phi.dest.name not in sources:
+                    source = getPhiSource(phi, sources)
+                    if source is not None:
+                        sources[phi.dest.name] = source
+                        changed = True
+
+    return {name: getResolved(name, sources) for name in sources}
+
+#
+# Rewriting
+#
+
+def setPropagatedCopies(form, names):
+    for block in form.cfg.blocks:
+        phis = [phi for phi in form.phis[block.id] if phi.dest.name not in names]
+        form.phis[block.id] = [par.EPhi(phi.dest, [st.getRenamedToken(a, names) for a in phi.args]) for phi in phis]
+
+        exps = [exp for exp in block.expressions if getCopySource(exp) is None]
+        block.expressions = [st.getRenamedStatement(exp, names, None) for exp in exps]
+
+    form.ret = st.getRenamedToken(form.ret, names)
+
+def getCopyPropagatedPro(pro):
+    if not any(getCopySource(exp) is not None for exp in pro.expressions):
+        return pro
+
+    form = ssa.getSsaPro(pro)
+
+    if form is None:
+        return pro
+
+    names = getCopySources(form)
+
+    if len(names) == 0:
+        return pro
+
+    setPropagatedCopies(form, names)
+    return ssa.getProFromSsa(form)
@@ -0,0 +1,218 @@
+from collections import deque
+
+import lib.token_buffer as tb
+
+#
+# Bitsets
+#
+
+# a set of variables is one integer with a bit per symbol id, so meets and transfers are
+# single integer operations
+NO_BITS = 0
+
+def getBits(table, names):
+    bits = NO_BITS
+
+    for name in names:
+        bits |= 1 << table.getId(name)
+
+    return bits
+
+def getBitIds(bits):
+    ids = []
+
+    while bits:
+        low = bits & -bits
+        ids.append(low.bit_length() - 1)
+        bits ^= low
+
+    return ids
+
+def getBitNames(table, bits):
+    return [table.getName(id) for id in getBitIds(bits)]
+
+#
+# Worklist Solver
+#
+
+FORWARD = 0
+BACKWARD = 1
+
+def meetUnion(a, b):
+    return a | b
+
+def meetIntersection(a, b):
+    return a & b
+
+class Solution:
+    def __init__(self, ins, outs):
+        self.ins = ins
+        self.outs = outs
+
+def getBlockOrder(cfg, direction):
+    order = list(cfg.order)
+    reached = set(order)
+    order.extend([b.id for b in cfg.blocks if b.id not in reached])
+
+    if direction == BACKWARD:
+        order.reverse()
+
+    return order
+
+# transfer(id, value) gives the value on the far side of block id, boundary is the value
+# entering the entry (forward) or leaving the exits (backward) and top is the starting
+# value of every other block
+def getSolution(cfg, direction, transfer, meet, boundary, top):
+    count = len(cfg.blocks)
+    ins = [top] * count
+    outs = [top] * count
+    exits = set(cfg.exits)
+
+    if direction == FORWARD:
+        sources, results = ins, outs
+    else:
+        sources, results = outs, ins
+
+    worklist = deque(getBlockOrder(cfg, direction))
+    queued = [True] * count
+
+    while len(worklist) > 0:
+        id = worklist.popleft()
+        queued[id] = False
+        block = cfg.blocks[id]
+
+        if direction == FORWARD:
+            inputs, outputs, value = block.preds, block.succs, boundary if id == 0 else None
+        else:
+            inputs, outputs, value = block.succs, block.preds, boundary if id in exits else None
+
+        for other in inputs:
+            value = results[other] if value is None else meet(value, results[other])
+
+        if value is None:
+            value = top
+
+        sources[id] = value
+        result = transfer(id, value)
+
+        if result != results[id]:
+            results[id] = result
+            for other in outputs:
+                if not queued[other]:
+                    queued[other] = True
+                    worklist.append(other)
+
+    return Solution(ins, outs)
+
+#
+# Liveness
+#
+
+class Liveness:
+    def __init__(self, cfg, vars, bits, uses, defs, solution):
+        self.cfg = cfg
+        self.vars = vars
+        self.bits = bits
+        self.uses = uses
+        self.defs = defs
+        self.ins = solution.ins
+        self.outs = solution.outs
+
+    def getLiveIn(self, id):
+        return getBitNames(self.vars, self.ins[id])
+
+    def getLiveOut(self, id):
+        return getBitNames(self.vars, self.outs[id])
+
+# the use and definition bits of every statement of a block, in statement order
+def getStatementBits(block, vars):
+    return [(getBits(vars, exp.uses), getBits(vars, exp.defs)) for exp in block.expressions]
+
+# gens are the uses not preceded by a definition in the block, kills its definitions
+def getBlockUsesDefs(statementBits):
+    uses = NO_BITS
+    defs = NO_BITS
+
+    for expUses, expDefs in reversed(statementBits):
+        uses = (uses & ~expDefs) | expUses
+        defs |= expDefs
+
+    return uses, defs
+
+# the returned variable is live when any exit block leaves the procedure, and a symbol
+# table passed in numbers the bits by its ids
+def getLiveness(cfg, retNames, vars=None):
+    if vars is None:
+        vars = tb.SymbolTable()
+
+    bits = []
+    uses = []
+    defs = []
+
+    for block in cfg.blocks:
+        statementBits = getStatementBits(block, vars)
+        blockUses, blockDefs = getBlockUsesDefs(statementBits)
+        bits.append(statementBits)
+        uses.append(blockUses)
+        defs.append(blockDefs)
+
+    transfer = lambda id, out: uses[id] | (out & ~defs[id])
+    solution = getSolution(cfg, BACKWARD, transfer, meetUnion, getBits(vars, retNames), NO_BITS)
+
+    return Liveness(cfg, vars, bits, uses, defs, solution)
+
+# a variable occupies a line when it is read, written or live across it, and lines are
+# numbered by statement index in the procedure
+def getLiveLines(liveness):
+    lines = [[] for _ in range(len(liveness.vars) + 1)]
+
+    for block in liveness.cfg.blocks:
+        live = liveness.outs[block.id]
+        line = block.getEnd()
+
+        for expUses, expDefs in reversed(liveness.bits[block.id]):
+            line -= 1
+            occupied = live | expUses | expDefs
+
+            while occupied:
+                low = occupied & -occupied
+                lines[low.bit_length() - 1].append(line)
+                occupied ^= low
+
+            live = (live & ~expDefs) | expUses
+
+    return lines
+
+def getRanges(lines):
+    if len(lines) == 0:
+        return None
+
+    lines.sort()
+    ranges = [[lines[0], lines[0]]]
+
+    for line in lines[1:]:
+        if line == ranges[-1][1] + 1:
+            ranges[-1][1] = line
+        elif line > ranges[-1][1]:
+            ranges.append([line, line])
+
+    return ranges
+
+# live ranges with holes, as sorted inclusive line ranges per variable name
+def getLiveRanges(liveness):
+    lines = getLiveLines(liveness)
+    return {liveness.vars.getName(id): getRanges(lines[id]) for id in range(1, len(lines)) if len(lines[id]) > 0}
+
+def areRangesOverlapping(a, b):
+    i = 0
+    j = 0
+
+    while i < len(a) and j < len(b):
+        if a[i][1] < b[j][0]:
+            i += 1
+        elif b[j][1] < a[i][0]:
+            j += 1
+        else:
+            return True
+
+    return False
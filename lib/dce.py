@@ -0,0 +1,72 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.cfg as cfg
+import lib.dataflow as dfa
+import lib.folding as fold
+
+#
+# Dead Statements
+#
+
+# a division traps on a zero divisor, so it is only known to be free of side effects with
+# a constant divisor that can never trap
+def isSafeDivision(exp):
+    value = fold.getConstValue(exp.right)
+    return value is not None and value != 0 and value != -1
+
+# stores and calls stay whether or not their result is read
+def isRemovable(exp):
+    if exp.kind == par.EXP_KIND_COPY:
+        return exp.dest.kind == lex.KIND_VAR
+
+    if exp.kind == par.EXP_KIND_UN_OP:
+        return True
+
+    if exp.kind == par.EXP_KIND_BIN_OP:
+        return exp.op not in fold.DIVISION_OPS or isSafeDivision(exp)
+
+    return False
+
+# each block is walked backwards from its live out set, so a chain of dead statements in
+# a block goes in one walk
+def getLiveStatements(liveness):
+    exps = []
+
+    for block in liveness.cfg.blocks:
+        live = liveness.outs[block.id]
+        kept = []
+
+        for exp, (expUses, expDefs) in zip(reversed(block.expressions), reversed(liveness.bits[block.id])):
+            if isRemovable(exp) and not (expDefs & live):
+                continue
+
+            kept.append(exp)
+            live = (live & ~expDefs) | expUses
+
+        kept.reverse()
+        exps.extend(kept)
+
+    return exps
+
+# removing a statement can leave the definitions it read dead in other blocks, so liveness
+# is solved again until nothing more goes
+def getLiveCode(exps, retNames):
+    exps = cfg.getReachableCode(exps)
+
+    while True:
+        liveness = dfa.getLiveness(cfg.getCfg(exps), retNames)
+        kept = getLiveStatements(liveness)
+
+        if len(kept) == len(exps):
+            return exps
+
+        exps = kept
+
+def getDeadCodeRemovedPro(pro):
+    retNames = [n for n in [par.getTokenVar(pro.ret)] if n is not None]
+    exps = getLiveCode(pro.expressions, retNames)
+
+    if len(exps) == len(pro.expressions):
+        return pro
+
+    return par.EPro(pro.name, pro.params, exps, pro.ret)
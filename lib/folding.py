@@ -0,0 +1,327 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.statements as st
+
+#
+# Constant Values
+#
+
+WORD_WIDTH = 8
+IMMEDIATE_MIN = -(1 << 31)
+IMMEDIATE_MAX = (1 << 31) - 1
+
+# values are kept as signed integers of the width they are written with, the same two's
+# complement wrap the registers give
+def getWrapped(value, width):
+    bits = 8 * width
+    value &= (1 << bits) - 1
+
+    if value >= (1 << (bits - 1)):
+        value -= 1 << bits
+
+    return value
+
+# escaped characters are left to the assembler, so only plain ones have a known value
+def getConstValue(t):
+    if t.kind == lex.KIND_INT:
+        if gram.isHexInt(t.value):
+            return getWrapped(int(t.value, 16), WORD_WIDTH)
+        return getWrapped(int(t.value), WORD_WIDTH)
+
+    if t.kind == lex.KIND_CHAR and len(t.value) == 3:
+        return ord(t.value[1])
+
+    return None
+
+def getConstToken(value):
+    return lex.TInt(gram.INT, str(value))
+
+def isImmediate(value):
+    return IMMEDIATE_MIN <= value <= IMMEDIATE_MAX
+
+# idiv truncates towards zero and traps on a zero divisor or an overflowing quotient, a
+# trapping division is never folded
+def getQuotient(left, right):
+    if right == 0 or (left == -(1 << 63) and right == -1):
+        return None
+
+    quotient = abs(left) // abs(right)
+
+    if (left < 0) != (right < 0):
+        return -quotient
+
+    return quotient
+
+def getRemainder(left, right):
+    quotient = getQuotient(left, right)
+
+    if quotient is None:
+        return None
+
+    return left - quotient * right
+
+UN_OP_VALUES = {
+    gram.NOT: lambda source: ~source
+}
+
+BIN_OP_VALUES = {
+    gram.OR: lambda left, right: left | right,
+    gram.AND: lambda left, right: left & right,
+    gram.XOR: lambda left, right: left ^ right,
+    gram.ADD: lambda left, right: left + right,
+    gram.SUB: lambda left, right: left - right,
+    gram.MUL: lambda left, right: left * right,
+    gram.DIV: getQuotient,
+    gram.MOD: getRemainder
+}
+
+COMMUTATIVE_OPS = {
+    gram.OR, gram.AND, gram.XOR, gram.ADD, gram.MUL
+}
+
+DIVISION_OPS = {
+    gram.DIV, gram.MOD
+}
+
+def getUnOpValue(op, source, width):
+    return getWrapped(UN_OP_VALUES[op](source), width)
+
+# the low bits of a sum, product or bitwise result only depend on the low bits of its
+# operands, a narrow division does not
+def getBinOpValue(op, left, right, width):
+    if width < WORD_WIDTH and op in DIVISION_OPS:
+        return None
+
+    value = BIN_OP_VALUES[op](left, right)
+
+    if value is None:
+        return None
+
+    return getWrapped(value, width)
+
+#
+# Algebraic Identities
+#
+
+def isSameVar(a, b):
+    return st.isVarToken(a) and st.isVarToken(b) and (a.name == b.name) and (a.width == b.width)
+
+# a copy of the operand is only the same when it does not change width
+def getOperandCopy(dest, operand):
+    if st.isVarToken(operand) and operand.width != dest.width:
+        return None
+
+    return par.ECopy(dest, operand)
+
+def getSimplifiedBinOp(dest, op, left, right):
+    lv = getConstValue(left)
+    rv = getConstValue(right)
+
+    if op in {gram.ADD, gram.OR, gram.XOR} and lv == 0:
+        return getOperandCopy(dest, right)
+
+    if op in {gram.ADD, gram.SUB, gram.OR, gram.XOR} and rv == 0:
+        return getOperandCopy(dest, left)
+
+    if op == gram.MUL:
+        if lv == 0 or rv == 0:
+            return par.ECopy(dest, getConstToken(0))
+        if lv == 1:
+            return getOperandCopy(dest, right)
+        if rv == 1:
+            return getOperandCopy(dest, left)
+        if rv == 2 and st.isVarToken(left):
+            return par.EBinOp(dest, gram.ADD, left, left)
+        if lv == 2 and st.isVarToken(right):
+            return par.EBinOp(dest, gram.ADD, right, right)
+
+    if op == gram.AND:
+        if lv == 0 or rv == 0:
+            return par.ECopy(dest, getConstToken(0))
+        if lv == -1:
+            return getOperandCopy(dest, right)
+        if rv == -1 or isSameVar(left, right):
+            return getOperandCopy(dest, left)
+
+    if op == gram.OR and isSameVar(left, right):
+        return getOperandCopy(dest, left)
+
+    if op in {gram.SUB, gram.XOR} and isSameVar(left, right):
+        return par.ECopy(dest, getConstToken(0))
+
+    if op == gram.DIV and rv == 1:
+        return getOperandCopy(dest, left)
+
+    if op == gram.MOD and rv == 1:
+        return par.ECopy(dest, getConstToken(0))
+
+    return None
+
+#
+# Statement Folding
+#
+
+# only full width variables are tracked, a narrow write leaves the upper bits in place
+def getOperandValue(t, consts):
+    if st.isVarToken(t):
+        if t.width == WORD_WIDTH:
+            return consts.get(t.name)
+        return None
+
+    return getConstValue(t)
+
+def getKnownOperand(t, value):
+    if value is None or not st.isVarToken(t):
+        return t
+
+    return getConstToken(value)
+
+def getKnownImmediate(t, consts):
+    value = getOperandValue(t, consts)
+
+    if value is None or not isImmediate(value):
+        return t
+
+    return getKnownOperand(t, value)
+
+# stores keep their variable source, the code generator cannot size a constant store
+def getFoldedCopy(exp, consts):
+    if exp.dest.kind != lex.KIND_VAR or exp.dest.width != WORD_WIDTH:
+        return exp
+
+    source = getKnownOperand(exp.source, getOperandValue(exp.source, consts))
+
+    if source is exp.source:
+        return exp
+
+    return par.ECopy(exp.dest, source)
+
+def getFoldedUnOp(exp, consts):
+    value = getOperandValue(exp.source, consts)
+
+    if value is None or exp.dest.kind != lex.KIND_VAR:
+        return exp
+
+    return par.ECopy(exp.dest, getConstToken(getUnOpValue(exp.op, value, exp.dest.width)))
+
+# the code generator takes a constant operand on the right only and never wider than an
+# immediate, so known values that do not fit stay variables
+def getEncodableBinOp(exp, left, right):
+    operands = [(left, exp.left), (right, exp.right)]
+
+    if exp.op in COMMUTATIVE_OPS and (not st.isVarToken(left)) and st.isVarToken(right):
+        operands.reverse()
+
+    left, leftSource = operands[0]
+    right, rightSource = operands[1]
+
+    if (not st.isVarToken(left)) and st.isVarToken(leftSource):
+        left = leftSource
+
+    if (not st.isVarToken(right)) and st.isVarToken(rightSource):
+        if exp.dest.width != WORD_WIDTH or not isImmediate(getConstValue(right)):
+            right = rightSource
+
+    if (left is exp.left) and (right is exp.right):
+        return exp
+
+    return par.EBinOp(exp.dest, exp.op, left, right)
+
+def getFoldedBinOp(exp, consts):
+    if exp.dest.kind != lex.KIND_VAR:
+        return exp
+
+    lv = getOperandValue(exp.left, consts)
+    rv = getOperandValue(exp.right, consts)
+
+    if lv is not None and rv is not None:
+        value = getBinOpValue(exp.op, lv, rv, exp.dest.width)
+        if value is not None:
+            return par.ECopy(exp.dest, getConstToken(value))
+
+    left = getKnownOperand(exp.left, lv)
+    right = getKnownOperand(exp.right, rv)
+    simplified = getSimplifiedBinOp(exp.dest, exp.op, left, right)
+
+    if simplified is not None:
+        return simplified
+
+    return getEncodableBinOp(exp, left, right)
+
+# a comparison with the constant on the left is turned around
+SWAPPED_JUMPS = {
+    gram.JIL: gram.JIG,
+    gram.JILE: gram.JIGE,
+    gram.JIE: gram.JIE,
+    gram.JIN: gram.JIN,
+    gram.JIGE: gram.JILE,
+    gram.JIG: gram.JIL
+}
+
+def isWordVar(t):
+    return st.isVarToken(t) and t.width == WORD_WIDTH
+
+def getFoldedCoJump(exp, consts):
+    if isWordVar(exp.left) and isWordVar(exp.right):
+        right = getKnownImmediate(exp.right, consts)
+        if right is not exp.right:
+            return par.ECoJump(exp.name, exp.left, right, exp.labelName)
+
+        left = getKnownImmediate(exp.left, consts)
+        if left is not exp.left:
+            return par.ECoJump(SWAPPED_JUMPS[exp.name], exp.right, left, exp.labelName)
+    elif isWordVar(exp.right) and not st.isVarToken(exp.left):
+        return par.ECoJump(SWAPPED_JUMPS[exp.name], exp.right, exp.left, exp.labelName)
+
+    return exp
+
+def getFoldedProCall(exp, consts):
+    params = [getKnownImmediate(p, consts) for p in exp.params]
+
+    if all(params[i] is exp.params[i] for i in range(len(params))):
+        return exp
+
+    return par.EProCall(exp.dest, exp.id, params)
+
+FOLDED_STATEMENTS = {
+    par.EXP_KIND_CO_JUMP: getFoldedCoJump,
+    par.EXP_KIND_COPY: getFoldedCopy,
+    par.EXP_KIND_UN_OP: getFoldedUnOp,
+    par.EXP_KIND_BIN_OP: getFoldedBinOp,
+    par.EXP_KIND_PRO_CALL: getFoldedProCall
+}
+
+def isSelfCopy(exp):
+    return exp.kind == par.EXP_KIND_COPY and isSameVar(exp.dest, exp.source)
+
+def setKnownValues(exp, consts):
+    for name in exp.defs:
+        consts.pop(name, None)
+
+    if exp.kind == par.EXP_KIND_COPY and isWordVar(exp.dest):
+        value = getConstValue(exp.source)
+        if value is not None:
+            consts[exp.dest.name] = value
+
+# values are known from the last label on, a statement without a label in front of it is
+# only reached from the one before it
+def getFoldedExpressions(exps):
+    folded = []
+    consts = {}
+
+    for exp in exps:
+        if exp.kind == par.EXP_KIND_LABEL:
+            consts.clear()
+
+        if exp.kind in FOLDED_STATEMENTS:
+            exp = FOLDED_STATEMENTS[exp.kind](exp, consts)
+
+        if not isSelfCopy(exp):
+            folded.append(exp)
+            setKnownValues(exp, consts)
+
+    return folded
+
+def getFoldedPro(pro):
+    return par.EPro(pro.name, pro.params, getFoldedExpressions(pro.expressions), pro.ret)
@@ -3,6 +3,13 @@ import lib.lexer as lex
 import lib.parser as par
 import lib.simple_allocator as sar
 import lib.assembly_map as asm
+import lib.parallel as pll
+import lib.linear_ir as lir
+import lib.binary_ir as bir
+import lib.optimizer as opt
+import lib.folding as fold
+import lib.tail_calls as tails
+import lib.clobbers as clb
 
 #
 # Assignment Helpers
@@ -105,7 +112,7 @@ def getAsmValWidth(asmap, val, width):
 
 def getAsmVal(param, asmap, assignments):
     # general registers
-    if isinstance(param, lex.TVar) and (param.name in assignments.generalReg):
+    if (param.kind == lex.KIND_VAR) and (param.name in assignments.generalReg):
         val = assignments.generalReg[param.name]
         
         if val != sar.SPILL and val != sar.OVER:
@@ -114,7 +121,7 @@ def getAsmVal(param, asmap, assignments):
         return val
 
     # literals
-    if par.isValidTokenInTypeList(param, par.LITERAL_TYPES):
+    if par.isValidTokenInKindMask(param, par.LITERAL_MASK):
         return param.value
     
     return param.name
@@ -123,63 +130,63 @@ def getAsmVal(param, asmap, assignments):
 # Statement Functions
 #
 
-def getAsmLocalLabel(exp, proName, asmap):
-    return asmap.emitLocalLabel(proName, exp.name)
+def getAsmLocalLabel(name, proName, asmap):
+    return asmap.emitLocalLabel(proName, name)
 
-def getAsmJump(exp, proName, asmap):
-    return asmap.emitJump(exp.name, proName, exp.labelName)
+def getAsmJump(labelName, proName, asmap):
+    return asmap.emitJump(gram.JUMP, proName, labelName)
 
-def getAsmCoJump(exp, proName, asmap, assignments):
+def getAsmCoJump(op, leftToken, rightToken, labelName, proName, asmap, assignments):
     code = []
     intermediate = asmap.getIntermediateRegs()
-    left = getAsmVal(exp.left, asmap, assignments)
-    right = getAsmVal(exp.right, asmap, assignments)
+    left = getAsmVal(leftToken, asmap, assignments)
+    right = getAsmVal(rightToken, asmap, assignments)
     
     if left == sar.SPILL or left == sar.OVER:
-        leftName = exp.left.name
+        leftName = leftToken.name
         leftOffset = assignments.offset[getOffsetVarKey(leftName)]
-        left = getAsmValWidth(asmap, intermediate[0], exp.left.width)
+        left = getAsmValWidth(asmap, intermediate[0], leftToken.width)
         code.extend(asmap.emitStackLoad(left, leftOffset))
 
     if right == sar.SPILL or right == sar.OVER:
-        rightName = exp.right.name
+        rightName = rightToken.name
         rightOffset = assignments.offset[getOffsetVarKey(rightName)]
-        right = getAsmValWidth(asmap, intermediate[1], exp.right.width)
+        right = getAsmValWidth(asmap, intermediate[1], rightToken.width)
         code.extend(asmap.emitStackLoad(right, rightOffset))
 
-    code.extend(asmap.emitCoJump(exp.name, left, right, proName, exp.labelName))
+    code.extend(asmap.emitCoJump(op, left, right, proName, labelName))
     return code
 
 # begin copy section
 
-def getAsmCopyVars(exp, asmap, assignments):
+def getAsmCopyVars(destToken, sourceToken, asmap, assignments):
     dest = ''
     source = ''
 
-    if isinstance(exp.dest, lex.TPointer):
-        dest = getAsmPointerVal(exp.dest, assignments)
-        source = getAsmVal(exp.source, asmap, assignments)
-    elif isinstance(exp.source, lex.TPointer):
-        dest = getAsmVal(exp.dest, asmap, assignments)
-        source = getAsmPointerVal(exp.source, assignments)
+    if destToken.kind == lex.KIND_POINTER:
+        dest = getAsmPointerVal(destToken, assignments)
+        source = getAsmVal(sourceToken, asmap, assignments)
+    elif sourceToken.kind == lex.KIND_POINTER:
+        dest = getAsmVal(destToken, asmap, assignments)
+        source = getAsmPointerVal(sourceToken, assignments)
     else:
-        dest = getAsmVal(exp.dest, asmap, assignments)
-        source = getAsmVal(exp.source, asmap, assignments)
+        dest = getAsmVal(destToken, asmap, assignments)
+        source = getAsmVal(sourceToken, asmap, assignments)
 
     return dest, source
 
-def getAsmCopyPointerToVar(exp, asmap, assignments):
+def getAsmCopyPointerToVar(destToken, sourceToken, asmap, assignments):
     code = []
     handleDestSpill = False
     intermediate = asmap.getIntermediateRegs()
-    dest, source = getAsmCopyVars(exp, asmap, assignments)
+    dest, source = getAsmCopyVars(destToken, sourceToken, asmap, assignments)
     
     if dest == sar.SPILL or dest == sar.OVER:
         handleDestSpill = True
-        dest = getAsmValWidth(asmap, intermediate[0], exp.dest.width)
+        dest = getAsmValWidth(asmap, intermediate[0], destToken.width)
 
     if source == sar.SPILL or source == sar.OVER:
-        sourceName = exp.source.name
+        sourceName = sourceToken.name
         sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
         source = intermediate[1]
         code.extend(asmap.emitStackLoad(source, sourceOffset))
@@ -191,27 +198,27 @@ def getAsmCopyPointerToVar(exp, asmap, assignments):
         code.extend(asmap.emitCopyIdentifierValue(dest, source))
     
     if handleDestSpill:
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
         code.extend(asmap.emitStackStore(dest, destOffset))
 
     return code
 
-def getAsmCopyVarToPointer(exp, asmap, assignments):
+def getAsmCopyVarToPointer(destToken, sourceToken, asmap, assignments):
     code = []
     intermediate = asmap.getIntermediateRegs()
-    dest, source = getAsmCopyVars(exp, asmap, assignments)
+    dest, source = getAsmCopyVars(destToken, sourceToken, asmap, assignments)
     
     if dest == sar.SPILL or dest == sar.OVER:
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
         dest = intermediate[0]
         code.extend(asmap.emitStackLoad(dest, destOffset))
 
     if source == sar.SPILL or source == sar.OVER:
-        sourceName = exp.source.name
+        sourceName = sourceToken.name
         sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
-        source = getAsmValWidth(asmap, intermediate[1], exp.source.width)
+        source = getAsmValWidth(asmap, intermediate[1], sourceToken.width)
         code.extend(asmap.emitStackLoad(source, sourceOffset))
 
     pointer = asmap.getPointer(dest)
@@ -219,67 +226,67 @@ def getAsmCopyVarToPointer(exp, asmap, assignments):
     
     return code
 
-def getAsmCopyVarToVar(exp, asmap, assignments):
+def getAsmCopyVarToVar(destToken, sourceToken, asmap, assignments):
     code = []
     handleDestSpill = False
     intermediate = asmap.getIntermediateRegs()
-    dest, source = getAsmCopyVars(exp, asmap, assignments)
+    dest, source = getAsmCopyVars(destToken, sourceToken, asmap, assignments)
 
     if dest == sar.SPILL or dest == sar.OVER:
         handleDestSpill = True
-        dest = getAsmValWidth(asmap, intermediate[0], exp.dest.width)
+        dest = getAsmValWidth(asmap, intermediate[0], destToken.width)
 
     if source == sar.SPILL or source == sar.OVER:
-        sourceName = exp.source.name
+        sourceName = sourceToken.name
         sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
-        source = getAsmValWidth(asmap, intermediate[1], exp.source.width)
+        source = getAsmValWidth(asmap, intermediate[1], sourceToken.width)
         code.extend(asmap.emitStackLoad(source, sourceOffset))
 
     code.extend(asmap.emitCopy(dest, source))
     
     if handleDestSpill:
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
         code.extend(asmap.emitStackStore(dest, destOffset))
 
     return code
 
-def getAsmCopyIdentifierAddressToVar(exp, asmap, assignments):
+def getAsmCopyIdentifierAddressToVar(destToken, sourceToken, asmap, assignments):
     code = []
     handleDestSpill = False
     intermediate = asmap.getIntermediateRegs()
-    dest, source = getAsmCopyVars(exp, asmap, assignments)
+    dest, source = getAsmCopyVars(destToken, sourceToken, asmap, assignments)
 
     if dest == sar.SPILL or dest == sar.OVER:
         handleDestSpill = True
-        dest = getAsmValWidth(asmap, intermediate[0], exp.dest.width)
+        dest = getAsmValWidth(asmap, intermediate[0], destToken.width)
 
     code.extend(asmap.emitCopyIdentifierAddress(dest, source))
     
     if handleDestSpill:
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
         code.extend(asmap.emitStackStore(dest, destOffset))
 
     return code
 
-def getAsmCopy(exp, asmap, assignments):
-    if isinstance(exp.dest, lex.TPointer):
-        if par.isValidTokenInTypeList(exp.source, par.INTEGER_TYPES):
-            return getAsmCopyVarToPointer(exp, asmap, assignments)
+def getAsmCopy(destToken, sourceToken, asmap, assignments):
+    if destToken.kind == lex.KIND_POINTER:
+        if par.isValidTokenInKindMask(sourceToken, par.INTEGER_MASK):
+            return getAsmCopyVarToPointer(destToken, sourceToken, asmap, assignments)
         else:
             raise Exception('source must be integer type')
-    elif isinstance(exp.source, lex.TPointer):
-        if isinstance(exp.dest, lex.TVar):
-            return getAsmCopyPointerToVar(exp, asmap, assignments)
+    elif sourceToken.kind == lex.KIND_POINTER:
+        if destToken.kind == lex.KIND_VAR:
+            return getAsmCopyPointerToVar(destToken, sourceToken, asmap, assignments)
         else:
             raise Exception('destination must be integer variable')
 
-    if isinstance(exp.dest, lex.TVar):
-        if par.isValidTokenInTypeList(exp.source, par.INTEGER_TYPES):
-            return getAsmCopyVarToVar(exp, asmap, assignments)
-        elif isinstance(exp.source, lex.TIdentifier):
-            return getAsmCopyIdentifierAddressToVar(exp, asmap, assignments)
+    if destToken.kind == lex.KIND_VAR:
+        if par.isValidTokenInKindMask(sourceToken, par.INTEGER_MASK):
+            return getAsmCopyVarToVar(destToken, sourceToken, asmap, assignments)
+        elif sourceToken.kind == lex.KIND_IDENTIFIER:
+            return getAsmCopyIdentifierAddressToVar(destToken, sourceToken, asmap, assignments)
         else:
             raise Exception('source must be integer or identifier type')
 
@@ -287,65 +294,82 @@ def getAsmCopy(exp, asmap, assignments):
 
 # end copy section
 
-def getAsmUnOp(exp, asmap, assignments):
+def getAsmUnOp(destToken, op, sourceToken, asmap, assignments):
     code = []
     destSpill = False
     loadDestFromSpill = []
     intermediate = asmap.getIntermediateRegs()
-    dest = getAsmVal(exp.dest, asmap, assignments)
-    source = getAsmVal(exp.source, asmap,  assignments)
+    dest = getAsmVal(destToken, asmap, assignments)
+    source = getAsmVal(sourceToken, asmap,  assignments)
 
     if dest == sar.SPILL or dest == sar.OVER:
         destSpill = True
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
-        dest = getAsmValWidth(asmap, intermediate[0], exp.dest.width)
+        dest = getAsmValWidth(asmap, intermediate[0], destToken.width)
         code.extend(asmap.emitStackLoad(dest, destOffset))
         loadDestFromSpill = asmap.emitStackStore(dest, destOffset)
 
     if source == sar.SPILL or source == sar.OVER:
-        sourceName = exp.source.name
+        sourceName = sourceToken.name
         sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
-        source = getAsmValWidth(asmap, intermediate[1], exp.source.width)
+        source = getAsmValWidth(asmap, intermediate[1], sourceToken.width)
         code.extend(asmap.emitStackLoad(source, sourceOffset))
 
-    code.extend(asmap.emitUnOp(dest, exp.op, source))
+    code.extend(asmap.emitUnOp(dest, op, source))
 
     if destSpill:
         code.extend(loadDestFromSpill)
 
     return code
 
-def getAsmBinOp(exp, asmap, assignments):
+def isSharedReg(a, b, assignments):
+    if (a.kind != lex.KIND_VAR) or (b.kind != lex.KIND_VAR):
+        return False
+
+    reg = assignments.generalReg.get(a.name)
+    return (reg is not None) and (reg != sar.SPILL) and (reg != sar.OVER) and (reg == assignments.generalReg.get(b.name))
+
+def getAsmBinOp(destToken, op, leftToken, rightToken, asmap, assignments):
     code = []
     destSpill = False
     loadDestFromSpill = []
     intermediate = asmap.getIntermediateRegs()
-    dest = getAsmVal(exp.dest, asmap, assignments)
-    left = getAsmVal(exp.left, asmap, assignments)
-    right = getAsmVal(exp.right, asmap, assignments)
-    
+    dest = getAsmVal(destToken, asmap, assignments)
+    left = getAsmVal(leftToken, asmap, assignments)
+    right = getAsmVal(rightToken, asmap, assignments)
+
     if dest == sar.SPILL or dest == sar.OVER:
         destSpill = True
-        destName = exp.dest.name
+        destName = destToken.name
         destOffset = assignments.offset[getOffsetVarKey(destName)]
-        dest = getAsmValWidth(asmap, intermediate[0], exp.dest.width)
+        dest = getAsmValWidth(asmap, intermediate[0], destToken.width)
         code.extend(asmap.emitStackLoad(dest, destOffset))
         loadDestFromSpill = asmap.emitStackStore(dest, destOffset)
 
     if left == sar.SPILL or left == sar.OVER:
-        leftName = exp.left.name
+        leftName = leftToken.name
         leftOffset = assignments.offset[getOffsetVarKey(leftName)]
-        left = getAsmValWidth(asmap, intermediate[1], exp.left.width)
+        left = getAsmValWidth(asmap, intermediate[1], leftToken.width)
         code.extend(asmap.emitStackLoad(left, leftOffset))
 
     if right == sar.SPILL or right == sar.OVER:
-        rightName = exp.right.name
+        rightName = rightToken.name
         rightOffset = assignments.offset[getOffsetVarKey(rightName)]
-        right = getAsmValWidth(asmap, intermediate[2], exp.right.width)
+        right = getAsmValWidth(asmap, intermediate[2], rightToken.width)
         code.extend(asmap.emitStackLoad(right, rightOffset))
 
-    code.extend(asmap.emitBinOp(dest, exp.op, left, right))
+    # the destination is written before the right operand is read, so a right operand in
+    # the same register is swapped to the left or moved out of the way first
+    if isSharedReg(destToken, rightToken, assignments) and not isSharedReg(destToken, leftToken, assignments):
+        if (op in fold.COMMUTATIVE_OPS) and (rightToken.width == destToken.width):
+            left, right = right, left
+        else:
+            moved = getAsmValWidth(asmap, intermediate[2], rightToken.width)
+            code.extend(asmap.emitCopy(moved, right))
+            right = moved
+
+    code.extend(asmap.emitBinOp(dest, op, left, right))
 
     if destSpill:
         code.extend(loadDestFromSpill)
@@ -354,97 +378,97 @@ def getAsmBinOp(exp, asmap, assignments):
 
 # begin procedure call section
 
-def getAsmProCallStackStatements(exp, asmap, assignments, props):
+# an argument held in a register an earlier argument is moved into is read back from the
+# slot that register was saved in
+def getReadBackRegs(params, asmap, assignments):
+    regs = set()
+    argRegs = asmap.getArgumentRegs()
+
+    for i in range(min(len(params), len(argRegs))):
+        if params[i].kind == lex.KIND_VAR:
+            reg = assignments.generalReg[params[i].name]
+            if reg in argRegs[:i]:
+                regs.add(reg)
+
+    return regs
+
+# a caller-saved register is saved around a call when the callee may clobber it or an
+# argument is moved into it, and only when the caller gave it a slot, which it does for
+# every register it holds a variable in; the register the result goes to is not restored
+def getAsmProCallStackStatements(destToken, id, params, asmap, assignments, props):
     store = []
     load = []
 
-    id = exp.id
-    usesInt = (id in props.usesInt) and props.usesInt[id]
+    clobbered = set(clb.getCallClobbers(props, id, asmap))
+    clobbered.update(asmap.getArgumentRegs()[:len(params)])
 
-    if usesInt:
-        callerSaved = asmap.getCallerSavedRegs()
-        for reg in callerSaved:
-            key = getOffsetRegKey(reg)
-            if key in assignments.offset:
-                offset = assignments.offset[key]
-                store.extend(asmap.emitStackStore(reg, offset))
+    if fold.isWordVar(destToken):
+        clobbered.discard(assignments.generalReg.get(destToken.name))
+
+    readBack = getReadBackRegs(params, asmap, assignments)
+
+    callerSaved = asmap.getCallerSavedRegs()
+    for reg in callerSaved:
+        key = getOffsetRegKey(reg)
+        if ((reg in clobbered) or (reg in readBack)) and (key in assignments.offset):
+            offset = assignments.offset[key]
+            store.extend(asmap.emitStackStore(reg, offset))
+            if reg in clobbered:
                 load.extend(asmap.emitStackLoad(reg, offset))
 
     return store, load
 
-def getAsmProCallArguments(params, asmap, assignments):
+# stack arguments are pushed last to first before any argument register is written, so
+# every source is still in place; each push moves the stack pointer, and a load after it
+# reaches that much further for the same slot
+def getAsmProCallPushes(params, asmap, assignments):
     code = []
-    pushes = []
-    pops = []
-    popTotal = 0
-
+    pushed = 0
     intermediate = asmap.getIntermediateRegs()
-    arguRegs = asmap.getArgumentRegs()
-    destRegsUsed = {}
-
-    pend = len(params)
-    rend = len(arguRegs)
-    pi = 0
-    ri = 0
-
-    while pi < pend:
-        param = params[pi]
-        destReg = ''
-
-        if ri < rend:
-            destReg = arguRegs[ri]
-            ri += 1
-            destRegsUsed[destReg] = True
-
-            if isinstance(param, lex.TVar):
-                sourceName = param.name
-                sourceReg = assignments.generalReg[sourceName]
-
-                if sourceReg in destRegsUsed:
-                    key = getOffsetRegKey(sourceReg)
-                    sourceOffset = assignments.offset[key]
-                    code.extend(asmap.emitStackLoad(destReg, sourceOffset))
-                elif destReg == sar.SPILL or destReg == sar.OVER:
-                    key = getOffsetVarKey(sourceReg)
-                    sourceOffset = assignments.offset[key]
-                    code.extend(asmap.emitStackLoad(destReg, sourceOffset))
-                else:
-                    code.extend(asmap.emitCopy(destReg, sourceReg))
-            elif isinstance(param, lex.TInt) or isinstance(param, lex.TChar):
-                value = param.value
-                code.extend(asmap.emitCopy(destReg, value))
-            else:
-                raise Exception('invalid type for argument')
+
+    for param in reversed(params):
+        if param.kind == lex.KIND_VAR:
+            source = assignments.generalReg[param.name]
+
+            if source == sar.SPILL or source == sar.OVER:
+                sourceOffset = assignments.offset[getOffsetVarKey(param.name)] + pushed
+                source = intermediate[0]
+                code.extend(asmap.emitStackLoad(source, sourceOffset))
+        elif (param.kind == lex.KIND_INT) or (param.kind == lex.KIND_CHAR):
+            source = intermediate[0]
+            code.extend(asmap.emitCopy(source, param.value))
         else:
-            nextPush = []
-
-            if isinstance(param, lex.TVar):
-                paReg = getAsmVal(param, asmap, assignments)
-
-                if paReg == sar.SPILL or paReg == sar.OVER:
-                    sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
-                    paReg = intermediate[0]
-                    nextPush.extend(asmap.emitStackLoad(paReg, sourceOffset))                
-
-                nextPush.extend(asmap.emitPush(paReg))
-            elif isinstance(param, lex.TInt) or isinstance(param, lex.TChar):
-                value = param.value
-                paReg = intermediate[0]
-                nextPush.extend(asmap.emitCopy(paReg, value))
-                nextPush.extend(asmap.emitPush(paReg))
-            else:
-                raise Exception('invalid type for argument')
-            
-            pushes = nextPush + pushes
-            popTotal += 8
+            raise Exception('invalid type for argument')
 
-        pi += 1
+        code.extend(asmap.emitPush(source))
+        pushed += 8
 
-    if popTotal > 0:
-        # pop all at once with a stack deallocation
-        pops.extend(asmap.emitStackDeallocation(popTotal))
+    return code, pushed
+
+def getAsmProCallMoves(params, asmap, assignments, pushed):
+    code = []
+    written = {}
+
+    for param, destReg in zip(params, asmap.getArgumentRegs()):
+        if param.kind == lex.KIND_VAR:
+            sourceReg = assignments.generalReg[param.name]
+
+            if sourceReg == sar.SPILL or sourceReg == sar.OVER:
+                sourceOffset = assignments.offset[getOffsetVarKey(param.name)] + pushed
+                code.extend(asmap.emitStackLoad(destReg, sourceOffset))
+            elif sourceReg in written:
+                sourceOffset = assignments.offset[getOffsetRegKey(sourceReg)] + pushed
+                code.extend(asmap.emitStackLoad(destReg, sourceOffset))
+            else:
+                code.extend(asmap.emitCopy(destReg, sourceReg))
+        elif (param.kind == lex.KIND_INT) or (param.kind == lex.KIND_CHAR):
+            code.extend(asmap.emitCopy(destReg, param.value))
+        else:
+            raise Exception('invalid type for argument')
+
+        written[destReg] = True
 
-    return code, pushes, pops
+    return code
 
 def getAsmProCallReturn(dest, asmap, assignments):
     code = []
@@ -460,65 +484,166 @@ def getAsmProCallReturn(dest, asmap, assignments):
 
     return code
 
-def getAsmIdCall(exp, asmap, assignments):
+# a procedure variable is moved to an intermediate register first, the argument registers
+# and the frame teardown of a tail call would overwrite it where it is
+def getAsmProCallTarget(id, asmap, assignments):
     code = []
-    id = exp.id
 
     if (len(id) > 1) and (id[0] == gram.PRO_VAR_CALL):
         sourceName = id[1:]
-        intermediate = asmap.getIntermediateRegs()
+        target = asmap.getIntermediateRegs()[1]
         source = assignments.generalReg[sourceName]
 
         if source == sar.SPILL or source == sar.OVER:
-            sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
-            source = getAsmValWidth(asmap, intermediate[0], 8)
-            code.extend(asmap.emitStackLoad(source, sourceOffset))
+            code.extend(asmap.emitStackLoad(target, assignments.offset[getOffsetVarKey(sourceName)]))
+        else:
+            code.extend(asmap.emitCopy(target, source))
 
-        code.extend(asmap.emitCall(source))
-    else:
-        code.extend(asmap.emitCall(id))
+        return code, target
 
-    return code
+    return code, id
 
-def getAsmProCall(exp, asmap, assignments, props):
-    store, load = getAsmProCallStackStatements(exp, asmap, assignments, props)    
-    args, pushes, pops = getAsmProCallArguments(exp.params, asmap, assignments)
-    proCall = getAsmIdCall(exp, asmap, assignments)
-    proRet = getAsmProCallReturn(exp.dest, asmap, assignments)
+def getAsmProCall(destToken, id, params, asmap, assignments, props):
+    regCount = len(asmap.getArgumentRegs())
+    store, load = getAsmProCallStackStatements(destToken, id, params, asmap, assignments, props)
+    target, id = getAsmProCallTarget(id, asmap, assignments)
+    pushes, pushed = getAsmProCallPushes(params[regCount:], asmap, assignments)
+    moves = getAsmProCallMoves(params, asmap, assignments, pushed)
+    proRet = getAsmProCallReturn(destToken, asmap, assignments)
 
     code = []
 
     code.extend(store)
-    code.extend(args)
+    code.extend(target)
     code.extend(pushes)
-    code.extend(proCall)
-    code.extend(pops)
+    code.extend(moves)
+    code.extend(asmap.emitCall(id))
+
+    if pushed > 0:
+        # pop all at once with a stack deallocation
+        code.extend(asmap.emitStackDeallocation(pushed))
+
     code.extend(load)
     code.extend(proRet)
 
     return code
 
+# a call whose result is returned straight away leaves by a jump once the frame is torn
+# down, the callee then returns to our caller; arguments on the stack would sit where the
+# return address is, so only calls passing everything in registers qualify
+def isWordVarOperand(operand):
+    return (lir.getOperandTag(operand) == lir.OPERAND_VAR) and (lir.getOperandWidth(operand) == 8)
+
+def isPlainCopyOperand(lpro, i):
+    return (lpro.opcodes[i] == lir.OP_COPY) and isWordVarOperand(lpro.dests[i]) and isWordVarOperand(lpro.lefts[i])
+
+# the walk tails.getReturnedVar makes over parsed statements, on the operand arrays: a
+# word variable is one operand, so following the copies compares integers
+def getReturnedOperand(lpro, i, positions):
+    operand = lpro.dests[i]
+    seen = set()
+    i += 1
+
+    while i < len(lpro):
+        opcode = lpro.opcodes[i]
+
+        if opcode == lir.OP_LABEL:
+            i += 1
+        elif opcode == lir.OP_JUMP:
+            labelName = lpro.getFlowStatement(i).labelName
+
+            if labelName in seen:
+                return None
+
+            seen.add(labelName)
+            i = positions[labelName]
+        elif isPlainCopyOperand(lpro, i) and (lpro.lefts[i] == operand or lpro.dests[i] != operand):
+            if lpro.lefts[i] == operand:
+                operand = lpro.dests[i]
+            i += 1
+        else:
+            return None
+
+    return operand
+
+def isTailCall(lpro, i, positions, asmap):
+    if lpro.opcodes[i] != lir.OP_CALL or len(lpro.getCallArgs(i)) > len(asmap.getArgumentRegs()):
+        return False
+
+    if not (isWordVarOperand(lpro.dests[i]) and isWordVarOperand(lpro.ret)):
+        return False
+
+    return getReturnedOperand(lpro, i, positions) == lpro.ret
+
+# nothing is restored after a tail call, so only the registers arguments are read back
+# from are saved
+def getAsmTailCallStackStatements(params, asmap, assignments):
+    store = []
+    readBack = getReadBackRegs(params, asmap, assignments)
+
+    for reg in asmap.getArgumentRegs():
+        if reg in readBack:
+            store.extend(asmap.emitStackStore(reg, assignments.offset[getOffsetRegKey(reg)]))
+
+    return store
+
+def getAsmProTailCall(id, params, asmap, assignments, teardown):
+    store = getAsmTailCallStackStatements(params, asmap, assignments)
+    target, id = getAsmProCallTarget(id, asmap, assignments)
+    moves = getAsmProCallMoves(params, asmap, assignments, 0)
+
+    code = []
+
+    code.extend(store)
+    code.extend(target)
+    code.extend(moves)
+    code.extend(teardown)
+    code.extend(asmap.emitTailCall(id))
+
+    return code
+
 # end procedure call section
 
 ###
 
 # begin procedure composition section
 
-def getAsmStatementsFromExp(exp, proName, asmap, assignments, props):
-    if isinstance(exp, par.ELabel):
-        return getAsmLocalLabel(exp, proName, asmap)
-    elif isinstance(exp, par.EJump):
-        return getAsmJump(exp, proName, asmap)
-    elif isinstance(exp, par.ECoJump):
-        return getAsmCoJump(exp, proName, asmap, assignments)
-    elif isinstance(exp, par.ECopy):
-        return getAsmCopy(exp, asmap, assignments)
-    elif isinstance(exp, par.EUnOp):
-        return getAsmUnOp(exp, asmap, assignments)
-    elif isinstance(exp, par.EBinOp):
-        return getAsmBinOp(exp, asmap, assignments)
-    elif isinstance(exp, par.EProCall):
-        return getAsmProCall(exp,  asmap, assignments, props)
+# the operands of a procedure are decoded once, statements reading the same operand share
+# its token
+def getOperandToken(lpro, operand, tokens):
+    if operand not in tokens:
+        tokens[operand] = lpro.getToken(operand)
+
+    return tokens[operand]
+
+# statements are emitted straight from the operand arrays, only the operands an emitter
+# reads are decoded
+def getAsmStatement(lpro, i, tokens, proName, asmap, assignments, props):
+    kind, op = lir.OPCODES[lpro.opcodes[i]]
+    dest = lpro.dests[i]
+
+    match kind:
+        case par.EXP_KIND_LABEL:
+            return getAsmLocalLabel(lpro.getLabelName(dest), proName, asmap)
+        case par.EXP_KIND_JUMP:
+            return getAsmJump(lpro.getLabelName(dest), proName, asmap)
+        case par.EXP_KIND_CO_JUMP:
+            left = getOperandToken(lpro, lpro.lefts[i], tokens)
+            right = getOperandToken(lpro, lpro.rights[i], tokens)
+            return getAsmCoJump(op, left, right, lpro.getLabelName(dest), proName, asmap, assignments)
+        case par.EXP_KIND_COPY:
+            source = getOperandToken(lpro, lpro.lefts[i], tokens)
+            return getAsmCopy(getOperandToken(lpro, dest, tokens), source, asmap, assignments)
+        case par.EXP_KIND_UN_OP:
+            source = getOperandToken(lpro, lpro.lefts[i], tokens)
+            return getAsmUnOp(getOperandToken(lpro, dest, tokens), op, source, asmap, assignments)
+        case par.EXP_KIND_BIN_OP:
+            left = getOperandToken(lpro, lpro.lefts[i], tokens)
+            right = getOperandToken(lpro, lpro.rights[i], tokens)
+            return getAsmBinOp(getOperandToken(lpro, dest, tokens), op, left, right, asmap, assignments)
+        case par.EXP_KIND_PRO_CALL:
+            params = [getOperandToken(lpro, a, tokens) for a in lpro.getCallArgs(i)]
+            return getAsmProCall(getOperandToken(lpro, dest, tokens), lpro.getCallId(i), params, asmap, assignments, props)
 
     return []
 
@@ -532,8 +657,6 @@ def getAsmProStackAllocations(asmap, maxOffset):
 
     if maxOffset > 0:
         epilogue.extend(asmap.emitStackDeallocation(maxOffset))
-    
-    epilogue.extend(asmap.emitRet())
 
     return prologue, epilogue
 
@@ -553,46 +676,60 @@ def getAsmProStackStatements(name, asmap, assignments, props):
 
     return store, load
 
-def getAsmProExpressionStatements(exps, proName, asmap, assignments, props):
+# the return after the last statement is only reached when that statement is not a tail
+# call; a tail call never writes its destination, so only its arguments are decoded
+def getAsmProExpressionStatements(lpro, proName, asmap, assignments, props, teardown):
     statements = []
+    tokens = {}
+    positions = tails.getLabelPositions(lpro.getFlowStatements())
+    returns = True
+
+    for i in range(len(lpro)):
+        returns = not isTailCall(lpro, i, positions, asmap)
+
+        if returns:
+            statement = getAsmStatement(lpro, i, tokens, proName, asmap, assignments, props)
+        else:
+            params = [getOperandToken(lpro, a, tokens) for a in lpro.getCallArgs(i)]
+            statement = getAsmProTailCall(lpro.getCallId(i), params, asmap, assignments, teardown)
 
-    for exp in exps:
-        statement = getAsmStatementsFromExp(exp, proName, asmap, assignments, props)
         statements.extend(statement)
 
-    return statements
+    return statements, returns
 
 def getAsmProRetStatement(retVar, asmap, assignments):
     code = []
     retSource = getAsmVal(retVar, asmap, assignments)
     retDest = asmap.getRetReg()
 
-    if isinstance(retVar, lex.TVar):
+    if retVar.kind == lex.KIND_VAR:
         if retSource == sar.SPILL or retSource == sar.OVER:
             sourceName = retVar.name
             sourceOffset = assignments.offset[getOffsetVarKey(sourceName)]
             code.extend(asmap.emitStackLoad(retDest, sourceOffset))
         else:
             code.extend(asmap.emitCopy(retDest, retSource))
-    elif isinstance(retVar, lex.TInt):
+    elif retVar.kind == lex.KIND_INT:
         code.extend(asmap.emitCopy(retDest, retSource))
 
     return code
 
-def getAsmPro(pro, asmap, assignments, props):
+def getAsmPro(lpro, asmap, assignments, props):
     maxOffset = getStackOffset(assignments)
     prologue, epilogue = getAsmProStackAllocations(asmap, maxOffset)
-    store, load = getAsmProStackStatements(pro.name, asmap, assignments, props)
-    expStatements = getAsmProExpressionStatements(pro.expressions, pro.name, asmap, assignments, props)
-    retStatement = getAsmProRetStatement(pro.ret, asmap, assignments)
+    store, load = getAsmProStackStatements(lpro.name, asmap, assignments, props)
+    teardown = load + epilogue
+    expStatements, returns = getAsmProExpressionStatements(lpro, lpro.name, asmap, assignments, props, teardown)
 
-    code = asmap.emitProName(pro.name)
+    code = asmap.emitProName(lpro.name)
     code.extend(prologue)
     code.extend(store)
     code.extend(expStatements)
-    code.extend(retStatement)
-    code.extend(load)
-    code.extend(epilogue)
+
+    if returns:
+        code.extend(getAsmProRetStatement(lpro.getRet(), asmap, assignments))
+        code.extend(teardown)
+        code.extend(asmap.emitRet())
 
     optimized = asmap.emitOptimized(code)
     return optimized
@@ -609,6 +746,11 @@ def getAsmMemCollection(mem, asmap):
 def getAsmMemSize(mem, asmap):
     return asmap.emitMemSize(mem.name, mem.size)
 
+MEMORY_STATEMENTS = {
+    par.EXP_KIND_MEM_COLLECTION: getAsmMemCollection,
+    par.EXP_KIND_MEM_SIZE: getAsmMemSize
+}
+
 # end memory block section
 
 ###
@@ -620,20 +762,24 @@ class AssignmentCollection:
         self.generalReg = generalReg
         self.offset = offset
 
+# every procedure is assigned registers before any is generated, so a call site knows
+# which registers its callee clobbers wherever the callee is in the module
 def generateProcedures(asmap, pros, props):
     code = []
     maxArgs = len(asmap.getArgumentRegs())
     allRegs = asmap.getRegistersToMap()
-    
-    for pro in pros:
+    generalDicts = [sar.getLinearAssignmentDict(allRegs, lpro, maxArgs) for lpro in pros]
+    clobbers = clb.getClobbers(pros, generalDicts, asmap)
+    props = par.ProcedureProperties(props.usesInt, clobbers)
+
+    for lpro, generalDict in zip(pros, generalDicts):
         if len(code) > 0:
             code.extend([''])
 
-        generalDict = sar.getAssignmentDict(allRegs, pro, maxArgs, lex.TVar)
-        offsetDict = getOffsetDict(pro, asmap, generalDict)
+        offsetDict = getOffsetDict(lpro, asmap, generalDict)
         assignments = AssignmentCollection(generalDict, offsetDict)
-        code.extend(getAsmPro(pro, asmap, assignments, props))
-        
+        code.extend(getAsmPro(lpro, asmap, assignments, props))
+
     return code
 
 def generateMemories(asmap, mems):
@@ -643,10 +789,8 @@ def generateMemories(asmap, mems):
         if len(code) > 0:
             code.extend([''])
 
-        if isinstance(mem, par.EMemCollection):
-            code.extend(getAsmMemCollection(mem, asmap))
-        elif isinstance(mem, par.EMemSize):
-            code.extend(getAsmMemSize(mem, asmap))
+        if mem.kind in MEMORY_STATEMENTS:
+            code.extend(MEMORY_STATEMENTS[mem.kind](mem, asmap))
         
     return code
 
@@ -688,24 +832,46 @@ def generateSections(exps):
     procedures = []
 
     for exp in exps:
-        if isinstance(exp, par.EPro):
+        if exp.kind == par.EXP_KIND_PRO:
             procedures.append(exp)
         else:
             memories.append(exp)
 
     return memories, procedures
 
-def generateCodeLinesFromText(text, asmap):
-    segments = lex.getSegments(text)
-    tokens = lex.getCodeTokens(segments)
-    exps = par.getExpressions(tokens)
-    mems, pros = generateSections(exps)
-    props = par.getProcedureProperties(pros)
-
+def generateCodeLinesFromSections(asmap, mems, pros, props):
     code = []
     code.extend(generateSectionText(asmap, pros, props))
     code.extend(generateSectionData(asmap, mems))
 
     return code
 
+def generateCodeLines(exps, asmap, level=0):
+    exps = opt.getOptimizedExpressions(exps, level, len(asmap.getRegistersToMap()))
+    mems, pros = generateSections(lir.getLinearExpressions(exps))
+    props = par.getProcedureProperties(pros)
+    return generateCodeLinesFromSections(asmap, mems, pros, props)
+
+def generateCodeLinesFromText(text, asmap, level=0):
+    tokens = lex.getTokens(text)
+    exps = par.getExpressions(tokens)
+    return generateCodeLines(exps, asmap, level)
+
+def getFileExpressions(source, jobs=1):
+    if jobs == 1:
+        return par.getExpressionStream(lex.getStreamTokens(source))
+
+    return pll.getExpressionsFromFile(source, jobs)
+
+def generateCodeLinesFromFile(source, asmap, level=0):
+    return generateCodeLines(getFileExpressions(source), asmap, level)
+
+def generateCodeLinesFromFileParallel(source, asmap, jobs=None, level=0):
+    return generateCodeLines(getFileExpressions(source, jobs), asmap, level)
+
+# binary modules skip the front end entirely
+def generateCodeLinesFromBinary(source, asmap):
+    module = bir.readModule(source)
+    return generateCodeLinesFromSections(asmap, module.memories, module.procedures, module.props)
+
 # end code generation section
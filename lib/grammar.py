@@ -48,6 +48,9 @@ MOD = 'mod'
 #####################
 
 SEPARATOR = '\n'
+STRING_DELIMITER = '"'
+COMMENT_START = '#'
+ESCAPE = '\\'
 INT = 'INT'
 CHAR = 'CHAR'
 STRING = 'STRING'
@@ -55,6 +58,14 @@ STRING = 'STRING'
 # assistant sets
 ################
 
+WHITE_SPACE_SET = {
+    ' ', '\t'
+}
+
+SKIP_SET = {
+    '\r'
+}
+
 BRA_SET = {
     MEM_LEFT_BRACE, MEM_RIGHT_BRACE,
     POINT_LEFT_BRACKET, POINT_RIGHT_BRACKET
@@ -177,35 +188,35 @@ def isUnescapedEnd(source, i, c):
     
     i -= 1
     count = 0
-    while (i >= 0 and source[i] == '\\'):
+    while (i >= 0 and source[i] == ESCAPE):
         i -= 1
         count += 1
 
     return count % 2 == 0
 
 def isStringStart(source, i):
-    return source[i] == '"'
+    return source[i] == STRING_DELIMITER
 
 def isStringStop(source, i):
-    return isUnescapedEnd(source, i, '"')
+    return isUnescapedEnd(source, i, STRING_DELIMITER)
 
 def isCommentStart(source, i):
-    return source[i] == '#'
+    return source[i] == COMMENT_START
 
 def isCommentStop(source, i):
-    return isUnescapedEnd(source, i, '\n')
+    return isUnescapedEnd(source, i, SEPARATOR)
 
 def isSeparator(source, i):
     c = source[i]
-    return c == '\n'
+    return c == SEPARATOR
 
 def isWhiteSpace(source, i):
     c = source[i]
-    return c == ' ' or c == '\t'
+    return c in WHITE_SPACE_SET
 
 def isCharToSkip(source, i):
     c = source[i]
-    return c == '\r'
+    return c in SKIP_SET
 
 def isBra(source, i):
     c = source[i]
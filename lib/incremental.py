@@ -0,0 +1,175 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.token_buffer as tb
+
+#
+# Incremental Parse Types
+#
+
+# blocks hold no offsets, so unchanged blocks are shared between parses as they are
+class Block:
+    def __init__(self, length, expressions, error):
+        self.length = length
+        self.expressions = expressions
+        self.error = error
+
+class IncrementalParse:
+    def __init__(self, text, starts, blocks):
+        self.text = text
+        self.starts = starts
+        self.blocks = blocks
+
+#
+# Block Functions
+#
+
+BLOCK_START_KINDS = {
+    lex.KIND_PRO_ID, lex.KIND_MEM_ID
+}
+
+def getBlockBoundaries(buffer):
+    boundaries = [0]
+    kinds = buffer.kinds
+
+    for i in range(1, len(kinds)):
+        if (kinds[i] in BLOCK_START_KINDS) and (kinds[i - 1] == lex.KIND_SEPARATOR):
+            boundaries.append(i)
+
+    return boundaries
+
+def getBlock(tokens, length):
+    try:
+        expressions = par.getExpressions(tokens)
+    except Exception as ex:
+        return Block(length, [], str(ex))
+
+    if None in expressions:
+        return Block(length, [], 'block must be complete')
+
+    return Block(length, expressions, None)
+
+def isCleanRegionStart(buffer):
+    return len(buffer) == 0 or buffer.kinds[0] in BLOCK_START_KINDS
+
+def isCleanRegionEnd(buffer, length):
+    # a region can be lexed on its own only if it ends with a separator that was not
+    # swallowed by a string or comment
+    count = len(buffer)
+
+    if length == 0:
+        return True
+
+    if count == 0:
+        return False
+
+    return buffer.kinds[count - 1] == lex.KIND_SEPARATOR and buffer.ends[count - 1] == length
+
+def getRegionBlocks(buffer, regionStart, regionLength):
+    starts = []
+    blocks = []
+    tokens = buffer.getTokens()
+    boundaries = getBlockBoundaries(buffer)
+    bend = len(boundaries)
+
+    for b in range(bend):
+        first = boundaries[b]
+        start = 0 if b == 0 else buffer.ends[first - 1]
+        end = regionLength
+
+        if b + 1 < bend:
+            end = buffer.ends[boundaries[b + 1] - 1]
+            last = boundaries[b + 1]
+        else:
+            last = len(tokens)
+
+        if end > start:
+            starts.append(regionStart + start)
+            blocks.append(getBlock(tokens[first:last], end - start))
+
+    return starts, blocks
+
+#
+# Incremental Parse Functions
+#
+
+def getParse(text):
+    buffer = tb.getTokenBuffer(text)
+    starts, blocks = getRegionBlocks(buffer, 0, len(text))
+    return IncrementalParse(text, starts, blocks)
+
+def getFirstAffectedBlock(starts, offset):
+    lo = 0
+    hi = len(starts)
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if starts[mid] < offset:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return max(lo - 1, 0)
+
+def getEditedParse(parse, offset, removedLength, insertedText):
+    old = parse.text
+
+    if offset < 0 or removedLength < 0 or offset + removedLength > len(old):
+        raise Exception('edit must be inside the parsed text')
+
+    text = old[:offset] + insertedText + old[offset + removedLength:]
+    delta = len(insertedText) - removedLength
+
+    starts = parse.starts
+    blocks = parse.blocks
+    bend = len(blocks)
+
+    if bend == 0:
+        return getParse(text)
+
+    first = getFirstAffectedBlock(starts, offset)
+    last = first + 1
+    editEnd = offset + removedLength
+
+    while last < bend and starts[last] <= editEnd:
+        last += 1
+
+    while True:
+        regionStart = starts[first]
+        regionEnd = len(text)
+        if last < bend:
+            regionEnd = starts[last] + delta
+
+        buffer = tb.getTokenBuffer(text[regionStart:regionEnd])
+
+        # the region grows until it splits into blocks the same way the whole text would
+        if first > 0 and (not isCleanRegionStart(buffer)):
+            first -= 1
+        elif last < bend and (not isCleanRegionEnd(buffer, regionEnd - regionStart)):
+            last += 1
+        else:
+            break
+
+    regionStarts, regionBlocks = getRegionBlocks(buffer, regionStart, regionEnd - regionStart)
+
+    newStarts = starts[:first] + regionStarts + [s + delta for s in starts[last:]]
+    newBlocks = blocks[:first] + regionBlocks + blocks[last:]
+
+    return IncrementalParse(text, newStarts, newBlocks)
+
+def getParseExpressions(parse):
+    expressions = []
+
+    for block in parse.blocks:
+        expressions.extend(block.expressions)
+
+    return expressions
+
+def getParseErrors(parse):
+    errors = []
+
+    for i in range(len(parse.blocks)):
+        block = parse.blocks[i]
+        if block.error is not None:
+            errors.append([parse.starts[i], block.error])
+
+    return errors
@@ -0,0 +1,140 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.statements as st
+import lib.folding as fold
+
+INLINE_LABEL_PREFIX = '@inl'
+
+# statements a call costs on top of the body it runs: the call and return, the frame of
+# the callee and moving the result out of the return register
+CALL_COST = 4
+
+# a callee is inlined while its body is at most this many statements larger than the call
+INLINE_COST_LIMIT = 8
+
+# statements inlining may add to one procedure
+INLINE_GROWTH_LIMIT = 64
+
+# calls reached through this many inlined bodies are left as calls
+INLINE_DEPTH_LIMIT = 3
+
+#
+# Cost Model
+#
+
+def getBodySize(pro):
+    return len([exp for exp in pro.expressions if exp.kind != par.EXP_KIND_LABEL])
+
+# every argument is a move into a register the copy of the parameter no longer needs
+def getInlineCost(callee, call):
+    return getBodySize(callee) - CALL_COST - len(call.params)
+
+def isInlinedOperand(t):
+    return fold.isWordVar(t) or st.isConstToken(t) or t.kind == lex.KIND_IDENTIFIER
+
+# the parameters and the result of an inlined body are plain copies, so only word values
+# can go through them
+def isInlinable(call, callee):
+    if len(call.params) != len(callee.params) or not fold.isWordVar(call.dest):
+        return False
+
+    if not all(fold.isWordVar(p) for p in callee.params):
+        return False
+
+    return all(isInlinedOperand(t) for t in call.params) and isInlinedOperand(callee.ret)
+
+#
+# Inliner
+#
+
+# a procedure takes its callees' bodies in place of the calls, a call keeps the chain of
+# procedures it was inlined through so a body is never inlined into itself
+class Inliner:
+    def __init__(self, pro, pros):
+        self.pro = pro
+        self.pros = pros
+        self.nextVar = st.getFirstFreeVar(pro)
+        self.labels = {exp.name for exp in pro.expressions if exp.kind == par.EXP_KIND_LABEL}
+        self.growth = 0
+        self.count = 0
+
+    def getFreshVar(self):
+        name = st.getVarName(self.nextVar)
+        self.nextVar += 1
+        return name
+
+    def getCallee(self, exp, chain):
+        if exp.kind != par.EXP_KIND_PRO_CALL or len(chain) >= INLINE_DEPTH_LIMIT:
+            return None
+
+        callee = self.pros.get(exp.id)
+
+        if callee is None or callee.name == self.pro.name or callee.name in chain:
+            return None
+
+        if not isInlinable(exp, callee) or getInlineCost(callee, exp) > INLINE_COST_LIMIT:
+            return None
+
+        if self.growth + getBodySize(callee) > INLINE_GROWTH_LIMIT:
+            return None
+
+        return callee
+
+    # every variable and label of the callee gets a fresh name in the caller
+    def getRenamedBody(self, callee, call):
+        vars = [t.name for t in callee.params + [callee.ret] if t.kind == lex.KIND_VAR]
+        for exp in callee.expressions:
+            vars.extend(sorted(exp.uses | exp.defs))
+
+        names = {}
+        for name in vars:
+            if name not in names:
+                names[name] = self.getFreshVar()
+
+        labels = {}
+        for exp in callee.expressions:
+            if exp.kind == par.EXP_KIND_LABEL:
+                labels[exp.name] = st.getFreshLabel(self.labels, INLINE_LABEL_PREFIX)
+
+        body = [par.ECopy(st.getRenamedToken(p, names), a) for p, a in zip(callee.params, call.params)]
+
+        for exp in callee.expressions:
+            if exp.kind == par.EXP_KIND_LABEL:
+                body.append(par.ELabel(labels[exp.name]))
+            elif exp.kind in {par.EXP_KIND_JUMP, par.EXP_KIND_CO_JUMP}:
+                body.append(st.getRetargetedJump(st.getRenamedStatement(exp, names, None), labels[exp.labelName]))
+            else:
+                dest = st.getDest(exp)
+                defName = names.get(dest.name) if dest is not None and dest.kind == lex.KIND_VAR else None
+                body.append(st.getRenamedStatement(exp, names, defName))
+
+        body.append(par.ECopy(call.dest, st.getRenamedToken(callee.ret, names)))
+        return body
+
+    def getInlinedExpressions(self, exps, chain):
+        inlined = []
+
+        for exp in exps:
+            callee = self.getCallee(exp, chain)
+
+            if callee is None:
+                inlined.append(exp)
+                continue
+
+            self.growth += getBodySize(callee)
+            self.count += 1
+            body = self.getRenamedBody(callee, exp)
+            inlined.extend(self.getInlinedExpressions(body, chain + [callee.name]))
+
+        return inlined
+
+# pros holds the procedures that came before this one, already optimized, so a body is
+# inlined the way it would run when called
+def getInlinedPro(pro, pros):
+    inliner = Inliner(pro, pros)
+    exps = inliner.getInlinedExpressions(pro.expressions, [])
+
+    if inliner.count == 0:
+        return pro
+
+    return par.EPro(pro.name, pro.params, exps, pro.ret)
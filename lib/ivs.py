@@ -0,0 +1,511 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.cfg as cfg
+import lib.ssa as ssa
+import lib.statements as st
+import lib.folding as fold
+import lib.sccp as sccp
+import lib.licm as licm
+
+# stands for the procedure return among the readers of a variable
+RET_USER = 'ret'
+
+# far enough past the end of the word that a variable stepping there has long wrapped
+PASS_LIMIT = 1 << 70
+
+#
+# Induction Variables
+#
+
+# a variable taking init + n * step on the n-th pass through its loop, counted from the
+# basic variable of the loop header it is computed from; a scaled one has a product in
+# the way, which is what adding the step each pass saves
+class Induction:
+    def __init__(self, root, step, exp, scaled):
+        self.root = root
+        self.step = step
+        self.exp = exp
+        self.scaled = scaled
+
+    def isBasic(self):
+        return self.exp.kind == par.EXP_KIND_PHI
+
+def isWordVarNamed(t, name):
+    return fold.isWordVar(t) and t.name == name
+
+def getDefs(form):
+    defs = {}
+
+    for block in form.cfg.blocks:
+        for exp in block.expressions:
+            for name in exp.defs:
+                defs[name] = exp
+
+    return defs
+
+def getCopiedDef(name, defs):
+    exp = defs.get(name)
+
+    while exp is not None and exp.kind == par.EXP_KIND_COPY and fold.isWordVar(exp.source):
+        exp = defs.get(exp.source.name)
+
+    return exp
+
+# a header phi is basic when the value it gets back from the latch is itself plus a constant
+def getBasicStep(phi, arg, defs):
+    if not fold.isWordVar(phi.dest) or not fold.isWordVar(arg):
+        return None
+
+    exp = getCopiedDef(arg.name, defs)
+    if exp is None or exp.kind != par.EXP_KIND_BIN_OP or exp.op not in {gram.ADD, gram.SUB}:
+        return None
+
+    name = phi.dest.name
+    step = None
+
+    if isWordVarNamed(exp.left, name):
+        step = fold.getConstValue(exp.right)
+    elif exp.op == gram.ADD and isWordVarNamed(exp.right, name):
+        step = fold.getConstValue(exp.left)
+
+    if step is None:
+        return None
+
+    if exp.op == gram.SUB:
+        return fold.getWrapped(-step, fold.WORD_WIDTH)
+
+    return step
+
+def isInvariant(t, loopDefs):
+    if fold.isWordVar(t):
+        return t.name not in loopDefs
+
+    return fold.getConstValue(t) is not None
+
+def getDerivedInduction(ivs, loopDefs, exp):
+    if exp.kind == par.EXP_KIND_COPY:
+        if fold.isWordVar(exp.source) and exp.source.name in ivs:
+            iv = ivs[exp.source.name]
+            return Induction(iv.root, iv.step, exp, iv.scaled)
+        return None
+
+    if exp.kind != par.EXP_KIND_BIN_OP:
+        return None
+
+    left = ivs.get(exp.left.name) if fold.isWordVar(exp.left) else None
+    right = ivs.get(exp.right.name) if fold.isWordVar(exp.right) else None
+
+    if left is not None and isInvariant(exp.right, loopDefs):
+        iv, other = left, exp.right
+    elif right is not None and isInvariant(exp.left, loopDefs):
+        iv, other = right, exp.left
+    else:
+        return None
+
+    if exp.op == gram.ADD:
+        return Induction(iv.root, iv.step, exp, iv.scaled)
+
+    if exp.op == gram.SUB:
+        step = iv.step if iv is left else fold.getWrapped(-iv.step, fold.WORD_WIDTH)
+        return Induction(iv.root, step, exp, iv.scaled)
+
+    if exp.op == gram.MUL and fold.getConstValue(other) is not None:
+        step = fold.getWrapped(iv.step * fold.getConstValue(other), fold.WORD_WIDTH)
+        return Induction(iv.root, step, exp, True)
+
+    return None
+
+#
+# Loop Inductions
+#
+
+# the induction variables of one loop, and the statements computing their first values
+# that go at the end of its preheader
+class LoopInductions:
+    def __init__(self, form, loop, preheader):
+        self.form = form
+        self.loop = loop
+        self.preheader = preheader
+        self.header = form.cfg.blocks[loop.header]
+        self.entry = self.header.preds.index(preheader)
+        self.exps = []
+        self.inits = {}
+        self.ivs = {}
+        self.defs = {}
+        self.setInductions()
+
+    def getLatch(self):
+        return self.header.preds[1 - self.entry]
+
+    def setInductions(self):
+        self.ivs = {}
+
+        if len(self.header.preds) != 2:
+            return
+
+        self.defs = getDefs(self.form)
+        loopDefs = licm.getLoopDefs(self.form, self.loop)
+
+        for phi in self.form.phis[self.loop.header]:
+            step = getBasicStep(phi, phi.args[1 - self.entry], self.defs)
+            if step is not None and step != 0:
+                self.ivs[phi.dest.name] = Induction(phi.dest.name, step, phi, False)
+
+        changed = len(self.ivs) > 0
+        while changed:
+            changed = False
+
+            for id in sorted(self.loop.blocks):
+                for exp in self.form.cfg.blocks[id].expressions:
+                    dest = st.getDest(exp)
+                    if dest is None or not fold.isWordVar(dest) or dest.name in self.ivs:
+                        continue
+
+                    iv = getDerivedInduction(self.ivs, loopDefs, exp)
+                    if iv is not None and iv.step != 0:
+                        self.ivs[dest.name] = iv
+                        changed = True
+
+    # the first value is the phi argument coming from the preheader, or the constant it
+    # copies, or the statement computing the variable played once on the first values of
+    # its operands
+    def getInit(self, name):
+        iv = self.ivs[name]
+
+        if iv.isBasic():
+            init = iv.exp.args[self.entry]
+            exp = getCopiedDef(init.name, self.defs) if fold.isWordVar(init) else None
+
+            if exp is not None and exp.kind == par.EXP_KIND_COPY and fold.getConstValue(exp.source) is not None:
+                return exp.source
+
+            return init
+
+        if name not in self.inits:
+            exp = iv.exp
+
+            if exp.kind == par.EXP_KIND_COPY:
+                self.inits[name] = self.getInit(exp.source.name)
+            else:
+                left = self.getOperandInit(exp.left)
+                right = self.getOperandInit(exp.right)
+                self.inits[name] = getEmittedBinOp(self.form, self.exps, exp.op, left, right)
+
+        return self.inits[name]
+
+    def getOperandInit(self, t):
+        if fold.isWordVar(t) and t.name in self.ivs:
+            return self.getInit(t.name)
+
+        return t
+
+#
+# Preheader Statements
+#
+
+# the code generator takes a variable on the left and an immediate on the right, anything
+# else is copied into a variable first
+def getEmittedOperand(form, exps, t, isLeft):
+    value = fold.getConstValue(t)
+
+    if value is None or (not isLeft and fold.isImmediate(value)):
+        return t
+
+    dest = lex.TVar(form.getFreshVar(), fold.WORD_WIDTH)
+    exps.append(par.ECopy(dest, fold.getConstToken(value)))
+    return dest
+
+def getEmittedBinOp(form, exps, op, left, right):
+    lv = fold.getConstValue(left)
+    rv = fold.getConstValue(right)
+
+    if lv is not None and rv is not None:
+        return fold.getConstToken(fold.getBinOpValue(op, lv, rv, fold.WORD_WIDTH))
+
+    if op in fold.COMMUTATIVE_OPS and lv is not None:
+        left, right = right, left
+
+    dest = lex.TVar(form.getFreshVar(), fold.WORD_WIDTH)
+    simplified = fold.getSimplifiedBinOp(dest, op, left, right)
+
+    if simplified is not None and simplified.kind == par.EXP_KIND_COPY:
+        return simplified.source
+
+    left = getEmittedOperand(form, exps, left, True)
+    right = getEmittedOperand(form, exps, right, False)
+    exps.append(par.EBinOp(dest, op, left, right))
+    return dest
+
+#
+# Strength Reduction
+#
+
+def getUsers(form):
+    users = {}
+
+    for block in form.cfg.blocks:
+        for exp in form.phis[block.id] + block.expressions:
+            for name in exp.uses:
+                users.setdefault(name, []).append(exp)
+
+    name = par.getTokenVar(form.ret)
+    if name is not None:
+        users.setdefault(name, []).append(RET_USER)
+
+    return users
+
+def isInductionExp(ivs, user):
+    return user is not RET_USER and any(ivs[name].exp is user for name in user.defs if name in ivs)
+
+# a scaled variable read by anything but another induction variable gets its own phi,
+# stepped once per pass on the latch, and the product feeding it is left unread
+def getReducible(lis, users):
+    return [name for name, iv in lis.ivs.items() if iv.scaled and not iv.isBasic()
+        and any(not isInductionExp(lis.ivs, user) for user in users.get(name, []))]
+
+def setReducedInduction(lis, name):
+    form = lis.form
+    iv = lis.ivs[name]
+    init = lis.getInit(name)
+    step = getEmittedOperand(form, lis.exps, fold.getConstToken(iv.step), False)
+
+    var = lex.TVar(form.getFreshVar(), fold.WORD_WIDTH)
+    stepped = lex.TVar(form.getFreshVar(), fold.WORD_WIDTH)
+    args = [init if i == lis.entry else stepped for i in range(len(lis.header.preds))]
+    form.phis[lis.loop.header].append(par.EPhi(var, args))
+
+    latch = form.cfg.blocks[lis.getLatch()]
+    licm.setPreheaderStatements(latch, [par.EBinOp(stepped, gram.ADD, var, step)])
+
+    for id in lis.loop.blocks:
+        block = form.cfg.blocks[id]
+        block.expressions = [par.ECopy(exp.dest, var) if exp is iv.exp else exp for exp in block.expressions]
+
+#
+# Exit Tests
+#
+
+# a conditional jump of the loop comparing an induction variable with an invariant
+def getTestedInduction(lis, loopDefs, exp):
+    if exp.kind != par.EXP_KIND_CO_JUMP:
+        return None
+
+    if fold.isWordVar(exp.left) and exp.left.name in lis.ivs and isInvariant(exp.right, loopDefs):
+        return exp.left.name
+
+    if fold.isWordVar(exp.right) and exp.right.name in lis.ivs and isInvariant(exp.left, loopDefs):
+        return exp.right.name
+
+    return None
+
+def getTests(lis):
+    loopDefs = licm.getLoopDefs(lis.form, lis.loop)
+    tests = {}
+
+    for id in sorted(lis.loop.blocks):
+        for exp in lis.form.cfg.blocks[id].expressions:
+            name = getTestedInduction(lis, loopDefs, exp)
+            if name is not None:
+                tests.setdefault(lis.ivs[name].root, []).append((id, exp, name))
+
+    return tests
+
+def getStepRatio(step, other):
+    if other % step != 0 or other // step <= 0:
+        return None
+
+    return other // step
+
+def getOrientedTest(exp, name):
+    if isWordVarNamed(exp.left, name):
+        return exp.name, exp.right
+
+    return fold.SWAPPED_JUMPS[exp.name], exp.left
+
+def isWordValue(value):
+    return fold.getWrapped(value, fold.WORD_WIDTH) == value
+
+# the first pass on which the test of a variable stepping from init gives the outcome it
+# keeps from then on, before either wraps
+def getSettledPass(op, init, step, bound):
+    compare = sccp.COMPARISONS[op]
+    settled = compare(init + PASS_LIMIT * step, bound)
+    lo = 0
+    hi = PASS_LIMIT
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if compare(init + mid * step, bound) == settled:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    return lo, settled
+
+# add and mul wrap around, so a test only moves to the other variable when it holds the
+# same way on every pass the loop makes: an equality does when the ratio is odd, which
+# has an inverse modulo the word; an ordered test does when the first values and the
+# bound are constants, the test runs on every pass and leaves the loop once its outcome
+# settles, and neither variable nor the new bound leaves the word before then
+def isRewritableTest(lis, id, exp, name, other):
+    ratio = getStepRatio(lis.ivs[name].step, lis.ivs[other].step)
+    op, bound = getOrientedTest(exp, name)
+
+    if op in {gram.JIE, gram.JIN}:
+        return ratio % 2 == 1
+
+    init = fold.getConstValue(lis.getInit(name))
+    otherInit = fold.getConstValue(lis.getInit(other))
+    n = fold.getConstValue(bound)
+
+    if init is None or otherInit is None or n is None:
+        return False
+
+    graph = lis.form.cfg
+    if not graph.dominates(id, lis.getLatch()):
+        return False
+
+    step = lis.ivs[name].step
+    count, settled = getSettledPass(op, init, step, n)
+    target = graph.labels[exp.labelName]
+    exits = [target] if settled else [s for s in graph.blocks[id].succs if s != target]
+
+    if len(exits) == 0 or any(s in lis.loop.blocks for s in exits):
+        return False
+
+    values = [init + count * step, otherInit + count * step * ratio, otherInit + (n - init) * ratio]
+    return all(isWordValue(v) for v in values)
+
+# both variables move the same way once a pass, so a test of one against a bound is the
+# same test of the other against the bound it has then
+def getRewrittenTest(lis, exp, name, other):
+    ratio = getStepRatio(lis.ivs[name].step, lis.ivs[other].step)
+    var = lex.TVar(other, fold.WORD_WIDTH)
+    op, bound = getOrientedTest(exp, name)
+
+    form = lis.form
+    count = getEmittedBinOp(form, lis.exps, gram.SUB, bound, lis.getInit(name))
+    offset = getEmittedBinOp(form, lis.exps, gram.MUL, count, fold.getConstToken(ratio))
+    bound = getEmittedBinOp(form, lis.exps, gram.ADD, lis.getInit(other), offset)
+    bound = getEmittedOperand(form, lis.exps, bound, False)
+
+    return par.ECoJump(op, var, bound, exp.labelName)
+
+def setReplacedStatement(block, exp, replacement):
+    block.expressions = [replacement if e is exp else e for e in block.expressions]
+
+# induction variables only read by each other are a cycle liveness never finds dead
+def getDeadInductions(lis):
+    users = getUsers(lis.form)
+    dead = set(lis.ivs)
+    changed = True
+
+    while changed:
+        changed = False
+
+        for name in list(dead):
+            if any(user is RET_USER or not (user.defs & dead) for user in users.get(name, [])):
+                dead.discard(name)
+                changed = True
+
+    return dead
+
+def setDeadInductionsRemoved(lis, dead):
+    form = lis.form
+    form.phis[lis.loop.header] = [phi for phi in form.phis[lis.loop.header] if phi.dest.name not in dead]
+
+    for id in lis.loop.blocks:
+        block = form.cfg.blocks[id]
+        block.expressions = [exp for exp in block.expressions if not (exp.defs & dead)]
+
+# the tests of a basic variable move to another one in steps of a multiple of it, which is
+# kept when the basic variable then has nothing left to count for
+def setRewrittenTests(lis, root, tests):
+    others = [name for name, iv in lis.ivs.items() if iv.isBasic() and name != root]
+
+    for other in others:
+        if any(getStepRatio(lis.ivs[name].step, lis.ivs[other].step) is None for _, _, name in tests):
+            continue
+
+        count = len(lis.exps)
+        inits = dict(lis.inits)
+
+        if not all(isRewritableTest(lis, id, exp, name, other) for id, exp, name in tests):
+            del lis.exps[count:]
+            lis.inits = inits
+            continue
+
+        rewritten = [(id, exp, getRewrittenTest(lis, exp, name, other)) for id, exp, name in tests]
+
+        for id, exp, test in rewritten:
+            setReplacedStatement(lis.form.cfg.blocks[id], exp, test)
+
+        if root in getDeadInductions(lis):
+            return True
+
+        for id, exp, test in rewritten:
+            setReplacedStatement(lis.form.cfg.blocks[id], test, exp)
+
+        del lis.exps[count:]
+        lis.inits = inits
+
+    return False
+
+#
+# Loops
+#
+
+def setReducedLoop(lis, budget):
+    changed = False
+
+    for name in getReducible(lis, getUsers(lis.form))[:max(budget, 0)]:
+        setReducedInduction(lis, name)
+        changed = True
+
+    if changed:
+        lis.inits = {}
+        lis.setInductions()
+
+    for root, tests in getTests(lis).items():
+        changed = setRewrittenTests(lis, root, tests) or changed
+
+    dead = getDeadInductions(lis)
+    if len(dead) > 0:
+        setDeadInductionsRemoved(lis, dead)
+        changed = True
+
+    return changed
+
+# inner loops go first, and a new induction variable takes a register all through its loop
+def setReducedInductions(form, pressures, registerCount):
+    changed = False
+
+    for loop in sorted(form.cfg.loops, key=lambda l: -l.depth):
+        preheader = licm.getPreheader(form.cfg, loop)
+
+        if preheader is None:
+            continue
+
+        lis = LoopInductions(form, loop, preheader)
+        budget = registerCount - max([pressures[id] for id in loop.blocks])
+
+        if len(lis.ivs) > 0 and setReducedLoop(lis, budget):
+            licm.setPreheaderStatements(form.cfg.blocks[preheader], lis.exps)
+            changed = True
+
+    return changed
+
+def getInductionReducedPro(pro, registerCount):
+    if not ssa.isSsaCandidate(pro):
+        return pro
+
+    retNames = [n for n in [par.getTokenVar(pro.ret)] if n is not None]
+    exps = licm.getPreheaderCode(cfg.getReachableCode(pro.expressions))
+    form = ssa.getSsaPro(par.EPro(pro.name, pro.params, exps, pro.ret))
+
+    if len(form.cfg.loops) == 0 or not setReducedInductions(form, licm.getPressures(exps, retNames), registerCount):
+        return pro
+
+    exps = cfg.getUnusedLabelsRemoved(ssa.getExpressionsFromSsa(form))
+    return par.EPro(pro.name, pro.params, exps, form.ret)
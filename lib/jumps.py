@@ -0,0 +1,161 @@
+import lib.grammar as gram
+import lib.parser as par
+import lib.cfg as cfg
+import lib.statements as st
+
+# the conditional jump taken exactly when the other one is not
+INVERTED_JUMPS = {
+    gram.JIL: gram.JIGE,
+    gram.JILE: gram.JIG,
+    gram.JIE: gram.JIN,
+    gram.JIN: gram.JIE,
+    gram.JIGE: gram.JIL,
+    gram.JIG: gram.JILE
+}
+
+#
+# Jump Threading
+#
+
+# a block holding nothing but a jump is passed straight through, a chain going round in a
+# circle stops where it started
+def getThreadedLabel(graph, labelName):
+    seen = set()
+
+    while labelName not in seen:
+        seen.add(labelName)
+        block = graph.blocks[graph.labels[labelName]]
+        body = [exp for exp in block.expressions if exp.kind != par.EXP_KIND_LABEL]
+
+        if len(body) != 1 or body[0].kind != par.EXP_KIND_JUMP:
+            break
+
+        labelName = body[0].labelName
+
+    return labelName
+
+def getThreadedCode(exps):
+    graph = cfg.getCfg(exps)
+    threaded = []
+
+    for exp in exps:
+        if exp.kind in cfg.JUMP_KINDS:
+            labelName = getThreadedLabel(graph, exp.labelName)
+            if labelName != exp.labelName:
+                exp = st.getRetargetedJump(exp, labelName)
+
+        threaded.append(exp)
+
+    return threaded
+
+#
+# Branch Simplification
+#
+
+# the labels right after a statement are where it falls through to
+def getFollowingLabels(exps, i):
+    labels = set()
+
+    for exp in exps[i + 1:]:
+        if exp.kind != par.EXP_KIND_LABEL:
+            break
+        labels.add(exp.name)
+
+    return labels
+
+def isJumpToNext(exps, i):
+    return exps[i].kind in cfg.JUMP_KINDS and exps[i].labelName in getFollowingLabels(exps, i)
+
+# a conditional jump over a jump goes where the jump does on the opposite condition
+def isJumpOverJump(exps, i):
+    if exps[i].kind != par.EXP_KIND_CO_JUMP or i + 1 >= len(exps) or exps[i + 1].kind != par.EXP_KIND_JUMP:
+        return False
+
+    return exps[i].labelName in getFollowingLabels(exps, i + 1)
+
+# comparisons have no side effects, so a jump going nowhere else goes altogether
+def getSimplifiedBranches(exps):
+    simplified = []
+    i = 0
+
+    while i < len(exps):
+        exp = exps[i]
+
+        if isJumpOverJump(exps, i):
+            simplified.append(par.ECoJump(INVERTED_JUMPS[exp.name], exp.left, exp.right, exps[i + 1].labelName))
+            i += 2
+            continue
+
+        if not isJumpToNext(exps, i):
+            simplified.append(exp)
+
+        i += 1
+
+    return simplified
+
+#
+# Block Merging
+#
+
+# a block only reached by one jump and leaving by a jump of its own is put in place of
+# that jump, so one of the two jumps goes; the entry block stays first
+def getMergedBlock(graph):
+    for block in graph.blocks:
+        last = block.getLast()
+
+        if last is None or last.kind != par.EXP_KIND_JUMP:
+            continue
+
+        target = graph.blocks[graph.labels[last.labelName]]
+        targetLast = target.getLast()
+
+        if target.id not in {0, block.id} and target.preds == [block.id] and targetLast is not None and targetLast.kind == par.EXP_KIND_JUMP:
+            return block, target
+
+    return None
+
+def getMergedCode(exps):
+    graph = cfg.getCfg(exps)
+    merged = getMergedBlock(graph)
+
+    if merged is None:
+        return exps
+
+    block, target = merged
+    code = []
+
+    for b in graph.blocks:
+        if b is block:
+            code.extend(b.expressions[:-1])
+            code.extend(target.expressions)
+        elif b is not target:
+            code.extend(b.expressions)
+
+    return code
+
+#
+# Simplified Procedure
+#
+
+def isSameCode(a, b):
+    return len(a) == len(b) and all(a[i] is b[i] for i in range(len(a)))
+
+# each step can open the way for another, a threaded jump may go to the next block and a
+# merged block may end in one, so they run until the code stays the same
+def getJumpsSimplifiedCode(exps):
+    while True:
+        simplified = getSimplifiedBranches(getThreadedCode(exps))
+        simplified = cfg.getReachableCode(getMergedCode(simplified))
+
+        if isSameCode(simplified, exps):
+            return exps
+
+        exps = simplified
+
+def getJumpsSimplifiedPro(pro):
+    exps = getJumpsSimplifiedCode(pro.expressions)
+
+    if exps is pro.expressions:
+        return pro
+
+    return par.EPro(pro.name, pro.params, exps, pro.ret)
@@ -1,10 +1,42 @@
+import mmap
+import re
+from os import PathLike
+
 import lib.grammar as gram
 
+#
+# Token Kinds
+#
+
+KIND_SEPARATOR = 0
+KIND_INT = 1
+KIND_CHAR = 2
+KIND_STRING = 3
+KIND_VAR = 4
+KIND_LABEL = 5
+KIND_JUMP = 6
+KIND_CO_JUMP = 7
+KIND_ASSIGN = 8
+KIND_UN_OP = 9
+KIND_BIN_OP = 10
+KIND_IDENTIFIER = 11
+KIND_PRO_ID = 12
+KIND_PRO_RET = 13
+KIND_MEM_ID = 14
+KIND_MEM_LEFT_B = 15
+KIND_MEM_RIGHT_B = 16
+KIND_POINT_LEFT_B = 17
+KIND_POINT_RIGHT_B = 18
+KIND_POINTER = 19
+KIND_TOKEN = 20
+
 #
 # Token Types
 #
 
 class Token:
+    kind = KIND_TOKEN
+
     def __init__(self, name):
         self.name = name
 
@@ -12,6 +44,8 @@ class Token:
         return self.name
 
 class TInt(Token):
+    kind = KIND_INT
+
     def __init__(self, name, value):
         super().__init__(name)
         self.value = value
@@ -20,6 +54,8 @@ class TInt(Token):
         return '{ TInt: ' + self.value + ' }'
 
 class TChar(Token):
+    kind = KIND_CHAR
+
     def __init__(self, name, value):
         super().__init__(name)
         self.value = value
@@ -28,6 +64,8 @@ class TChar(Token):
         return '{ TChar: ' + self.value + ' }'
 
 class TString(Token):
+    kind = KIND_STRING
+
     def __init__(self, name, value):
         super().__init__(name)
         self.value = value
@@ -36,6 +74,8 @@ class TString(Token):
         return '{ TString: ' + self.value + ' }'
 
 class TVar(Token):
+    kind = KIND_VAR
+
     def __init__(self, name, width):
         super().__init__(name)
         self.width = width
@@ -44,6 +84,8 @@ class TVar(Token):
         return '{ TVar: ' + self.name + ' ' + str(self.width) + ' }'
 
 class TLabel(Token):
+    kind = KIND_LABEL
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -51,6 +93,8 @@ class TLabel(Token):
         return '{ TLabel: ' + self.name + ' }'
 
 class TJump(Token):
+    kind = KIND_JUMP
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -58,6 +102,8 @@ class TJump(Token):
         return '{ TJump: ' + self.name + ' }'
 
 class TCoJump(Token):
+    kind = KIND_CO_JUMP
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -65,6 +111,8 @@ class TCoJump(Token):
         return '{ TCoJump: ' + self.name + ' }'
 
 class TAssign(Token):
+    kind = KIND_ASSIGN
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -72,6 +120,8 @@ class TAssign(Token):
         return '{ TAssign: ' + self.name + ' }'
 
 class TUnOp(Token):
+    kind = KIND_UN_OP
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -79,6 +129,8 @@ class TUnOp(Token):
         return '{ TUnOp: ' + self.name + ' }'
     
 class TBinOp(Token):
+    kind = KIND_BIN_OP
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -86,6 +138,8 @@ class TBinOp(Token):
         return '{ TBinOp: ' + self.name + ' }'
 
 class TSeparator(Token):
+    kind = KIND_SEPARATOR
+
     def __init__(self, name):
         super().__init__(name)
     
@@ -93,6 +147,8 @@ class TSeparator(Token):
         return '{ TSeparator }'
 
 class TIdentifier(Token):
+    kind = KIND_IDENTIFIER
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -100,6 +156,8 @@ class TIdentifier(Token):
         return '{ TIdentifier: ' + self.name + ' }'
 
 class TProId(Token):
+    kind = KIND_PRO_ID
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -107,6 +165,8 @@ class TProId(Token):
         return '{ TProId: ' + self.name + ' }'
 
 class TProRet(Token):
+    kind = KIND_PRO_RET
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -114,6 +174,8 @@ class TProRet(Token):
         return '{ TProRet: ' + self.name + ' }'
 
 class TMemId(Token):
+    kind = KIND_MEM_ID
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -121,6 +183,8 @@ class TMemId(Token):
         return '{ TMemId: ' + self.name + ' }'
 
 class TMemLeftB(Token):
+    kind = KIND_MEM_LEFT_B
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -128,6 +192,8 @@ class TMemLeftB(Token):
         return '{ TMemLeftB: "' + self.name + '" }'
 
 class TMemRightB(Token):
+    kind = KIND_MEM_RIGHT_B
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -135,6 +201,8 @@ class TMemRightB(Token):
         return '{ TMemRightB: "' + self.name + '" }'
 
 class TPointLeftB(Token):
+    kind = KIND_POINT_LEFT_B
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -142,6 +210,8 @@ class TPointLeftB(Token):
         return '{ TPointLeftB: "' + self.name + '" }'
 
 class TPointRightB(Token):
+    kind = KIND_POINT_RIGHT_B
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -150,6 +220,8 @@ class TPointRightB(Token):
 
 # compound token type used in parser
 class TPointer(Token):
+    kind = KIND_POINTER
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -169,7 +241,7 @@ def getSegments(source):
     for i in range(len(source)):
         if inString:
             segment += source[i]
-            if gram.isStringStop(i):
+            if gram.isStringStop(source, i):
                 segments.append(segment)
                 segment = ''
                 inString = False
@@ -209,50 +281,250 @@ def getSegments(source):
 
     return segments
 
+def getCodeToken(s):
+    if gram.isInt(s) or gram.isHexInt(s):
+        return TInt(gram.INT, s)
+    elif gram.isChar(s):
+        return TChar(gram.CHAR, s)
+    elif gram.isString(s):
+        st = s[1:-1]
+        return TString(gram.STRING, st)
+    elif gram.isVar(s):
+        var, width = gram.getVarComponents(s)
+        return TVar(var, width)
+    elif gram.isLabel(s):
+        return TLabel(s)
+    elif gram.isJump(s):
+        return TJump(s)
+    elif gram.isCoJump(s):
+        return TCoJump(s)
+    elif gram.isUnOp(s):
+        return TUnOp(s)
+    elif gram.isBinOp(s):
+        return TBinOp(s)
+    elif s == gram.SEPARATOR:
+        return TSeparator(s)
+    elif s == gram.ASSIGN:
+        return TAssign(s)
+    elif s == gram.PRO_ID:
+        return TProId(s)
+    elif s == gram.PRO_RET:
+        return TProRet(s)
+    elif s == gram.MEM_ID:
+        return TMemId(s)
+    elif s == gram.MEM_LEFT_BRACE:
+        return TMemLeftB(s)
+    elif s == gram.MEM_RIGHT_BRACE:
+        return TMemRightB(s)
+    elif s == gram.POINT_LEFT_BRACKET:
+        return TPointLeftB(s)
+    elif s == gram.POINT_RIGHT_BRACKET:
+        return TPointRightB(s)
+
+    # used for procedures and memory names
+    return TIdentifier(s)
+
 def getCodeTokens(segments):
+    return [getCodeToken(s) for s in segments]
+
+#
+# Regex Engine
+#
+
+ENGINE_SEGMENTS = 'segments'
+ENGINE_REGEX = 'regex'
+
+KEYWORD_TOKENS = {
+    gram.JUMP: TJump,
+    gram.ASSIGN: TAssign,
+    gram.PRO_ID: TProId,
+    gram.PRO_RET: TProRet,
+    gram.MEM_ID: TMemId,
+    gram.MEM_LEFT_BRACE: TMemLeftB,
+    gram.MEM_RIGHT_BRACE: TMemRightB,
+    gram.POINT_LEFT_BRACKET: TPointLeftB,
+    gram.POINT_RIGHT_BRACKET: TPointRightB
+}
+
+KEYWORD_TOKENS.update({j: TCoJump for j in gram.CO_JUMP_SET})
+KEYWORD_TOKENS.update({u: TUnOp for u in gram.UNOP_SET})
+KEYWORD_TOKENS.update({b: TBinOp for b in gram.BINOP_SET})
+
+VAR_WIDTHS = {
+    '': 8,
+    'b': 1,
+    'w': 2,
+    'd': 4
+}
+
+def getCharClass(chars):
+    return ''.join([re.escape(c) for c in sorted(chars)])
+
+# a segment is a run of plain characters that may end in one string or comment,
+# which is how getSegments groups characters
+def getMasterPatternSource():
+    sep = getCharClass({gram.SEPARATOR})
+    ws = getCharClass(gram.WHITE_SPACE_SET)
+    bra = getCharClass(gram.BRA_SET)
+    quote = getCharClass({gram.STRING_DELIMITER})
+    comment = getCharClass({gram.COMMENT_START})
+    esc = getCharClass({gram.ESCAPE})
+
+    plain = '[^' + sep + ws + bra + quote + comment + ']*'
+    string = '[' + quote + '](?:[^' + quote + esc + ']|[' + esc + '][\\s\\S]?)*[' + quote + ']?'
+    comm = '[' + comment + '](?:[^' + sep + esc + ']|[' + esc + '][\\s\\S]?)*[' + sep + ']?'
+
+    return ''.join([
+        '[' + ws + ']*',
+        '(?:([' + sep + '])',
+        '|([' + bra + '])',
+        '|(?=[^' + sep + ws + bra + '])',
+        '(' + plain + ')',
+        '(' + string + '|' + comm + ')?)'
+    ])
+
+MASTER_PATTERN = re.compile(getMasterPatternSource())
+
+# groups of the master pattern
+GROUP_SEP = 1
+GROUP_BRA = 2
+GROUP_PLAIN = 3
+GROUP_TAIL = 4
+
+WORD_PATTERN = re.compile('(-?[0-9]+|0[xX][0-9a-fA-F]+)|(x[0-9]+)([bwd]?)|(@.{2,})|([A-Za-z_!][A-Za-z0-9_!]*)')
+
+def getWordToken(s):
+    keyword = KEYWORD_TOKENS.get(s)
+    if keyword is not None:
+        return keyword(s)
+
+    m = WORD_PATTERN.fullmatch(s)
+    if m is not None:
+        group = m.lastindex
+        if group == 1:
+            return TInt(gram.INT, s)
+        elif group == 3:
+            return TVar(m.group(2), VAR_WIDTHS[m.group(3)])
+        elif group == 4:
+            return TLabel(s)
+        elif group == 5:
+            return TIdentifier(s)
+
+    return getCodeToken(s)
+
+WORD_GROUP_KINDS = {
+    1: KIND_INT,
+    3: KIND_VAR,
+    4: KIND_LABEL,
+    5: KIND_IDENTIFIER
+}
+
+def getWordKind(s):
+    keyword = KEYWORD_TOKENS.get(s)
+    if keyword is not None:
+        return keyword.kind
+
+    m = WORD_PATTERN.fullmatch(s)
+    if m is not None:
+        return WORD_GROUP_KINDS[m.lastindex]
+
+    return getCodeToken(s).kind
+
+def getRegexTokens(source):
     tokens = []
+    skip = ''.join(gram.SKIP_SET)
+
+    for m in MASTER_PATTERN.finditer(source):
+        group = m.lastindex
 
-    for s in segments:
-        if gram.isInt(s) or gram.isHexInt(s):
-            tokens.append(TInt(gram.INT, s))
-        elif gram.isChar(s):
-            tokens.append(TChar(gram.CHAR, s))
-        elif gram.isString(s):
-            st = s[1:-1]
-            tokens.append(TString(gram.STRING, st))
-        elif gram.isVar(s):
-            var, width = gram.getVarComponents(s)
-            tokens.append(TVar(var, width))
-        elif gram.isLabel(s):
-            tokens.append(TLabel(s))
-        elif gram.isJump(s):
-            tokens.append(TJump(s))
-        elif gram.isCoJump(s):
-            tokens.append(TCoJump(s))
-        elif gram.isUnOp(s):
-            tokens.append(TUnOp(s))
-        elif gram.isBinOp(s):
-            tokens.append(TBinOp(s))
-        elif s == gram.SEPARATOR:
-            tokens.append(TSeparator(s))
-        elif s == gram.ASSIGN:
-            tokens.append(TAssign(s))
-        elif s == gram.PRO_ID:
-            tokens.append(TProId(s))
-        elif s == gram.PRO_RET:
-            tokens.append(TProRet(s))
-        elif s == gram.MEM_ID:
-            tokens.append(TMemId(s))
-        elif s == gram.MEM_LEFT_BRACE:
-            tokens.append(TMemLeftB(s))
-        elif s == gram.MEM_RIGHT_BRACE:
-            tokens.append(TMemRightB(s))
-        elif s == gram.POINT_LEFT_BRACKET:
-            tokens.append(TPointLeftB(s))
-        elif s == gram.POINT_RIGHT_BRACKET:
-            tokens.append(TPointRightB(s))
+        if group == GROUP_SEP:
+            tokens.append(TSeparator(gram.SEPARATOR))
+        elif group == GROUP_BRA:
+            s = m.group(GROUP_BRA)
+            tokens.append(KEYWORD_TOKENS[s](s))
         else:
-            # used for procedures and memory names
-            tokens.append(TIdentifier(s))
+            s = m.group(GROUP_PLAIN)
+
+            for c in skip:
+                if c in s:
+                    s = s.replace(c, '')
+
+            if group == GROUP_TAIL:
+                s += m.group(GROUP_TAIL)
+
+            if len(s) > 0:
+                tokens.append(getWordToken(s))
 
     return tokens
+
+#
+# Stream Engine
+#
+
+STREAM_ENCODING = 'utf-8'
+
+STREAM_PATTERN = re.compile(getMasterPatternSource().encode(STREAM_ENCODING))
+
+STREAM_SKIP = [c.encode(STREAM_ENCODING) for c in gram.SKIP_SET]
+
+def getBufferTokens(buffer):
+    for m in STREAM_PATTERN.finditer(buffer):
+        group = m.lastindex
+
+        if group == GROUP_SEP:
+            yield TSeparator(gram.SEPARATOR)
+        elif group == GROUP_BRA:
+            s = m.group(GROUP_BRA).decode(STREAM_ENCODING)
+            yield KEYWORD_TOKENS[s](s)
+        else:
+            b = m.group(GROUP_PLAIN)
+
+            for c in STREAM_SKIP:
+                if c in b:
+                    b = b.replace(c, b'')
+
+            if group == GROUP_TAIL:
+                b += m.group(GROUP_TAIL)
+
+            if len(b) > 0:
+                yield getWordToken(b.decode(STREAM_ENCODING))
+
+def getFileTokens(file):
+    try:
+        fileno = file.fileno()
+    except (AttributeError, OSError):
+        fileno = -1
+
+    if fileno < 0:
+        if hasattr(file, 'getbuffer'):
+            yield from getBufferTokens(file.getbuffer())
+        else:
+            yield from getBufferTokens(file.read())
+        return
+
+    try:
+        buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # empty files can not be mapped
+        return
+
+    try:
+        yield from getBufferTokens(buffer)
+    finally:
+        buffer.close()
+
+# tokens are yielded lazily from a memory mapped file, so the source text is never read whole
+def getStreamTokens(source):
+    if isinstance(source, (str, bytes, PathLike)):
+        with open(source, 'rb') as file:
+            yield from getFileTokens(file)
+    else:
+        yield from getFileTokens(source)
+
+def getTokens(source, engine=ENGINE_REGEX):
+    if engine == ENGINE_REGEX:
+        return getRegexTokens(source)
+    elif engine == ENGINE_SEGMENTS:
+        return getCodeTokens(getSegments(source))
+
+    raise Exception('lexer engine not found')
@@ -0,0 +1,214 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.cfg as cfg
+import lib.dataflow as dfa
+import lib.ssa as ssa
+import lib.statements as st
+import lib.folding as fold
+import lib.dce as dce
+
+PREHEADER_LABEL_PREFIX = '@pre'
+
+#
+# Preheaders
+#
+
+# the block a loop is entered from, when it is the only one and goes nowhere else
+def getPreheader(graph, loop):
+    outside = [p for p in graph.blocks[loop.header].preds if p not in loop.blocks]
+
+    if len(outside) == 1 and graph.blocks[outside[0]].succs == [loop.header]:
+        return outside[0]
+
+    return None
+
+def isFallingThrough(block):
+    last = block.getLast()
+    return last is None or last.kind != par.EXP_KIND_JUMP
+
+# a loop without a preheader gets a block in front of its header that only jumps to it,
+# jumps from outside the loop go to it and a loop block falling into the header jumps over it
+def getPreheaderCode(exps):
+    graph = cfg.getCfg(exps)
+    labels = set(graph.labels)
+    inserts = {}
+    targets = {}
+
+    for loop in graph.loops:
+        if getPreheader(graph, loop) is not None:
+            continue
+
+        header = graph.blocks[loop.header]
+        label = st.getFreshLabel(labels, PREHEADER_LABEL_PREFIX)
+        inserts[loop.header] = [par.ELabel(label), par.EJump(gram.JUMP, header.label)]
+
+        if (loop.header - 1) in loop.blocks and isFallingThrough(graph.blocks[loop.header - 1]):
+            inserts[loop.header].insert(0, par.EJump(gram.JUMP, header.label))
+
+        for p in header.preds:
+            if p not in loop.blocks:
+                targets[(p, loop.header)] = label
+
+    if len(inserts) == 0:
+        return exps
+
+    code = []
+
+    for block in graph.blocks:
+        code.extend(inserts.get(block.id, []))
+        code.extend(block.expressions)
+
+        last = block.getLast()
+        if last is not None and last.kind in cfg.JUMP_KINDS:
+            target = (block.id, graph.labels[last.labelName])
+            if target in targets:
+                code[-1] = st.getRetargetedJump(last, targets[target])
+
+    return code
+
+#
+# Register Pressure
+#
+
+# the most variables a block holds at once, read, written or live across a statement
+def getBlockPressure(liveness, block):
+    live = liveness.outs[block.id]
+    pressure = 0
+
+    for expUses, expDefs in reversed(liveness.bits[block.id]):
+        pressure = max(pressure, (live | expUses | expDefs).bit_count())
+        live = (live & ~expDefs) | expUses
+
+    return pressure
+
+def getPressures(exps, retNames):
+    liveness = dfa.getLiveness(cfg.getCfg(exps), retNames)
+    return [getBlockPressure(liveness, block) for block in liveness.cfg.blocks]
+
+#
+# Hoisting
+#
+
+# only statements that can run whether or not the loop would have reached them are moved,
+# loads stay since a store through any pointer may change what they read
+def isHoistable(exp):
+    if exp.kind == par.EXP_KIND_COPY:
+        return fold.isWordVar(exp.dest) and exp.source.kind == lex.KIND_IDENTIFIER
+
+    if exp.kind == par.EXP_KIND_UN_OP:
+        return fold.isWordVar(exp.dest)
+
+    if exp.kind == par.EXP_KIND_BIN_OP:
+        return fold.isWordVar(exp.dest) and (exp.op not in fold.DIVISION_OPS or dce.isSafeDivision(exp))
+
+    return False
+
+def getLoopDefs(form, loop):
+    defs = set()
+
+    for id in loop.blocks:
+        defs.update([phi.dest.name for phi in form.phis[id]])
+        for exp in form.cfg.blocks[id].expressions:
+            defs.update(exp.defs)
+
+    return defs
+
+# every variable of the ssa form has one definition, so a statement reading nothing the loop
+# defines is invariant, and once moved its own result no longer counts as defined in it;
+# each statement comes after the invariant statements it reads
+def getInvariantStatements(form, loop):
+    defs = getLoopDefs(form, loop)
+    invariants = []
+    changed = True
+
+    while changed:
+        changed = False
+
+        for id in sorted(loop.blocks):
+            for exp in form.cfg.blocks[id].expressions:
+                if isHoistable(exp) and not (exp.uses & defs) and (exp.defs & defs):
+                    invariants.append(exp)
+                    defs.difference_update(exp.defs)
+                    changed = True
+
+    return invariants
+
+def getLoopUses(form, loop, moved):
+    uses = []
+
+    for id in loop.blocks:
+        uses.extend([a.name for phi in form.phis[id] for a in phi.args if st.isVarToken(a)])
+        for exp in form.cfg.blocks[id].expressions:
+            if all(exp is not m for m in moved):
+                uses.extend(exp.uses)
+
+    return set(uses)
+
+# a moved result still read in the loop stays in a register all through it
+def getHoistCost(form, loop, moved):
+    uses = getLoopUses(form, loop, moved)
+    return len([exp for exp in moved if exp.dest.name in uses])
+
+# any leading run of the invariants can move on its own, the longest that fits is taken
+def getHoisted(form, loop, budget):
+    invariants = getInvariantStatements(form, loop)
+
+    for count in range(len(invariants), 0, -1):
+        cost = getHoistCost(form, loop, invariants[:count])
+        if cost <= budget:
+            return invariants[:count], cost
+
+    return [], 0
+
+def setPreheaderStatements(block, exps):
+    last = block.getLast()
+
+    if ssa.isTerminator(last):
+        block.expressions = block.expressions[:-1] + exps + [last]
+    else:
+        block.expressions = block.expressions + exps
+
+# inner loops go first, so a statement invariant in a whole nest moves out one loop at a
+# time, and the loop it left has that much less room for the next one; registerCount is
+# the number of registers the allocator of the target hands out
+def setHoistedStatements(form, pressures, registerCount):
+    graph = form.cfg
+    count = 0
+
+    for loop in sorted(graph.loops, key=lambda l: -l.depth):
+        preheader = getPreheader(graph, loop)
+
+        if preheader is None:
+            continue
+
+        budget = registerCount - max([pressures[id] for id in loop.blocks])
+        hoisted, cost = getHoisted(form, loop, budget)
+
+        if len(hoisted) == 0:
+            continue
+
+        for id in loop.blocks:
+            block = graph.blocks[id]
+            block.expressions = [exp for exp in block.expressions if all(exp is not h for h in hoisted)]
+            pressures[id] += cost
+
+        setPreheaderStatements(graph.blocks[preheader], hoisted)
+        count += len(hoisted)
+
+    return count
+
+def getLoopInvariantsHoistedPro(pro, registerCount):
+    if not ssa.isSsaCandidate(pro):
+        return pro
+
+    retNames = [n for n in [par.getTokenVar(pro.ret)] if n is not None]
+    exps = getPreheaderCode(cfg.getReachableCode(pro.expressions))
+    normalized = par.EPro(pro.name, pro.params, exps, pro.ret)
+    form = ssa.getSsaPro(normalized)
+
+    if len(form.cfg.loops) == 0 or setHoistedStatements(form, getPressures(exps, retNames), registerCount) == 0:
+        return pro
+
+    exps = cfg.getUnusedLabelsRemoved(ssa.getExpressionsFromSsa(form))
+    return par.EPro(pro.name, pro.params, exps, form.ret)
@@ -0,0 +1,353 @@
+from array import array
+
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.token_buffer as tb
+
+#
+# Opcodes
+#
+
+OPCODES = (
+    [(par.EXP_KIND_LABEL, None), (par.EXP_KIND_JUMP, gram.JUMP)] +
+    [(par.EXP_KIND_CO_JUMP, op) for op in [gram.JIL, gram.JILE, gram.JIE, gram.JIN, gram.JIGE, gram.JIG]] +
+    [(par.EXP_KIND_COPY, None)] +
+    [(par.EXP_KIND_UN_OP, op) for op in [gram.NOT]] +
+    [(par.EXP_KIND_BIN_OP, op) for op in [gram.OR, gram.AND, gram.XOR, gram.ADD, gram.SUB, gram.MUL, gram.DIV, gram.MOD]] +
+    [(par.EXP_KIND_PRO_CALL, None)]
+)
+
+OPCODE_IDS = {OPCODES[i]: i for i in range(len(OPCODES))}
+
+OP_LABEL = OPCODE_IDS[(par.EXP_KIND_LABEL, None)]
+OP_JUMP = OPCODE_IDS[(par.EXP_KIND_JUMP, gram.JUMP)]
+OP_COPY = OPCODE_IDS[(par.EXP_KIND_COPY, None)]
+OP_CALL = OPCODE_IDS[(par.EXP_KIND_PRO_CALL, None)]
+
+def getOpcode(exp):
+    match exp.kind:
+        case par.EXP_KIND_CO_JUMP | par.EXP_KIND_JUMP:
+            return OPCODE_IDS[(exp.kind, exp.name)]
+        case par.EXP_KIND_UN_OP | par.EXP_KIND_BIN_OP:
+            return OPCODE_IDS[(exp.kind, exp.op)]
+        case _:
+            return OPCODE_IDS[(exp.kind, None)]
+
+#
+# Operands
+#
+
+# an operand is one integer: a table index above a width code and a tag, so every
+# variable read or written by a statement is found by a tag test on the operand arrays;
+# calls keep their argument list index in an untagged right operand
+OPERAND_NONE = 0
+OPERAND_VAR = 1
+OPERAND_CONST = 2
+OPERAND_IDENTIFIER = 3
+OPERAND_POINTER_VAR = 4
+OPERAND_POINTER_IDENTIFIER = 5
+OPERAND_LABEL = 6
+
+TAG_BITS = 3
+TAG_MASK = (1 << TAG_BITS) - 1
+WIDTH_BITS = 2
+WIDTH_MASK = (1 << WIDTH_BITS) - 1
+INDEX_SHIFT = TAG_BITS + WIDTH_BITS
+
+VAR_TAGS = {
+    OPERAND_VAR, OPERAND_POINTER_VAR
+}
+
+WIDTHS = [8, 1, 2, 4]
+WIDTH_CODES = {WIDTHS[i]: i for i in range(len(WIDTHS))}
+WIDTH_SUFFIXES = ['', 'b', 'w', 'd']
+
+CONST_TOKENS = {
+    lex.KIND_INT: lambda value: lex.TInt(gram.INT, value),
+    lex.KIND_CHAR: lambda value: lex.TChar(gram.CHAR, value),
+    lex.KIND_STRING: lambda value: lex.TString(gram.STRING, value)
+}
+
+def getOperand(tag, index, widthCode=0):
+    return (index << INDEX_SHIFT) | (widthCode << TAG_BITS) | tag
+
+def getOperandTag(operand):
+    return operand & TAG_MASK
+
+def getOperandIndex(operand):
+    return operand >> INDEX_SHIFT
+
+def getOperandWidth(operand):
+    return WIDTHS[(operand >> TAG_BITS) & WIDTH_MASK]
+
+#
+# Flow Statements
+#
+
+# the control flow graph and liveness only need the kind, labels and variable names of a
+# statement, so these are read from the operand arrays without building tokens
+class FlowStatement:
+    def __init__(self, kind, name, labelName, uses, defs):
+        self.kind = kind
+        self.name = name
+        self.labelName = labelName
+        self.uses = uses
+        self.defs = defs
+
+#
+# Linear Procedure
+#
+
+class LinearPro:
+    kind = par.EXP_KIND_PRO
+
+    def __init__(self, name):
+        self.name = name
+        self.isLeaf = True
+        self.usesInt = False
+        self.vars = tb.SymbolTable()
+        self.identifiers = tb.SymbolTable()
+        self.labels = tb.SymbolTable()
+        self.consts = tb.SymbolTable()
+        self.opcodes = array('B')
+        self.dests = array('I')
+        self.lefts = array('I')
+        self.rights = array('I')
+        self.args = array('I')
+        self.argStarts = array('I', [0])
+        self.params = array('I')
+        self.ret = OPERAND_NONE
+
+    def append(self, opcode, dest, left, right):
+        self.opcodes.append(opcode)
+        self.dests.append(dest)
+        self.lefts.append(left)
+        self.rights.append(right)
+
+    def getVarOperand(self, name, width):
+        return getOperand(OPERAND_VAR, self.vars.getId(name), WIDTH_CODES[width])
+
+    def getLabelOperand(self, name):
+        return getOperand(OPERAND_LABEL, self.labels.getId(name))
+
+    def getTokenOperand(self, t):
+        match t.kind:
+            case lex.KIND_VAR:
+                return self.getVarOperand(t.name, t.width)
+            case lex.KIND_INT | lex.KIND_CHAR | lex.KIND_STRING:
+                return getOperand(OPERAND_CONST, self.consts.getId((t.kind, t.value)))
+            case lex.KIND_IDENTIFIER:
+                return getOperand(OPERAND_IDENTIFIER, self.identifiers.getId(t.name))
+            case lex.KIND_POINTER:
+                if gram.isVar(t.name):
+                    n, w = gram.getVarComponents(t.name)
+                    return getOperand(OPERAND_POINTER_VAR, self.vars.getId(n), WIDTH_CODES[w])
+                return getOperand(OPERAND_POINTER_IDENTIFIER, self.identifiers.getId(t.name))
+            case _:
+                raise Exception('invalid token for linear operand')
+
+    def getCallTarget(self, id):
+        if (len(id) > 1) and (id[0] == gram.PRO_VAR_CALL) and gram.isVar(id[1:]):
+            n, w = gram.getVarComponents(id[1:])
+            return self.getVarOperand(n, w)
+
+        return getOperand(OPERAND_IDENTIFIER, self.identifiers.getId(id))
+
+    def getToken(self, operand):
+        tag = getOperandTag(operand)
+        index = getOperandIndex(operand)
+
+        if tag == OPERAND_VAR:
+            return lex.TVar(self.vars.getName(index), getOperandWidth(operand))
+        elif tag == OPERAND_CONST:
+            kind, value = self.consts.getName(index)
+            return CONST_TOKENS[kind](value)
+        elif tag == OPERAND_IDENTIFIER:
+            return lex.TIdentifier(self.identifiers.getName(index))
+        elif tag == OPERAND_POINTER_VAR:
+            suffix = WIDTH_SUFFIXES[(operand >> TAG_BITS) & WIDTH_MASK]
+            return lex.TPointer(self.vars.getName(index) + suffix)
+        elif tag == OPERAND_POINTER_IDENTIFIER:
+            return lex.TPointer(self.identifiers.getName(index))
+        elif tag == OPERAND_LABEL:
+            return lex.TLabel(self.labels.getName(index))
+
+        return None
+
+    def getCallArgs(self, i):
+        call = getOperandIndex(self.rights[i])
+        return self.args[self.argStarts[call]:self.argStarts[call + 1]]
+
+    def getCallId(self, i):
+        target = self.lefts[i]
+
+        if getOperandTag(target) == OPERAND_VAR:
+            suffix = WIDTH_SUFFIXES[(target >> TAG_BITS) & WIDTH_MASK]
+            return gram.PRO_VAR_CALL + self.vars.getName(getOperandIndex(target)) + suffix
+
+        return self.identifiers.getName(getOperandIndex(target))
+
+    def getLabelName(self, operand):
+        return self.labels.getName(getOperandIndex(operand))
+
+    def getExpression(self, i):
+        kind, op = OPCODES[self.opcodes[i]]
+        dest = self.dests[i]
+
+        match kind:
+            case par.EXP_KIND_LABEL:
+                return par.ELabel(self.getLabelName(dest))
+            case par.EXP_KIND_JUMP:
+                return par.EJump(op, self.getLabelName(dest))
+            case par.EXP_KIND_CO_JUMP:
+                left = self.getToken(self.lefts[i])
+                right = self.getToken(self.rights[i])
+                return par.ECoJump(op, left, right, self.getLabelName(dest))
+            case par.EXP_KIND_COPY:
+                return par.ECopy(self.getToken(dest), self.getToken(self.lefts[i]))
+            case par.EXP_KIND_UN_OP:
+                return par.EUnOp(self.getToken(dest), op, self.getToken(self.lefts[i]))
+            case par.EXP_KIND_BIN_OP:
+                left = self.getToken(self.lefts[i])
+                right = self.getToken(self.rights[i])
+                return par.EBinOp(self.getToken(dest), op, left, right)
+            case par.EXP_KIND_PRO_CALL:
+                params = [self.getToken(a) for a in self.getCallArgs(i)]
+                return par.EProCall(self.getToken(dest), self.getCallId(i), params)
+
+        raise Exception('invalid linear opcode')
+
+    def getExpressions(self):
+        return [self.getExpression(i) for i in range(len(self.opcodes))]
+
+    def getFlowStatement(self, i):
+        kind = OPCODES[self.opcodes[i]][0]
+        dest = self.dests[i]
+
+        if kind == par.EXP_KIND_LABEL:
+            return FlowStatement(kind, self.getLabelName(dest), None, par.NO_VARS, par.NO_VARS)
+
+        names = self.vars.names
+        uses = []
+        defs = par.NO_VARS
+        operands = [self.lefts[i]]
+
+        if kind == par.EXP_KIND_PRO_CALL:
+            operands.extend(self.getCallArgs(i))
+        else:
+            operands.append(self.rights[i])
+
+        for operand in operands:
+            if (operand & TAG_MASK) in VAR_TAGS:
+                uses.append(names[operand >> INDEX_SHIFT])
+
+        if kind == par.EXP_KIND_JUMP or kind == par.EXP_KIND_CO_JUMP:
+            return FlowStatement(kind, OPCODES[self.opcodes[i]][1], self.getLabelName(dest), frozenset(uses), defs)
+
+        tag = dest & TAG_MASK
+        if tag == OPERAND_VAR:
+            defs = frozenset([names[dest >> INDEX_SHIFT]])
+            if getOperandWidth(dest) < 8:
+                uses.append(names[dest >> INDEX_SHIFT])
+        elif tag == OPERAND_POINTER_VAR:
+            uses.append(names[dest >> INDEX_SHIFT])
+
+        return FlowStatement(kind, None, None, frozenset(uses), defs)
+
+    def getFlowStatements(self):
+        return [self.getFlowStatement(i) for i in range(len(self.opcodes))]
+
+    def getParams(self):
+        return [self.getToken(p) for p in self.params]
+
+    def getRet(self):
+        return self.getToken(self.ret)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    # statements are decoded when indexed, so a walk over a few of them builds no others
+    def __getitem__(self, i):
+        return self.getExpression(i)
+
+    def toString(self):
+        return par.EPro(self.name, self.getParams(), self.getExpressions(), self.getRet()).toString()
+
+#
+# Lowering Functions
+#
+
+def appendLabel(lpro, exp):
+    lpro.append(OP_LABEL, lpro.getLabelOperand(exp.name), OPERAND_NONE, OPERAND_NONE)
+
+def appendJump(lpro, exp):
+    lpro.append(getOpcode(exp), lpro.getLabelOperand(exp.labelName), OPERAND_NONE, OPERAND_NONE)
+
+def appendCoJump(lpro, exp):
+    left = lpro.getTokenOperand(exp.left)
+    right = lpro.getTokenOperand(exp.right)
+    lpro.append(getOpcode(exp), lpro.getLabelOperand(exp.labelName), left, right)
+
+def appendCopy(lpro, exp):
+    dest = lpro.getTokenOperand(exp.dest)
+    lpro.append(OP_COPY, dest, lpro.getTokenOperand(exp.source), OPERAND_NONE)
+
+def appendUnOp(lpro, exp):
+    dest = lpro.getTokenOperand(exp.dest)
+    lpro.append(getOpcode(exp), dest, lpro.getTokenOperand(exp.source), OPERAND_NONE)
+
+def appendBinOp(lpro, exp):
+    dest = lpro.getTokenOperand(exp.dest)
+    left = lpro.getTokenOperand(exp.left)
+    right = lpro.getTokenOperand(exp.right)
+    lpro.append(getOpcode(exp), dest, left, right)
+
+def appendProCall(lpro, exp):
+    dest = lpro.getTokenOperand(exp.dest)
+    call = len(lpro.argStarts) - 1
+
+    for p in exp.params:
+        lpro.args.append(lpro.getTokenOperand(p))
+
+    lpro.argStarts.append(len(lpro.args))
+    lpro.append(OP_CALL, dest, lpro.getCallTarget(exp.id), getOperand(OPERAND_NONE, call))
+
+LOWER_STATEMENTS = {
+    par.EXP_KIND_LABEL: appendLabel,
+    par.EXP_KIND_JUMP: appendJump,
+    par.EXP_KIND_CO_JUMP: appendCoJump,
+    par.EXP_KIND_COPY: appendCopy,
+    par.EXP_KIND_UN_OP: appendUnOp,
+    par.EXP_KIND_BIN_OP: appendBinOp,
+    par.EXP_KIND_PRO_CALL: appendProCall
+}
+
+# the body is lowered before the parameters, so variable ids follow first use in the body
+def getLinearPro(pro):
+    lpro = LinearPro(pro.name)
+    lpro.isLeaf = pro.isLeaf
+    lpro.usesInt = pro.usesInt
+
+    for exp in pro.expressions:
+        LOWER_STATEMENTS[exp.kind](lpro, exp)
+
+    for p in pro.params:
+        lpro.params.append(lpro.getTokenOperand(p))
+
+    lpro.ret = lpro.getTokenOperand(pro.ret)
+
+    return lpro
+
+# procedures are lowered as they arrive, so a lazy expression source only ever holds
+# one procedure object graph at a time
+def getLinearExpressions(exps):
+    linear = []
+
+    for exp in exps:
+        if (exp is not None) and (exp.kind == par.EXP_KIND_PRO):
+            linear.append(getLinearPro(exp))
+        else:
+            linear.append(exp)
+
+    return linear
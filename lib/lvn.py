@@ -0,0 +1,177 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.statements as st
+import lib.folding as fold
+
+LOAD = 'load'
+
+#
+# Value Table
+#
+
+# values are numbered from the last label on, the same stretch of code local folding
+# knows constants for, and every store or call is taken to change any loaded value
+class ValueTable:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.nextValue = 0
+        self.vars = {}
+        self.values = {}
+        self.holders = {}
+
+    def getFreshValue(self):
+        value = self.nextValue
+        self.nextValue += 1
+        return value
+
+    def getVarValue(self, name):
+        if name not in self.vars:
+            self.setVarValue(name, self.getFreshValue())
+
+        return self.vars[name]
+
+    def setVarValue(self, name, value):
+        self.vars[name] = value
+        self.holders.setdefault(value, []).append(name)
+
+    # the earliest variable that still holds the value
+    def getHolder(self, value):
+        for name in self.holders.get(value, []):
+            if self.vars[name] == value:
+                return name
+
+        return None
+
+    def getKeyValue(self, key):
+        if key not in self.values:
+            self.values[key] = self.getFreshValue()
+
+        return self.values[key]
+
+    # a constant has the same number as a variable known to hold it
+    def getTokenValue(self, t):
+        value = fold.getConstValue(t)
+
+        if value is not None:
+            return self.getKeyValue((lex.KIND_INT, value))
+
+        return self.getKeyValue((t.kind, t.value))
+
+    def getOperandKey(self, t):
+        if st.isVarToken(t):
+            return (self.getVarValue(t.name), t.width)
+
+        return (self.getTokenValue(t), fold.WORD_WIDTH)
+
+    def clearLoads(self):
+        self.values = {key: value for key, value in self.values.items() if key[0] != LOAD}
+
+def getUnOpKey(table, exp):
+    return (exp.op, table.getOperandKey(exp.source))
+
+def getBinOpKey(table, exp):
+    left = table.getOperandKey(exp.left)
+    right = table.getOperandKey(exp.right)
+
+    if exp.op in fold.COMMUTATIVE_OPS and right < left:
+        left, right = right, left
+
+    return (exp.op, left, right)
+
+def getLoadKey(table, exp):
+    name = par.getTokenVar(exp.source)
+
+    if name is None:
+        return None
+
+    return (LOAD, table.getVarValue(name))
+
+#
+# Numbering
+#
+
+def getComputedKey(table, exp):
+    dest = st.getDest(exp)
+
+    if dest is None or not fold.isWordVar(dest):
+        return None
+
+    if exp.kind == par.EXP_KIND_UN_OP:
+        return getUnOpKey(table, exp)
+
+    if exp.kind == par.EXP_KIND_BIN_OP:
+        return getBinOpKey(table, exp)
+
+    if exp.kind == par.EXP_KIND_COPY and exp.source.kind == lex.KIND_POINTER:
+        return getLoadKey(table, exp)
+
+    return None
+
+def getCopiedValue(table, exp):
+    if exp.kind != par.EXP_KIND_COPY or not fold.isWordVar(exp.dest):
+        return None
+
+    if fold.isWordVar(exp.source):
+        return table.getVarValue(exp.source.name)
+
+    if st.isConstToken(exp.source):
+        return table.getTokenValue(exp.source)
+
+    return None
+
+# a computation the block already holds in a variable becomes a copy of that variable
+def getNumberedStatement(table, exp):
+    key = getComputedKey(table, exp)
+
+    if key is not None:
+        value = table.values.get(key)
+        holder = None if value is None else table.getHolder(value)
+
+        if holder is not None:
+            table.setVarValue(exp.dest.name, value)
+            return par.ECopy(exp.dest, lex.TVar(holder, fold.WORD_WIDTH))
+
+        value = table.getFreshValue()
+        table.values[key] = value
+        table.setVarValue(exp.dest.name, value)
+        return exp
+
+    value = getCopiedValue(table, exp)
+    if value is not None:
+        table.setVarValue(exp.dest.name, value)
+        return exp
+
+    dest = st.getDest(exp)
+    if exp.kind == par.EXP_KIND_PRO_CALL or (dest is not None and dest.kind == lex.KIND_POINTER):
+        table.clearLoads()
+
+    for name in exp.defs:
+        table.setVarValue(name, table.getFreshValue())
+
+    return exp
+
+def getNumberedExpressions(exps):
+    table = ValueTable()
+    numbered = []
+
+    for exp in exps:
+        if exp.kind == par.EXP_KIND_LABEL:
+            table.clear()
+
+        exp = getNumberedStatement(table, exp)
+
+        # a variable computing what it already holds needs no statement at all
+        if not fold.isSelfCopy(exp):
+            numbered.append(exp)
+
+    return numbered
+
+def getValueNumberedPro(pro):
+    exps = getNumberedExpressions(pro.expressions)
+
+    if len(exps) == len(pro.expressions) and all(exps[i] is pro.expressions[i] for i in range(len(exps))):
+        return pro
+
+    return par.EPro(pro.name, pro.params, exps, pro.ret)
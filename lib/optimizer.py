@@ -0,0 +1,82 @@
+import lib.parser as par
+import lib.folding as fold
+import lib.sccp as sccp
+import lib.lvn as lvn
+import lib.licm as licm
+import lib.ivs as ivs
+import lib.copies as cps
+import lib.dce as dce
+import lib.jumps as jumps
+import lib.inliner as inl
+import lib.tail_calls as tails
+
+#
+# Passes
+#
+
+# a pass takes a procedure and returns a new one, memory blocks are left as they are
+PASSES = {
+    'tails': tails.getTailCallsLoopedPro,
+    'fold': fold.getFoldedPro,
+    'sccp': sccp.getPropagatedPro,
+    'lvn': lvn.getValueNumberedPro,
+    'copies': cps.getCopyPropagatedPro,
+    'dce': dce.getDeadCodeRemovedPro,
+    'jumps': jumps.getJumpsSimplifiedPro
+}
+
+# a module pass also takes the procedures optimized before the one at hand, by name
+MODULE_PASSES = {
+    'inline': inl.getInlinedPro
+}
+
+# a target pass also takes the number of registers the allocator of the target hands out
+TARGET_PASSES = {
+    'licm': licm.getLoopInvariantsHoistedPro,
+    'ivs': ivs.getInductionReducedPro
+}
+
+# the passes run at each optimization level, in order
+OPTIMIZATION_LEVELS = [
+    [],
+    ['inline', 'tails', 'fold', 'sccp', 'lvn', 'licm', 'ivs', 'copies', 'dce', 'jumps']
+]
+
+def getLevelPasses(level):
+    if level < 0 or level >= len(OPTIMIZATION_LEVELS):
+        raise Exception('optimization level not supported')
+
+    return OPTIMIZATION_LEVELS[level]
+
+def getOptimizedPro(pro, passes, registerCount, pros=None):
+    for name in passes:
+        if name in MODULE_PASSES:
+            pro = MODULE_PASSES[name](pro, {} if pros is None else pros)
+        elif name in TARGET_PASSES:
+            pro = TARGET_PASSES[name](pro, registerCount)
+        elif name in PASSES:
+            pro = PASSES[name](pro)
+        else:
+            raise Exception('optimization pass not found')
+
+    return pro
+
+# only procedures already seen can be inlined, the stream is never read ahead
+def getOptimizedStream(exps, passes, registerCount):
+    pros = {}
+
+    for exp in exps:
+        if (exp is not None) and (exp.kind == par.EXP_KIND_PRO):
+            exp = getOptimizedPro(exp, passes, registerCount, pros)
+            pros[exp.name] = exp
+
+        yield exp
+
+# procedures are optimized one at a time as they arrive, so a parsed stream stays lazy
+def getOptimizedExpressions(exps, level, registerCount):
+    passes = getLevelPasses(level)
+
+    if len(passes) == 0:
+        return exps
+
+    return getOptimizedStream(exps, passes, registerCount)
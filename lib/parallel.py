@@ -0,0 +1,127 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+
+#
+# Chunk Helpers
+#
+
+CHUNKS_PER_JOB = 4
+MIN_CHUNK_LENGTH = 1 << 16
+
+# top-level blocks start on a line of their own, so a text scan finds every candidate
+# split without lexing; candidates that land inside a string are merged back later
+BLOCK_START_PATTERN = re.compile(
+    r'^[ \t]*(?:' + re.escape(gram.PRO_ID) + '|' + re.escape(gram.MEM_ID) + r')(?=[ \t\r\n]|$)',
+    re.MULTILINE
+)
+
+BLOCK_START_KINDS = {
+    lex.KIND_PRO_ID, lex.KIND_MEM_ID
+}
+
+def getBlockStarts(text):
+    return [m.start() for m in BLOCK_START_PATTERN.finditer(text)]
+
+def getChunks(text, count, minLength=MIN_CHUNK_LENGTH):
+    chunks = []
+    target = max(len(text) // max(count, 1), minLength, 1)
+    start = 0
+
+    for b in getBlockStarts(text):
+        if b - start >= target:
+            chunks.append(text[start:b])
+            start = b
+
+    if start < len(text) or len(chunks) == 0:
+        chunks.append(text[start:])
+
+    return chunks
+
+class ChunkResult:
+    def __init__(self, expressions, error, cleanStart, cleanEnd):
+        self.expressions = expressions
+        self.error = error
+        self.cleanStart = cleanStart
+        self.cleanEnd = cleanEnd
+
+# a chunk ends clean only if its last block was finished: a procedure without a return
+# parses to None and a memory collection without a closing bracket runs past the end
+def getChunkResult(chunk):
+    tokens = lex.getTokens(chunk)
+    length = len(tokens)
+    cleanStart = length > 0 and tokens[0].kind in BLOCK_START_KINDS
+    cleanEnd = length > 0 and tokens[-1].kind == lex.KIND_SEPARATOR
+
+    try:
+        i, expressions = par.getBlockExpressions(tokens, length)
+    except Exception as ex:
+        return ChunkResult([], str(ex), cleanStart, cleanEnd)
+
+    cleanEnd = cleanEnd and i == length and (None not in expressions)
+    return ChunkResult(expressions, None, cleanStart, cleanEnd)
+
+#
+# Merge Functions
+#
+
+def getMergedResults(chunks, results):
+    merged = []
+    text = chunks[0]
+    result = results[0]
+
+    for i in range(1, len(chunks)):
+        if result.cleanEnd and results[i].cleanStart:
+            merged.append(result)
+            text = chunks[i]
+            result = results[i]
+        else:
+            # the split fell inside a string or a block, so parse both sides together
+            text = text + chunks[i]
+            result = getChunkResult(text)
+
+    merged.append(result)
+    return merged
+
+def getMergedExpressions(chunks, results):
+    expressions = []
+
+    for result in getMergedResults(chunks, results):
+        if result.error is not None:
+            raise Exception(result.error)
+
+        expressions.extend(result.expressions)
+
+    return expressions
+
+#
+# Parallel Parse Functions
+#
+
+def getJobCount(jobs):
+    if jobs is None or jobs < 1:
+        return os.cpu_count() or 1
+
+    return jobs
+
+def getExpressionsFromText(text, jobs=None):
+    jobs = getJobCount(jobs)
+    chunks = getChunks(text, jobs * CHUNKS_PER_JOB)
+
+    if jobs == 1 or len(chunks) == 1:
+        results = [getChunkResult(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(getChunkResult, chunks))
+
+    return getMergedExpressions(chunks, results)
+
+def getExpressionsFromFile(source, jobs=None):
+    with open(source, 'r', encoding=lex.STREAM_ENCODING) as file:
+        text = file.read()
+
+    return getExpressionsFromText(text, jobs)
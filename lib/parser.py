@@ -1,11 +1,91 @@
+from functools import cached_property
+
 import lib.grammar as gram
 import lib.lexer as lex
 
+#
+# Expression Kinds
+#
+
+EXP_KIND_LABEL = 0
+EXP_KIND_JUMP = 1
+EXP_KIND_CO_JUMP = 2
+EXP_KIND_COPY = 3
+EXP_KIND_UN_OP = 4
+EXP_KIND_BIN_OP = 5
+EXP_KIND_PRO_CALL = 6
+EXP_KIND_PRO = 7
+EXP_KIND_MEM_COLLECTION = 8
+EXP_KIND_MEM_SIZE = 9
+EXP_KIND_EXP = 10
+EXP_KIND_PHI = 11
+
 #
 # Parser Expression Types
 #
 
+# statements carry the names of the variables they read and write, built the first time a
+# pass asks for them and never changed, so a parse no pass reads does not pay for them
+NO_VARS = frozenset()
+
+POINTER_VARS = {}
+
+def getTokenVar(t):
+    if t.kind == lex.KIND_VAR:
+        return t.name
+    elif t.kind == lex.KIND_POINTER:
+        name = POINTER_VARS.get(t.name)
+        if name is None:
+            name = gram.getVarComponents(t.name)[0] if gram.isVar(t.name) else ''
+            POINTER_VARS[t.name] = name
+        if len(name) > 0:
+            return name
+
+    return None
+
+def appendTokenVars(names, tokens):
+    for t in tokens:
+        if t.kind == lex.KIND_VAR:
+            names.append(t.name)
+        elif t.kind == lex.KIND_POINTER:
+            name = getTokenVar(t)
+            if name is not None:
+                names.append(name)
+
+def getTokenUses(tokens):
+    names = []
+    appendTokenVars(names, tokens)
+    return frozenset(names)
+
+def getDestDefs(dest):
+    if dest.kind == lex.KIND_VAR:
+        return frozenset([dest.name])
+
+    return NO_VARS
+
+def getStatementUses(dest, operands):
+    names = []
+    appendTokenVars(names, operands)
+
+    # stores read the pointer, and narrow writes keep the upper bits of the variable
+    if dest.kind == lex.KIND_POINTER or (dest.kind == lex.KIND_VAR and dest.width < 8):
+        appendTokenVars(names, [dest])
+
+    return frozenset(names)
+
+def getCallUses(dest, id, params):
+    uses = getStatementUses(dest, params)
+
+    if (len(id) > 1) and (id[0] == gram.PRO_VAR_CALL) and gram.isVar(id[1:]):
+        uses = uses | frozenset([gram.getVarComponents(id[1:])[0]])
+
+    return uses
+
 class Exp:
+    kind = EXP_KIND_EXP
+    uses = NO_VARS
+    defs = NO_VARS
+
     def __init__(self, name):
         self.name = name
 
@@ -13,6 +93,8 @@ class Exp:
         return self.name
 
 class ELabel(Exp):
+    kind = EXP_KIND_LABEL
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -20,6 +102,8 @@ class ELabel(Exp):
         return '{ ELabel: ' + self.name + ' }'
 
 class EJump(Exp):
+    kind = EXP_KIND_JUMP
+
     def __init__(self, name, labelName):
         super().__init__(name)
         self.labelName = labelName
@@ -28,38 +112,66 @@ class EJump(Exp):
         return '{ EJump: ' + self.name + ' ' + self.labelName + ' }'
 
 class ECoJump(Exp):
+    kind = EXP_KIND_CO_JUMP
+
     def __init__(self, name, left, right, labelName):
         super().__init__(name)
         self.left = left
         self.right = right
         self.labelName = labelName
 
+    @cached_property
+    def uses(self):
+        return getTokenUses([self.left, self.right])
+
     def toString(self):
         body = self.left.toString() + ' ' + self.right.toString() + ' ' + self.labelName
         return '{ ECoJump: ' + self.name + ' ' + body + ' }'
 
 class ECopy(Exp):
+    kind = EXP_KIND_COPY
+
     def __init__(self, dest, source):
         super().__init__('ECopy')
         self.dest = dest
         self.source = source
 
+    @cached_property
+    def uses(self):
+        return getStatementUses(self.dest, [self.source])
+
+    @cached_property
+    def defs(self):
+        return getDestDefs(self.dest)
+
     def toString(self):
         body = self.dest.toString() + ' ' + gram.ASSIGN + ' ' + self.source.toString()
         return '{ ' + self.name + ': ' + body + ' }'
 
 class EUnOp(Exp):
+    kind = EXP_KIND_UN_OP
+
     def __init__(self, dest, op, source):
         super().__init__('EUnOp')
         self.dest = dest
         self.op = op
         self.source = source
 
+    @cached_property
+    def uses(self):
+        return getStatementUses(self.dest, [self.source])
+
+    @cached_property
+    def defs(self):
+        return getDestDefs(self.dest)
+
     def toString(self):
         body = self.dest.toString() + ' ' + gram.ASSIGN + ' ' + self.op + ' ' + self.source.toString()
         return '{ ' + self.name + ': ' + body + ' }'
     
 class EBinOp(Exp):
+    kind = EXP_KIND_BIN_OP
+
     def __init__(self, dest, op, left, right):
         super().__init__('EBinOp')
         self.dest = dest
@@ -67,17 +179,35 @@ class EBinOp(Exp):
         self.left = left
         self.right = right
 
+    @cached_property
+    def uses(self):
+        return getStatementUses(self.dest, [self.left, self.right])
+
+    @cached_property
+    def defs(self):
+        return getDestDefs(self.dest)
+
     def toString(self):
         body = self.dest.toString() + ' ' + gram.ASSIGN + ' ' + self.op + ' ' + self.left.toString() + ' ' + self.right.toString()
         return '{ ' + self.name + ': ' + body + ' }'
     
 class EProCall(Exp):
+    kind = EXP_KIND_PRO_CALL
+
     def __init__(self, dest, id, params):
         super().__init__('EProCall')
         self.dest = dest
         self.id = id
         self.params = params
 
+    @cached_property
+    def uses(self):
+        return getCallUses(self.dest, self.id, self.params)
+
+    @cached_property
+    def defs(self):
+        return getDestDefs(self.dest)
+
     def toString(self):
         body = self.dest.toString() + ' ' + gram.ASSIGN + ' ' + self.id
 
@@ -86,41 +216,52 @@ class EProCall(Exp):
         
         return '{ ' + self.name + ': ' + body + ' }'
     
+# phis are never parsed, they only exist while a procedure is in ssa form and take one
+# argument per predecessor of their block
+class EPhi(Exp):
+    kind = EXP_KIND_PHI
+
+    def __init__(self, dest, args):
+        super().__init__('EPhi')
+        self.dest = dest
+        self.args = args
+
+    @cached_property
+    def uses(self):
+        return getTokenUses(self.args)
+
+    @cached_property
+    def defs(self):
+        return getDestDefs(self.dest)
+
+    def toString(self):
+        body = self.dest.toString() + ' ' + gram.ASSIGN
+
+        for a in self.args:
+            body += ' ' + a.toString()
+
+        return '{ ' + self.name + ': ' + body + ' }'
+
 class EPro(Exp):
+    kind = EXP_KIND_PRO
+
     def __setProperties(self):
         for p in self.params:
-            if isinstance(p, lex.TVar):
+            if p.kind == lex.KIND_VAR:
                 self.usesInt = True
 
-        intRelatedTypes = [lex.TVar]
-
         for exp in self.expressions:
-            if isinstance(exp, ECoJump):
-                if isValidTokenInTypeList(exp.left, intRelatedTypes):
-                    self.usesInt = True
-                elif isValidTokenInTypeList(exp.right, intRelatedTypes):
-                    self.usesInt = True
-            elif isinstance(exp, ECopy):
-                if isValidTokenInTypeList(exp.dest, intRelatedTypes):
-                    self.usesInt = True
-                elif isValidTokenInTypeList(exp.source, intRelatedTypes):
-                    self.usesInt = True
-            elif isinstance(exp, EUnOp):
-                if isValidTokenInTypeList(exp.dest, intRelatedTypes):
-                    self.usesInt = True
-                elif isValidTokenInTypeList(exp.source, intRelatedTypes):
-                    self.usesInt = True
-            elif isinstance(exp, EBinOp):
-                if isValidTokenInTypeList(exp.dest, intRelatedTypes):
-                    self.usesInt = True
-                elif isValidTokenInTypeList(exp.left, intRelatedTypes):
-                    self.usesInt = True
-                elif isValidTokenInTypeList(exp.right, intRelatedTypes):
-                    self.usesInt = True
-            elif isinstance(exp, EProCall):
+            if exp.kind == EXP_KIND_PRO_CALL:
                 self.isLeaf = False
-
-        if isValidTokenInTypeList(self.ret, intRelatedTypes):
+            elif not self.usesInt:
+                operands = INT_OPERANDS.get(exp.kind)
+                if operands is not None:
+                    for t in operands(exp):
+                        if t.kind == lex.KIND_VAR:
+                            self.usesInt = True
+                            break
+
+        if self.ret.kind == lex.KIND_VAR:
             self.usesInt = True
 
     def __init__(self, name, params, exps, ret):
@@ -150,6 +291,8 @@ class EPro(Exp):
         ])
     
 class EMemCollection(Exp):
+    kind = EXP_KIND_MEM_COLLECTION
+
     def __init__(self, name, collection):
         super().__init__(name)
         self.collection = collection
@@ -166,6 +309,8 @@ class EMemCollection(Exp):
         ])
 
 class EMemSize(Exp):
+    kind = EXP_KIND_MEM_SIZE
+
     def __init__(self, name, size):
         super().__init__(name)
         self.size = size
@@ -174,9 +319,12 @@ class EMemSize(Exp):
         return 'mem ' + self.name + ' ' + self.size
 
 # TODO: include multiplication and division information
+# clobbers holds the caller-saved registers each procedure may change, it depends on the
+# register assignments and is filled in by the code generator
 class ProcedureProperties:
-    def __init__(self, usesInt):
+    def __init__(self, usesInt, clobbers=None):
         self.usesInt = usesInt
+        self.clobbers = {} if clobbers is None else clobbers
 
 def getProcedureProperties(pros):
     usesInt = {}
@@ -190,21 +338,48 @@ def getProcedureProperties(pros):
 # Parser Functions
 #
 
-OP_TYPE_COPY = 0
-OP_TYPE_UN_OP = 1
-OP_TYPE_BIN_OP = 2
-OP_TYPE_PRO_CALL = 3
-
 RETURN_TYPES = [lex.TInt, lex.TChar, lex.TVar]
 INTEGER_TYPES = [lex.TInt, lex.TChar, lex.TVar]
 LITERAL_TYPES = [lex.TInt, lex.TChar, lex.TString]
 
-def isValidTokenInTypeList(t, validTypeList):
+# kind masks
+############
+
+def getKindMask(validTypeList):
+    mask = 0
+
     for v in validTypeList:
-        if isinstance(t, v):
-            return True
-        
-    return False
+        mask |= 1 << v.kind
+
+    return mask
+
+def isValidTokenInKindMask(t, mask):
+    return ((1 << t.kind) & mask) != 0
+
+RETURN_MASK = getKindMask(RETURN_TYPES)
+INTEGER_MASK = getKindMask(INTEGER_TYPES)
+LITERAL_MASK = getKindMask(LITERAL_TYPES)
+COPY_DEST_MASK = getKindMask([lex.TVar, lex.TPointer])
+COPY_SOURCE_MASK = getKindMask([lex.TInt, lex.TChar, lex.TIdentifier, lex.TPointer, lex.TVar])
+PRO_CALL_PARAM_MASK = getKindMask([lex.TInt, lex.TChar, lex.TIdentifier, lex.TVar])
+MEM_COLLECTION_MASK = getKindMask([lex.TInt, lex.TChar, lex.TString])
+
+# operands checked for integer use by EPro
+INT_OPERANDS = {
+    EXP_KIND_CO_JUMP: lambda exp: [exp.left, exp.right],
+    EXP_KIND_COPY: lambda exp: [exp.dest, exp.source],
+    EXP_KIND_UN_OP: lambda exp: [exp.dest, exp.source],
+    EXP_KIND_BIN_OP: lambda exp: [exp.dest, exp.left, exp.right]
+}
+
+# operands read or written by each statement
+EXPRESSION_PARAMS = {
+    EXP_KIND_CO_JUMP: lambda exp: [exp.left, exp.right],
+    EXP_KIND_COPY: lambda exp: [exp.dest, exp.source],
+    EXP_KIND_UN_OP: lambda exp: [exp.dest, exp.source],
+    EXP_KIND_BIN_OP: lambda exp: [exp.dest, exp.left, exp.right],
+    EXP_KIND_PRO_CALL: lambda exp: [exp.dest] + exp.params
+}
 
 def getParamFromPointer(pointer):
     name = pointer.name
@@ -218,7 +393,7 @@ def getParamsFromPossiblePointers(possibles):
     params = []
 
     for p in possibles:
-        if isinstance(p, lex.TPointer):
+        if p.kind == lex.KIND_POINTER:
             name = p.name
             if gram.isVar(name):
                 n, w = gram.getVarComponents(name)
@@ -230,21 +405,12 @@ def getParamsFromPossiblePointers(possibles):
     return params
 
 def getParamsFromExpression(exp):
-    params = []
-    
-    if isinstance(exp, ECoJump):
-        params.extend([exp.left, exp.right])
-    elif isinstance(exp, ECopy):
-        params.extend([exp.dest, exp.source])
-    elif isinstance(exp, EUnOp):
-        params.extend([exp.dest, exp.source])
-    elif isinstance(exp, EBinOp):
-        params.extend([exp.dest, exp.left, exp.right])
-    elif isinstance(exp, EProCall):
-        params.append(exp.dest)
-        params.extend(exp.params)
-
-    return getParamsFromPossiblePointers(params)
+    params = EXPRESSION_PARAMS.get(exp.kind)
+
+    if params is None:
+        return []
+
+    return getParamsFromPossiblePointers(params(exp))
 
 # basic expression statements
 #############################
@@ -256,7 +422,7 @@ def getELabel(i, tokens, length):
     elab = ELabel(tokens[i].name)
     sep = tokens[i + 1]
 
-    if not isinstance(sep, lex.TSeparator):
+    if sep.kind != lex.KIND_SEPARATOR:
         raise Exception('label must be followed by separator')
 
     return i + 2, elab
@@ -265,10 +431,10 @@ def getEJump(i, tokens, length):
     if i + 2 >= length:
         raise Exception('invalid number of tokens for unconditional jump')
 
-    if not isinstance(tokens[i + 1], lex.TLabel):
+    if tokens[i + 1].kind != lex.KIND_LABEL:
         raise Exception('uncondtional jump must be followed by label')
 
-    if not isinstance(tokens[i + 2], lex.TSeparator):
+    if tokens[i + 2].kind != lex.KIND_SEPARATOR:
         raise Exception('label must be followed by separator')
 
     name = tokens[i].name
@@ -286,212 +452,139 @@ def getECoJump(i, tokens, length):
     label = tokens[i + 3]
     sep = tokens[i + 4]
 
-    validCompTypes = [
-        lex.TInt, lex.TChar,
-        lex.TVar
-    ]
-
-    if (not isValidTokenInTypeList(left, validCompTypes)):
+    if not isValidTokenInKindMask(left, INTEGER_MASK):
         raise Exception('invalid left parameter for conditional jump')
 
-    if (not isValidTokenInTypeList(right, validCompTypes)):
+    if not isValidTokenInKindMask(right, INTEGER_MASK):
         raise Exception('invalid right parameter for conditional jump')
     
-    if not isinstance(label, lex.TLabel):
+    if label.kind != lex.KIND_LABEL:
         raise Exception('invalid label for conditional jump')
     
-    if not isinstance(sep, lex.TSeparator):
+    if sep.kind != lex.KIND_SEPARATOR:
         raise Exception('conditional jump must be followed by separator')
 
     return i + 5, ECoJump(jump.name, left, right, label.name)
 
-# group assignment statements
-#############################
+# assignment statements
+#######################
+
+def isStatementEnd(i, tokens, length):
+    return (i >= length) or (tokens[i].kind == lex.KIND_SEPARATOR)
+
+def getStatementEnd(i, tokens, length):
+    if i < length:
+        if tokens[i].kind != lex.KIND_SEPARATOR:
+            raise Exception('assignment must be followed by separator')
 
-def getECopy(group):
-    dest = group[0]
-    eq = group[1]
-    source = group[2]
+        return i + 1
 
-    if (not isValidTokenInTypeList(dest, [lex.TVar, lex.TPointer])):
+    return i
+
+# brackets are folded into a pointer as the operand is read
+def getAssignmentOperand(i, tokens, length):
+    if i >= length:
+        raise Exception('invalid number of tokens for assignment')
+
+    t = tokens[i]
+
+    if t.kind != lex.KIND_POINT_LEFT_B:
+        return i + 1, t
+
+    if (i + 1 < length) and (tokens[i + 1].kind == lex.KIND_POINT_RIGHT_B):
+        raise Exception('pointer reference must not be blank')
+
+    if (i + 1 >= length) or (tokens[i + 1].kind != lex.KIND_VAR):
+        raise Exception('pointer reference must be variable')
+
+    if isStatementEnd(i + 2, tokens, length):
+        raise Exception('pointer must be closed')
+
+    if tokens[i + 2].kind != lex.KIND_POINT_RIGHT_B:
+        raise Exception('pointer must not have more than one token')
+
+    return i + 3, lex.TPointer(tokens[i + 1].name)
+
+def getECopy(dest, i, tokens, length):
+    if not isValidTokenInKindMask(dest, COPY_DEST_MASK):
         raise Exception('first token must be variable or memory pointer')
-    
-    if (not isinstance(eq, lex.TAssign)):
-        raise Exception('second token must be assignment')
-    
-    validCopyTypes = [
-        lex.TInt, lex.TChar,
-        lex.TIdentifier, lex.TPointer,
-        lex.TVar
-    ]
 
-    if (not isValidTokenInTypeList(source, validCopyTypes)):
-        raise Exception('third token must be literal, identifier, variable or memory pointer')
+    i, source = getAssignmentOperand(i, tokens, length)
 
-    return ECopy(dest, source)
+    if not isValidTokenInKindMask(source, COPY_SOURCE_MASK):
+        raise Exception('third token must be literal, identifier, variable or memory pointer')
 
-def getEUnOp(group):
-    dest = group[0]
-    eq = group[1]
-    op = group[2]
-    source = group[3]
+    return getStatementEnd(i, tokens, length), ECopy(dest, source)
 
-    if (not isValidTokenInTypeList(dest, [lex.TVar])):
+def getEUnOp(dest, i, tokens, length):
+    if dest.kind != lex.KIND_VAR:
         raise Exception('first token must be variable or memory pointer in unary operation')
-    
-    if (not isinstance(eq, lex.TAssign)):
-        raise Exception('second token must be assignment in unary operation')
 
-    if (not isinstance(op, lex.TUnOp)):
-        raise Exception('third token must be unary operator in unary operation')
-    
-    validSourceTypes = [
-        lex.TInt, lex.TChar,
-        lex.TVar
-    ]
+    op = tokens[i].name
+    i, source = getAssignmentOperand(i + 1, tokens, length)
 
-    if (not isValidTokenInTypeList(source, validSourceTypes)):
+    if not isValidTokenInKindMask(source, INTEGER_MASK):
         raise Exception('fourth token must be literal, variable or memory pointer in unary operation')
 
-    return EUnOp(dest, op.name, source)
-
-def getEBinOp(group):
-    dest = group[0]
-    eq = group[1]
-    op = group[2]
-    left = group[3]
-    right = group[4]
+    return getStatementEnd(i, tokens, length), EUnOp(dest, op, source)
 
-    if (not isValidTokenInTypeList(dest, [lex.TVar])):
+def getEBinOp(dest, i, tokens, length):
+    if dest.kind != lex.KIND_VAR:
         raise Exception('first token must be variable or memory pointer in binary operation')
-    
-    if (not isinstance(eq, lex.TAssign)):
-        raise Exception('second token must be assignment in binary operation')
-
-    if (not isinstance(op, lex.TBinOp)):
-        raise Exception('third token must be binary operator in binary operation')
 
-    validSourceTypes = [
-        lex.TInt, lex.TChar,
-        lex.TVar
-    ]
+    op = tokens[i].name
+    i, left = getAssignmentOperand(i + 1, tokens, length)
 
-    if (not isValidTokenInTypeList(left, validSourceTypes)):
+    if not isValidTokenInKindMask(left, INTEGER_MASK):
         raise Exception('fourth token must be literal, variable or memory pointer in binary operation')
-    
-    if (not isValidTokenInTypeList(right, validSourceTypes)):
-        raise Exception('fifth token must be literal, variable or memory pointer in binary operation')
 
-    return EBinOp(dest, op.name, left, right)
+    i, right = getAssignmentOperand(i, tokens, length)
 
-def getEProCall(group):
-    dest = group[0]
-    eq = group[1]
-    id = group[2]
-    params = group[3:]
+    if not isValidTokenInKindMask(right, INTEGER_MASK):
+        raise Exception('fifth token must be literal, variable or memory pointer in binary operation')
+
+    return getStatementEnd(i, tokens, length), EBinOp(dest, op, left, right)
 
-    if (not isValidTokenInTypeList(dest, [lex.TVar])):
+def getEProCall(dest, i, tokens, length):
+    if dest.kind != lex.KIND_VAR:
         raise Exception('first token must be variable or memory pointer in procedure call')
-    
-    if (not isinstance(eq, lex.TAssign)):
-        raise Exception('second token must be assignment in procedure call')
 
-    if (not isinstance(id, lex.TIdentifier)):
-        raise Exception('third token must be identifier in procedure call')
+    id = tokens[i].name
+    params = []
+    i += 1
 
-    validParamTypes = [
-        lex.TInt, lex.TChar,
-        lex.TIdentifier, lex.TVar
-    ]
+    while not isStatementEnd(i, tokens, length):
+        i, p = getAssignmentOperand(i, tokens, length)
 
-    for p in params:
-        if (not isValidTokenInTypeList(p, validParamTypes)):
+        if not isValidTokenInKindMask(p, PRO_CALL_PARAM_MASK):
             raise Exception('parameter token must be literal, identifier, variable or memory pointer in procedure call')
-    
-    return EProCall(dest, id.name, params)
-
-# group assignment helpers
-##########################
 
-def getParsedPointerGroup(group):
-    name = ''
-    inPointer = False
-    parsed = []
-
-    for t in group:
-        if inPointer:
-            if isinstance(t, lex.TPointRightB):
-                inPointer = False
-
-                if len(name) == 0:
-                    raise Exception('pointer reference must not be blank')
-                
-                parsed.append(lex.TPointer(name))
-                name = ''
-            elif len(name) == 0:
-                if isinstance(t, lex.TVar):
-                    name = t.name
-                else:
-                    raise Exception('pointer reference must be variable')
-            else:
-                raise Exception('pointer must not have more than one token')
-        else:
-            if isinstance(t, lex.TPointLeftB):
-                inPointer = True
-            else:
-                parsed.append(t)
-
-    return parsed
-
-def getEAssignmentOpId(group):
-    opId = OP_TYPE_COPY
-    gi = 0
-    gend = len(group)
-
-    while gi < gend:
-        t = group[gi]
-        if isinstance(t, lex.TUnOp):
-            opId = OP_TYPE_UN_OP
-        elif isinstance(t, lex.TBinOp):
-            opId = OP_TYPE_BIN_OP
-        elif isinstance(t, lex.TIdentifier) and (gi + 1 < gend):
-            opId = OP_TYPE_PRO_CALL
-
-        gi += 1
-
-    return opId
-
-def getEAssignmentByOpId(opId, group):
-    if opId == OP_TYPE_COPY:
-        return getECopy(group)
-    elif opId == OP_TYPE_UN_OP:
-        return getEUnOp(group)
-    elif opId == OP_TYPE_BIN_OP:
-        return getEBinOp(group)
-    elif opId == OP_TYPE_PRO_CALL:
-        return getEProCall(group)
-    else:
-        raise Exception('invalid assignment')
+        params.append(p)
 
-    return None
+    return getStatementEnd(i, tokens, length), EProCall(dest, id, params)
 
+# the token after the assignment decides the statement, so each line is read only once
 def getEAssignment(i, tokens, length):
-    group = []
+    i, dest = getAssignmentOperand(i, tokens, length)
 
-    while i < length:
-        t = tokens[i]
-        i += 1
+    if isStatementEnd(i, tokens, length) or (tokens[i].kind != lex.KIND_ASSIGN):
+        raise Exception('second token must be assignment')
 
-        if isinstance(t, lex.TSeparator):
-            break
-        else:
-            group.append(t)
+    i += 1
+
+    if isStatementEnd(i, tokens, length):
+        raise Exception('invalid number of tokens for assignment')
 
-    parsedPointerGroup = getParsedPointerGroup(group)
-    opId = getEAssignmentOpId(parsedPointerGroup)
-    assignment = getEAssignmentByOpId(opId, parsedPointerGroup)
+    kind = tokens[i].kind
 
-    return i, assignment
+    if kind == lex.KIND_UN_OP:
+        return getEUnOp(dest, i, tokens, length)
+    elif kind == lex.KIND_BIN_OP:
+        return getEBinOp(dest, i, tokens, length)
+    elif kind == lex.KIND_IDENTIFIER and not isStatementEnd(i + 1, tokens, length):
+        return getEProCall(dest, i, tokens, length)
+
+    return getECopy(dest, i, tokens, length)
 
 # procedures
 ############
@@ -500,7 +593,7 @@ def getEProFirstLine(i, tokens, length):
     name = ''
     params = []
 
-    if (i < length) and (isinstance(tokens[i], lex.TIdentifier)):
+    if (i < length) and (tokens[i].kind == lex.KIND_IDENTIFIER):
         name = tokens[i].name
 
     if len(name) == 0:
@@ -511,9 +604,9 @@ def getEProFirstLine(i, tokens, length):
     while i < length:
         t = tokens[i]
         i += 1
-        if isinstance(t, lex.TSeparator):
+        if t.kind == lex.KIND_SEPARATOR:
             break
-        elif isinstance(t, lex.TVar):
+        elif t.kind == lex.KIND_VAR:
             params.append(t)
         else:
             raise Exception('invalid token used as procedure parameter')
@@ -523,13 +616,13 @@ def getEProFirstLine(i, tokens, length):
 def getEProLastLine(i, tokens, length):
     ret = None
 
-    if (i < length) and (isValidTokenInTypeList(tokens[i], RETURN_TYPES)):
+    if (i < length) and (isValidTokenInKindMask(tokens[i], RETURN_MASK)):
         ret = tokens[i]
         i += 1
     else:
         raise Exception('invalid token used as procedure return value')
     
-    if (i < length) and (not isinstance(tokens[i], lex.TSeparator)):
+    if (i < length) and (tokens[i].kind != lex.KIND_SEPARATOR):
         raise Exception('procedures must be followed by separators')
 
     return i + 1, ret
@@ -539,22 +632,10 @@ def getEPro(i, tokens, length):
     expressions = []
 
     while i < length:
-        t = tokens[i]
-        if isinstance(t, lex.TSeparator):
+        kind = tokens[i].kind
+        if kind == lex.KIND_SEPARATOR:
             i += 1
-        elif isinstance(t, lex.TLabel):
-            i, elab = getELabel(i, tokens, length)
-            expressions.append(elab)
-        elif isinstance(t, lex.TJump):
-            i, eJump = getEJump(i, tokens, length)
-            expressions.append(eJump)
-        elif isinstance(t, lex.TCoJump):
-            i, eCoJump = getECoJump(i, tokens, length)
-            expressions.append(eCoJump)
-        elif isValidTokenInTypeList(t, [lex.TPointLeftB, lex.TVar]):
-            i, assignment = getEAssignment(i, tokens, length)
-            expressions.append(assignment)
-        elif isinstance(t, lex.TProRet):
+        elif kind == lex.KIND_PRO_RET:
             i, ret = getEProLastLine(i + 1, tokens, length)
             pro = EPro(
                 name,
@@ -564,7 +645,12 @@ def getEPro(i, tokens, length):
             )
             return i, pro
         else:
-            raise Exception('invalid token in sequence')
+            statement = PRO_STATEMENTS.get(kind)
+            if statement is None:
+                raise Exception('invalid token in sequence')
+
+            i, exp = statement(i, tokens, length)
+            expressions.append(exp)
         
     return i, None
 
@@ -574,24 +660,20 @@ def getEPro(i, tokens, length):
 def getEMemCollection(name, i, tokens, length):
     collection = []
 
-    validCollectionTypes = [
-        lex.TInt, lex.TChar, lex.TString
-    ]
-
     while i < length:
         t = tokens[i]
         i += 1
 
-        if isinstance(t, lex.TMemRightB):
+        if t.kind == lex.KIND_MEM_RIGHT_B:
             break
 
-        if isinstance(t, lex.TSeparator):
+        if t.kind == lex.KIND_SEPARATOR:
             continue
 
-        if (not isValidTokenInTypeList(t, validCollectionTypes)):
+        if not isValidTokenInKindMask(t, MEM_COLLECTION_MASK):
             raise Exception('token must be literal, variable or identifier in memory collection')
         
-        if len(collection) > 0 and (not isinstance(t, type(collection[-1]))):
+        if len(collection) > 0 and (t.kind != collection[-1].kind):
             raise Exception('each token must have same type in memory collection')
 
         collection.append(t)
@@ -599,7 +681,7 @@ def getEMemCollection(name, i, tokens, length):
     if len(collection) == 0:
         raise Exception('memory collection must not be empty')
     
-    if (i < length) and (not isinstance(tokens[i], lex.TSeparator)):
+    if (i < length) and (tokens[i].kind != lex.KIND_SEPARATOR):
         raise Exception('memory collections must be followed by separators')
         
     return i + 1, EMemCollection(name, collection)
@@ -608,7 +690,7 @@ def getEMemSize(name, i, tokens, length):
     size = tokens[i].value
     i += 1
 
-    if (i < length) and (not isinstance(tokens[i], lex.TSeparator)):
+    if (i < length) and (tokens[i].kind != lex.KIND_SEPARATOR):
         raise Exception('memory size blocks must be followed by separators')
 
     return i + 1, EMemSize(name, size)
@@ -616,7 +698,7 @@ def getEMemSize(name, i, tokens, length):
 def getEMem(i, tokens, length):
     name = ''
 
-    if (i < length) and (isinstance(tokens[i], lex.TIdentifier)):
+    if (i < length) and (tokens[i].kind == lex.KIND_IDENTIFIER):
         name = tokens[i].name
 
     if len(name) == 0:
@@ -626,9 +708,9 @@ def getEMem(i, tokens, length):
 
     if i < length:
         t = tokens[i]
-        if isinstance(t, lex.TMemLeftB):
+        if t.kind == lex.KIND_MEM_LEFT_B:
             return getEMemCollection(name, i + 1, tokens, length)
-        elif isinstance(t, lex.TInt):
+        elif t.kind == lex.KIND_INT:
             return getEMemSize(name, i, tokens, length)
         else:
             raise Exception('memory identifiers must be followed by collections or integer sizes')
@@ -638,6 +720,27 @@ def getEMem(i, tokens, length):
 # main expression function
 ##########################
 
+PRO_STATEMENTS = {
+    lex.KIND_LABEL: getELabel,
+    lex.KIND_JUMP: getEJump,
+    lex.KIND_CO_JUMP: getECoJump,
+    lex.KIND_POINT_LEFT_B: getEAssignment,
+    lex.KIND_VAR: getEAssignment
+}
+
+TOP_LEVEL_EXPRESSIONS = {
+    lex.KIND_PRO_ID: getEPro,
+    lex.KIND_MEM_ID: lambda i, tokens, length: getEMem(i + 1, tokens, length)
+}
+
+def getExpression(i, tokens, length):
+    expression = TOP_LEVEL_EXPRESSIONS.get(tokens[i].kind)
+
+    if expression is None:
+        raise Exception('invalid token in sequence')
+
+    return expression(i, tokens, length)
+
 def getExpressions(tokens):
     expressions = []
 
@@ -645,15 +748,53 @@ def getExpressions(tokens):
     i = 0
 
     while i < length:
-        if isinstance(tokens[i], lex.TSeparator):
+        if tokens[i].kind == lex.KIND_SEPARATOR:
             i += 1
-        elif isinstance(tokens[i], lex.TProId):
-            i, pro = getEPro(i, tokens, length)
-            expressions.append(pro)
-        elif isinstance(tokens[i], lex.TMemId):
-            i, mem = getEMem(i + 1, tokens, length)
-            expressions.append(mem)
         else:
-            raise Exception('invalid token in sequence')
+            i, exp = getExpression(i, tokens, length)
+            expressions.append(exp)
         
     return expressions
+
+# stream expression functions
+#############################
+
+def isBlockStart(t):
+    return t.kind == lex.KIND_PRO_ID or t.kind == lex.KIND_MEM_ID
+
+def getBlockExpressions(block, end):
+    expressions = []
+    length = len(block)
+    i = 0
+
+    while i < end:
+        if block[i].kind == lex.KIND_SEPARATOR:
+            i += 1
+        else:
+            i, exp = getExpression(i, block, length)
+            expressions.append(exp)
+
+    return i, expressions
+
+# only one top level block of tokens is kept in memory at a time
+def getExpressionStream(tokens):
+    block = []
+
+    for t in tokens:
+        if isBlockStart(t) and len(block) > 0:
+            # the first token of the next block is appended so the parser functions read
+            # the same tokens as in a parse of the whole list; a block start never belongs
+            # to the block before it, so an invalid block raises the error a parse of the
+            # whole list would
+            block.append(t)
+            _, blockExpressions = getBlockExpressions(block, len(block) - 1)
+            yield from blockExpressions
+            block = []
+
+        block.append(t)
+
+    _, blockExpressions = getBlockExpressions(block, len(block))
+    yield from blockExpressions
+
+def getExpressionsFromStream(tokens):
+    return list(getExpressionStream(tokens))
@@ -0,0 +1,334 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.cfg as cfg
+import lib.ssa as ssa
+import lib.statements as st
+import lib.folding as fold
+
+#
+# Lattice
+#
+
+# a variable with no value yet is missing from the values, one that can hold more than a
+# single value is varying
+VARYING = 'varying'
+
+def getMeet(a, b):
+    if a is None:
+        return b
+
+    if b is None or a == b:
+        return a
+
+    return VARYING
+
+def isConstValue(value):
+    return value is not None and value != VARYING
+
+COMPARISONS = {
+    gram.JIL: lambda left, right: left < right,
+    gram.JILE: lambda left, right: left <= right,
+    gram.JIE: lambda left, right: left == right,
+    gram.JIN: lambda left, right: left != right,
+    gram.JIGE: lambda left, right: left >= right,
+    gram.JIG: lambda left, right: left > right
+}
+
+#
+# Propagation
+#
+
+def getDefinedVars(form):
+    defined = set()
+
+    for block in form.cfg.blocks:
+        defined.update([phi.dest.name for phi in form.phis[block.id]])
+        for exp in block.expressions:
+            defined.update(exp.defs)
+
+    return defined
+
+def getVarUses(form):
+    uses = {}
+
+    for block in form.cfg.blocks:
+        for exp in form.phis[block.id] + block.expressions:
+            for name in exp.uses:
+                uses.setdefault(name, []).append((block.id, exp))
+
+    return uses
+
+# flow edges and variables are worked off together, a statement is only evaluated once its
+# block is known to run and a phi only meets the arguments of edges known to be taken
+class Propagation:
+    def __init__(self, form):
+        self.form = form
+        self.graph = form.cfg
+        self.values = {}
+        self.defined = getDefinedVars(form)
+        self.uses = getVarUses(form)
+        self.blocks = set()
+        self.edges = set()
+        self.flowWork = [(None, 0)]
+        self.varWork = []
+
+    # entry values, narrow reads, addresses and loads are never constant
+    def getTokenValue(self, t):
+        if t.kind == lex.KIND_VAR:
+            if t.width < fold.WORD_WIDTH or t.name not in self.defined:
+                return VARYING
+            return self.values.get(t.name)
+
+        if t.kind == lex.KIND_INT or t.kind == lex.KIND_CHAR:
+            value = fold.getConstValue(t)
+            return VARYING if value is None else value
+
+        return VARYING
+
+    def getCopyValue(self, exp):
+        return self.getTokenValue(exp.source)
+
+    def getUnOpValue(self, exp):
+        value = self.getTokenValue(exp.source)
+
+        if not isConstValue(value):
+            return value
+
+        return fold.getUnOpValue(exp.op, value, exp.dest.width)
+
+    def getBinOpValue(self, exp):
+        left = self.getTokenValue(exp.left)
+        right = self.getTokenValue(exp.right)
+
+        if left == VARYING or right == VARYING:
+            return VARYING
+
+        if left is None or right is None:
+            return None
+
+        value = fold.getBinOpValue(exp.op, left, right, exp.dest.width)
+        return VARYING if value is None else value
+
+    def getBranch(self, exp):
+        left = self.getTokenValue(exp.left)
+        right = self.getTokenValue(exp.right)
+
+        if left == VARYING or right == VARYING:
+            return VARYING
+
+        if left is None or right is None:
+            return None
+
+        return COMPARISONS[exp.name](left, right)
+
+    def setValue(self, name, value):
+        old = self.values.get(name)
+        value = getMeet(old, value)
+
+        if value != old:
+            self.values[name] = value
+            self.varWork.append(name)
+
+    def addEdge(self, pred, succ):
+        if (pred, succ) not in self.edges:
+            self.edges.add((pred, succ))
+            self.flowWork.append((pred, succ))
+
+    def visitPhi(self, block, phi):
+        value = None
+
+        for j in range(len(block.preds)):
+            if (block.preds[j], block.id) in self.edges:
+                value = getMeet(value, self.getTokenValue(phi.args[j]))
+
+        self.setValue(phi.dest.name, value)
+
+    def visitStatement(self, block, exp):
+        if exp.kind == par.EXP_KIND_CO_JUMP:
+            self.visitControl(block)
+            return
+
+        dest = st.getDest(exp)
+
+        if dest is not None and dest.kind == lex.KIND_VAR:
+            if exp.kind == par.EXP_KIND_COPY:
+                self.setValue(dest.name, self.getCopyValue(exp))
+            elif exp.kind == par.EXP_KIND_UN_OP:
+                self.setValue(dest.name, self.getUnOpValue(exp))
+            elif exp.kind == par.EXP_KIND_BIN_OP:
+                self.setValue(dest.name, self.getBinOpValue(exp))
+            else:
+                self.setValue(dest.name, VARYING)
+
+    def visitControl(self, block):
+        for succ in getFeasibleSuccs(self, block):
+            self.addEdge(block.id, succ)
+
+    def visitBlock(self, id):
+        block = self.graph.blocks[id]
+
+        for phi in self.form.phis[id]:
+            self.visitPhi(block, phi)
+
+        if id in self.blocks:
+            return
+
+        self.blocks.add(id)
+
+        for exp in block.expressions:
+            self.visitStatement(block, exp)
+
+        self.visitControl(block)
+
+    def visitUses(self, name):
+        for id, exp in self.uses.get(name, []):
+            if id in self.blocks:
+                block = self.graph.blocks[id]
+                if exp.kind == par.EXP_KIND_PHI:
+                    self.visitPhi(block, exp)
+                else:
+                    self.visitStatement(block, exp)
+
+    def solve(self):
+        while len(self.flowWork) > 0 or len(self.varWork) > 0:
+            while len(self.flowWork) > 0:
+                self.visitBlock(self.flowWork.pop()[1])
+
+            while len(self.varWork) > 0:
+                self.visitUses(self.varWork.pop())
+
+def getFallthrough(graph, block):
+    if block.id + 1 < len(graph.blocks):
+        return block.id + 1
+
+    return None
+
+# the successors a block can go on to with what is known so far, none while a branch
+# still compares a value that has not been reached
+def getFeasibleSuccs(propagation, block):
+    last = block.getLast()
+
+    if last is None or last.kind != par.EXP_KIND_CO_JUMP:
+        return block.succs
+
+    taken = propagation.getBranch(last)
+
+    if taken is None:
+        return []
+
+    if taken == VARYING:
+        return block.succs
+
+    if taken:
+        return [propagation.graph.labels[last.labelName]]
+
+    fallthrough = getFallthrough(propagation.graph, block)
+    return [] if fallthrough is None else [fallthrough]
+
+#
+# Rewriting
+#
+
+# a decided branch becomes a jump or goes away, and the edge it no longer takes is removed
+def setDecidedBranches(propagation):
+    form = propagation.form
+    graph = form.cfg
+    changed = False
+
+    for id in sorted(propagation.blocks):
+        block = graph.blocks[id]
+        last = block.getLast()
+
+        if last is None or last.kind != par.EXP_KIND_CO_JUMP:
+            continue
+
+        taken = propagation.getBranch(last)
+        if not isConstValue(taken):
+            continue
+
+        target = graph.labels[last.labelName]
+        fallthrough = getFallthrough(graph, block)
+        changed = True
+
+        if taken:
+            block.expressions = block.expressions[:-1] + [par.EJump(gram.JUMP, last.labelName)]
+            if fallthrough is not None and fallthrough != target:
+                ssa.removeEdge(form, id, fallthrough)
+            if id in graph.exits:
+                graph.exits.remove(id)
+        else:
+            block.expressions = block.expressions[:-1]
+            if target != fallthrough:
+                ssa.removeEdge(form, id, target)
+
+    return changed
+
+def getKnownArg(t, consts):
+    if st.isVarToken(t) and t.width == fold.WORD_WIDTH and t.name in consts:
+        return fold.getConstToken(consts[t.name])
+
+    return t
+
+def getLabelCount(exps):
+    i = 0
+
+    while i < len(exps) and exps[i].kind == par.EXP_KIND_LABEL:
+        i += 1
+
+    return i
+
+# a phi with a constant result becomes a copy at the top of its block, and constants are
+# put in where the code generator can take them, the same as local folding does
+def setConstants(propagation, consts):
+    form = propagation.form
+    changed = False
+
+    for id in sorted(propagation.blocks):
+        block = form.cfg.blocks[id]
+        phis = []
+        copies = []
+
+        for phi in form.phis[id]:
+            if phi.dest.name in consts:
+                copies.append(par.ECopy(phi.dest, fold.getConstToken(consts[phi.dest.name])))
+                continue
+
+            args = [getKnownArg(a, consts) for a in phi.args]
+            phis.append(par.EPhi(phi.dest, args))
+            changed = changed or any(args[j] is not phi.args[j] for j in range(len(args)))
+
+        exps = []
+        for exp in block.expressions:
+            if exp.kind in fold.FOLDED_STATEMENTS:
+                folded = fold.FOLDED_STATEMENTS[exp.kind](exp, consts)
+                changed = changed or folded is not exp
+                exp = folded
+            exps.append(exp)
+
+        i = getLabelCount(exps)
+        form.phis[id] = phis
+        block.expressions = exps[:i] + copies + exps[i:]
+        changed = changed or len(copies) > 0
+
+    return changed
+
+def getPropagatedPro(pro):
+    form = ssa.getSsaPro(pro)
+
+    if form is None:
+        return pro
+
+    propagation = Propagation(form)
+    propagation.solve()
+
+    consts = {name: value for name, value in propagation.values.items() if isConstValue(value)}
+    changed = setDecidedBranches(propagation)
+    changed = setConstants(propagation, consts) or changed
+
+    if not changed:
+        return pro
+
+    ret = getKnownArg(form.ret, consts)
+    exps = cfg.getReachableCode(ssa.getExpressionsFromSsa(form))
+    return par.EPro(pro.name, pro.params, exps, ret)
@@ -1,4 +1,7 @@
 import lib.parser as par
+import lib.linear_ir as lir
+import lib.cfg as cfg
+import lib.dataflow as dfa
 
 OVER = 'over'
 SPILL = 'spill'
@@ -9,109 +12,221 @@ def printDict(di):
         v = di[k]
         print('{ ' + str(k) + ' : ' + str(v) + ' }')
 
-def getIntervals(expressions, varType):
-    line = 0
-    length = len(expressions)
-    intervals = {}
+def getLiveness(lpro):
+    retNames = [v for v in [par.getTokenVar(lpro.getRet())] if v is not None]
+    return dfa.getLiveness(cfg.getCfg(lpro.getFlowStatements()), retNames, lpro.vars)
+
+# live ranges come from liveness over the control flow graph, so values carried around a
+# loop stay live across the back edge and a variable is free in the holes between its uses
+def getLiveRanges(liveness):
+    lines = dfa.getLiveLines(liveness)
+    return [dfa.getRanges(l) for l in lines]
+
+#
+# Copy Coalescing
+#
+
+# full width copies from one variable to another, as line, dest id and source id
+def getCopies(lpro):
+    copies = []
+
+    for i in range(len(lpro.opcodes)):
+        if lpro.opcodes[i] == lir.OP_COPY:
+            dest = lpro.dests[i]
+            source = lpro.lefts[i]
+            if isWordVarOperand(dest) and isWordVarOperand(source) and (dest != source):
+                copies.append((i, lir.getOperandIndex(dest), lir.getOperandIndex(source)))
+
+    return copies
+
+def isWordVarOperand(operand):
+    return (lir.getOperandTag(operand) == lir.OPERAND_VAR) and (lir.getOperandWidth(operand) == 8)
+
+def getPairKey(a, b):
+    return (a, b) if a < b else (b, a)
+
+class CopyPartners:
+    def __init__(self, copies):
+        self.partners = {}
+        self.bits = {}
+        self.interfering = set()
+
+        for line, dest, source in copies:
+            if not self.isPartner(dest, source):
+                self.partners.setdefault(dest, []).append(source)
+                self.partners.setdefault(source, []).append(dest)
+                self.bits[dest] = self.bits.get(dest, 0) | (1 << source)
+                self.bits[source] = self.bits.get(source, 0) | (1 << dest)
+
+    def getPartners(self, id):
+        return self.partners.get(id, [])
+
+    def isPartner(self, a, b):
+        return (self.bits.get(a, 0) >> b) & 1 == 1
+
+    def isInterfering(self, a, b):
+        return getPairKey(a, b) in self.interfering
+
+    def setInterfering(self, id, conflicts):
+        for n in dfa.getBitIds(conflicts & self.bits.get(id, 0)):
+            if n != id:
+                self.interfering.add(getPairKey(id, n))
+
+# partners interfere when one is written while the other is live after the write, except
+# for the copy between them, which leaves both holding the same value
+def setInterference(partners, liveness, copies, params):
+    sources = {line: source for line, dest, source in copies}
+
+    for block in liveness.cfg.blocks:
+        live = liveness.outs[block.id]
+        line = block.getEnd()
+
+        for expUses, expDefs in reversed(liveness.bits[block.id]):
+            line -= 1
+            conflicts = live
+
+            if line in sources:
+                conflicts &= ~(1 << sources[line])
+
+            for id in dfa.getBitIds(expDefs):
+                partners.setInterfering(id, conflicts)
+
+            live = (live & ~expDefs) | expUses
+
+    # parameters are all written on entry
+    entry = liveness.ins[0] if len(liveness.cfg.blocks) > 0 else 0
+    for id in params:
+        partners.setInterfering(id, entry | sum(1 << p for p in params))
+
+def isReg(reg):
+    return (reg is not None) and (reg != SPILL) and (reg != OVER)
+
+# a variable can share the register of a copy partner when it interferes with none of the
+# variables holding that register, partners are checked exactly and the rest by live range
+def isRegFreeFor(ranges, holders, partners, id, reg):
+    for n in holders.get(reg, []):
+        if partners.isPartner(n, id):
+            if partners.isInterfering(n, id):
+                return False
+        elif dfa.areRangesOverlapping(ranges[n], ranges[id]):
+            return False
+
+    return True
+
+def getPartnerReg(ranges, assignments, holders, partners, id):
+    for partner in partners.getPartners(id):
+        reg = assignments[partner]
+        if isReg(reg) and isRegFreeFor(ranges, holders, partners, id, reg):
+            return reg
+
+    return None
+
+def getRegHolders(assignments):
+    holders = {}
 
-    for line in range(length):
-        exp = expressions[line]
-        params = par.getParamsFromExpression(exp)
+    for id in range(len(assignments)):
+        if isReg(assignments[id]):
+            holders.setdefault(assignments[id], []).append(id)
 
-        for param in params:
-            if isinstance(param, varType):
-                name = param.name
-                if name in intervals:
-                    intervals[name][1] = line
-                else:
-                    intervals[name] = [line, line]
+    return holders
 
-    return intervals
+#
+# Assignments
+#
 
-def getInitialAssignments(allRegs, pro, intervals, maxArgs, varType):
-    assignments = {}
+def getInitialAssignments(allRegs, lpro, ranges, maxArgs, partners):
+    assignments = [None] * len(ranges)
+    holders = {}
+    order = []
 
     ri = 0
     rend = len(allRegs)
 
-    params = [p for p in pro.params if isinstance(p, varType)]
+    params = [p for p in lpro.params if lir.getOperandTag(p) == lir.OPERAND_VAR]
     pi = 0
     pend = len(params)
 
     while pi < pend:
-        param = params[pi]
-        
-        if isinstance(param, varType):
-            name = param.name
-            if (pi >= maxArgs) or (ri >= rend):
-                assignments[name] = OVER
-            else:
-                reg = allRegs[ri]
-                assignments[name] = reg
-                ri += 1
+        id = lir.getOperandIndex(params[pi])
+
+        if assignments[id] is None:
+            order.append(id)
+
+        if (pi >= maxArgs) or (ri >= rend):
+            assignments[id] = OVER
+        else:
+            reg = allRegs[ri]
+            assignments[id] = reg
+            holders.setdefault(reg, []).append(id)
+            ri += 1
 
         pi += 1
 
-    for name in intervals:
-        if (name not in assignments):
-            if ri < rend:
+    # a copy partner's register is taken before a new one, so the copy needs no move
+    for id in range(1, len(ranges)):
+        if (ranges[id] is not None) and (assignments[id] is None):
+            order.append(id)
+            reg = getPartnerReg(ranges, assignments, holders, partners, id)
+            if reg is not None:
+                assignments[id] = reg
+                holders[reg].append(id)
+            elif ri < rend:
                 reg = allRegs[ri]
-                assignments[name] = reg
+                assignments[id] = reg
+                holders.setdefault(reg, []).append(id)
                 ri += 1
             else:
-                assignments[name] = SPILL
-
-    return assignments
-
-def isConcurrentInterval(a, b):
-    f0 = a[0] >= b[0] and a[0] <= b[1]
-    f1 = a[1] >= b[0] and a[1] <= b[1]
-    f2 = a[0] <= b[0] and a[1] >= b[1]
-    return f0 or f1 or f2
-
-def getFirstFreeReg(intervals, assignments, name, interval):
-    lowerIntervals = []
-    concurrentIntervals = {}
-
-    for n in intervals:
-        if n != name:
-            i = intervals[n]
-            if i[1] < interval[0]:
-                reg = assignments[n]
-                if (reg != SPILL) and (reg != OVER):
-                    lowerIntervals.append(reg)
-            elif isConcurrentInterval(i, interval):
-                reg = assignments[n]
-                if (reg != SPILL) and (reg != OVER):
-                    concurrentIntervals[reg] = True
-
-    for reg in lowerIntervals:
-        if (reg not in concurrentIntervals):
+                assignments[id] = SPILL
+
+    return assignments, order
+
+# registers are tried in variable order, and a register is free when no variable holding
+# it overlaps the live ranges of the spilled variable
+def getFirstFreeReg(ranges, assignments, id):
+    candidates = []
+    blocked = {}
+
+    for n in range(1, len(ranges)):
+        r = ranges[n]
+        reg = assignments[n]
+        if (n != id) and (r is not None) and (reg != SPILL) and (reg != OVER):
+            if dfa.areRangesOverlapping(r, ranges[id]):
+                blocked[reg] = True
+            else:
+                candidates.append(reg)
+
+    for reg in candidates:
+        if (reg not in blocked):
             return reg
 
     return SPILL
 
-def getDictCopy(original):
-    copy = {}
-    for k in original:
-        copy[k] = original[k]
-
-    return copy
+def getRefinedAssignments(ranges, assignments, order, partners):
+    refined = list(assignments)
+    holders = getRegHolders(refined)
 
-def getRefinedAssignments(intervals, assignments):
-    refined = getDictCopy(assignments)
-    for name in refined:
-        reg = refined[name]
+    for id in order:
+        reg = refined[id]
         if reg == SPILL:
-            interval = intervals[name]
-            freeReg = getFirstFreeReg(intervals, refined, name, interval)
+            freeReg = getPartnerReg(ranges, refined, holders, partners, id)
+            if freeReg is None:
+                freeReg = getFirstFreeReg(ranges, refined, id)
             if freeReg != SPILL:
-                refined[name] = freeReg
+                refined[id] = freeReg
+                holders.setdefault(freeReg, []).append(id)
 
     return refined
 
-def getAssignmentDict(allRegs, pro, maxArgs, varType):
-    intervals = getIntervals(pro.expressions, varType)
-    assignments = getInitialAssignments(allRegs, pro, intervals, maxArgs, varType)
-    refined = getRefinedAssignments(intervals, assignments)
-    return refined
+def getLinearAssignmentDict(allRegs, lpro, maxArgs):
+    liveness = getLiveness(lpro)
+    ranges = getLiveRanges(liveness)
+    copies = getCopies(lpro)
+    partners = CopyPartners(copies)
+    params = [lir.getOperandIndex(p) for p in lpro.params if lir.getOperandTag(p) == lir.OPERAND_VAR]
+    setInterference(partners, liveness, copies, params)
+    assignments, order = getInitialAssignments(allRegs, lpro, ranges, maxArgs, partners)
+    refined = getRefinedAssignments(ranges, assignments, order, partners)
+    return {lpro.vars.getName(id): refined[id] for id in order}
+
+def getAssignmentDict(allRegs, pro, maxArgs):
+    return getLinearAssignmentDict(allRegs, lir.getLinearPro(pro), maxArgs)
@@ -0,0 +1,274 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+import lib.cfg as cfg
+import lib.dataflow as dfa
+import lib.statements as st
+
+SSA_LABEL_PREFIX = '@ssa'
+
+#
+# Ssa Procedure
+#
+
+# every definition gets a fresh variable and the original name of a variable stands for
+# its value on entry, so parameters keep their names
+class SsaPro:
+    def __init__(self, pro, graph):
+        self.name = pro.name
+        self.params = pro.params
+        self.ret = pro.ret
+        self.cfg = graph
+        self.phis = [[] for _ in graph.blocks]
+        self.nextVar = st.getFirstFreeVar(pro)
+        self.labels = set(graph.labels)
+
+    def getFreshVar(self):
+        name = st.getVarName(self.nextVar)
+        self.nextVar += 1
+        return name
+
+    def toString(self):
+        lines = ['ssa ' + self.name + ''.join([' ' + p.toString() for p in self.params])]
+
+        for block in self.cfg.blocks:
+            lines.append('\t' + block.toString())
+            lines.extend(['\t\t' + phi.toString() for phi in self.phis[block.id]])
+            lines.extend(['\t\t' + exp.toString() for exp in block.expressions])
+
+        lines.append('\tret ' + self.ret.toString())
+        return '\n'.join(lines) + '\n'
+
+# a narrow write keeps the upper bits of its variable, so it is a use as much as a
+# definition and such procedures are left out of ssa form
+def isSsaCandidate(pro):
+    for exp in pro.expressions:
+        dest = st.getDest(exp)
+        if dest is not None and dest.kind == lex.KIND_VAR and dest.width < 8:
+            return False
+
+    return True
+
+#
+# Construction
+#
+
+def getDefBlocks(graph):
+    defBlocks = {}
+
+    for block in graph.blocks:
+        for exp in block.expressions:
+            for name in exp.uses | exp.defs:
+                defBlocks.setdefault(name, {0})
+            for name in exp.defs:
+                defBlocks[name].add(block.id)
+
+    return defBlocks
+
+# pruned placement, a phi is only placed where its variable is live on entry
+def getPhiVars(graph, retNames):
+    liveness = dfa.getLiveness(graph, retNames)
+    frontiers = cfg.getDominanceFrontiers(graph)
+    defBlocks = getDefBlocks(graph)
+    phiVars = [[] for _ in graph.blocks]
+
+    for name in defBlocks:
+        bit = 1 << liveness.vars.getId(name)
+        placed = set()
+        worklist = list(defBlocks[name])
+
+        while len(worklist) > 0:
+            id = worklist.pop()
+            for frontier in frontiers[id]:
+                if frontier not in placed and (liveness.ins[frontier] & bit):
+                    placed.add(frontier)
+                    phiVars[frontier].append(name)
+                    if frontier not in defBlocks[name]:
+                        worklist.append(frontier)
+
+    return phiVars
+
+class Renaming:
+    def __init__(self, ssa, phiVars):
+        self.ssa = ssa
+        self.phiVars = phiVars
+        self.phiDests = [[None] * len(vars) for vars in phiVars]
+        self.phiArgs = [[[None] * len(ssa.cfg.blocks[id].preds) for _ in phiVars[id]] for id in range(len(phiVars))]
+        self.stacks = {}
+
+    def getCurrent(self, name):
+        stack = self.stacks.get(name)
+
+        if stack is None or len(stack) == 0:
+            return name
+
+        return stack[-1]
+
+    def push(self, name, pushed):
+        fresh = self.ssa.getFreshVar()
+        self.stacks.setdefault(name, []).append(fresh)
+        pushed.append(name)
+        return fresh
+
+def renameBlock(renaming, block, pushed):
+    ssa = renaming.ssa
+    vars = renaming.phiVars[block.id]
+
+    for i in range(len(vars)):
+        renaming.phiDests[block.id][i] = renaming.push(vars[i], pushed)
+
+    exps = []
+    for exp in block.expressions:
+        uses = {name: renaming.getCurrent(name) for name in exp.uses}
+        defName = None
+        for name in exp.defs:
+            defName = renaming.push(name, pushed)
+        exps.append(st.getRenamedStatement(exp, uses, defName))
+
+    block.expressions = exps
+
+    for succ in block.succs:
+        j = ssa.cfg.blocks[succ].preds.index(block.id)
+        succVars = renaming.phiVars[succ]
+        for i in range(len(succVars)):
+            renaming.phiArgs[succ][i][j] = renaming.getCurrent(succVars[i])
+
+    if block.id in ssa.cfg.exits:
+        ssa.ret = st.getRenamedToken(ssa.ret, {n: renaming.getCurrent(n) for n in [par.getTokenVar(ssa.ret)] if n is not None})
+
+# the dominator tree is walked with an explicit stack, and the names pushed in a block are
+# popped once all blocks it dominates are renamed
+def renameVars(ssa, phiVars):
+    renaming = Renaming(ssa, phiVars)
+    graph = ssa.cfg
+    stack = [(0, None)]
+
+    while len(stack) > 0:
+        id, pushed = stack.pop()
+
+        if pushed is not None:
+            for name in pushed:
+                renaming.stacks[name].pop()
+            continue
+
+        pushed = []
+        renameBlock(renaming, graph.blocks[id], pushed)
+        stack.append((id, pushed))
+        stack.extend([(child, None) for child in reversed(graph.domChildren[id])])
+
+    for id in range(len(phiVars)):
+        for i in range(len(phiVars[id])):
+            dest = lex.TVar(renaming.phiDests[id][i], 8)
+            args = [lex.TVar(name, 8) for name in renaming.phiArgs[id][i]]
+            ssa.phis[id].append(par.EPhi(dest, args))
+
+# unreachable blocks are dropped first, so every block is in the dominator tree
+def getSsaPro(pro):
+    if not isSsaCandidate(pro):
+        return None
+
+    graph = cfg.getCfg(cfg.getReachableExpressions(cfg.getProCfg(pro)))
+    ssa = SsaPro(pro, graph)
+    retNames = [n for n in [par.getTokenVar(pro.ret)] if n is not None]
+    renameVars(ssa, getPhiVars(graph, retNames))
+    return ssa
+
+# the phi arguments of the edge go with it
+def removeEdge(ssa, pred, succ):
+    graph = ssa.cfg
+    j = graph.blocks[succ].preds.index(pred)
+    graph.blocks[pred].succs.remove(succ)
+    del graph.blocks[succ].preds[j]
+    ssa.phis[succ] = [par.EPhi(phi.dest, phi.args[:j] + phi.args[j + 1:]) for phi in ssa.phis[succ]]
+
+#
+# Destruction
+#
+
+# parallel copies are emitted once no other pending copy reads their destination, and a
+# cycle is broken by saving one destination in a fresh variable
+def getSequentialCopies(ssa, copies):
+    pending = [(d, s) for d, s in copies if not (st.isVarToken(s) and s.name == d.name)]
+    sequence = []
+
+    while len(pending) > 0:
+        sources = {s.name for d, s in pending if st.isVarToken(s)}
+        ready = [(d, s) for d, s in pending if d.name not in sources]
+
+        if len(ready) > 0:
+            sequence.extend([par.ECopy(d, s) for d, s in ready])
+            pending = [(d, s) for d, s in pending if d.name in sources]
+        else:
+            dest = pending[0][0]
+            temp = lex.TVar(ssa.getFreshVar(), 8)
+            sequence.append(par.ECopy(temp, dest))
+            pending = [(d, temp if st.isVarToken(s) and s.name == dest.name else s) for d, s in pending]
+
+    return sequence
+
+def getEdgeCopies(ssa, pred, succ):
+    j = ssa.cfg.blocks[succ].preds.index(pred)
+    copies = [(phi.dest, phi.args[j]) for phi in ssa.phis[succ]]
+    return getSequentialCopies(ssa, copies)
+
+def isTerminator(exp):
+    return exp is not None and exp.kind in cfg.JUMP_KINDS
+
+# copies of an edge go at the end of a predecessor with one successor, and edges leaving
+# a conditional jump get their own block; the fallthrough edge keeps its copies right after
+# the jump, the taken edge jumps through a new block placed after the procedure body
+def getExpressionsFromSsa(ssa):
+    graph = ssa.cfg
+    exps = []
+    trailer = []
+
+    for block in graph.blocks:
+        last = block.getLast()
+        body = block.expressions[:-1] if isTerminator(last) else list(block.expressions)
+        phiSuccs = [s for s in block.succs if len(ssa.phis[s]) > 0]
+        leavesOnce = len(block.succs) == 1 and not (block.id in graph.exits and last.kind == par.EXP_KIND_CO_JUMP)
+
+        if len(phiSuccs) == 0:
+            exps.extend(block.expressions)
+        elif leavesOnce:
+            exps.extend(body)
+            exps.extend(getEdgeCopies(ssa, block.id, block.succs[0]))
+
+            # a conditional jump to the next block goes the same way on both paths
+            if last is not None and last.kind == par.EXP_KIND_JUMP:
+                exps.append(last)
+        else:
+            fallthrough = block.id + 1
+            target = graph.labels[last.labelName]
+            jump = last
+
+            if target in phiSuccs:
+                label = st.getFreshLabel(ssa.labels, SSA_LABEL_PREFIX)
+                jump = par.ECoJump(last.name, last.left, last.right, label)
+                trailer.append(par.ELabel(label))
+                trailer.extend(getEdgeCopies(ssa, block.id, target))
+                trailer.append(par.EJump(gram.JUMP, last.labelName))
+
+            exps.extend(body)
+            exps.append(jump)
+
+            if fallthrough in phiSuccs:
+                exps.extend(getEdgeCopies(ssa, block.id, fallthrough))
+
+    if len(trailer) > 0 and (len(graph.blocks) - 1) in graph.exits:
+        label = st.getFreshLabel(ssa.labels, SSA_LABEL_PREFIX)
+        exps.append(par.EJump(gram.JUMP, label))
+        trailer.append(par.ELabel(label))
+
+    return exps + trailer
+
+def getProFromSsa(ssa):
+    return par.EPro(ssa.name, ssa.params, getExpressionsFromSsa(ssa), ssa.ret)
+
+def getSsaRoundTrip(pro):
+    ssa = getSsaPro(pro)
+
+    if ssa is None:
+        return pro
+
+    return getProFromSsa(ssa)
@@ -0,0 +1,146 @@
+import lib.grammar as gram
+import lib.lexer as lex
+import lib.parser as par
+
+#
+# Statement Operands
+#
+
+# statements are never changed in place, since their use and def sets are built once, so
+# passes read the operands and build a new statement of the same kind
+
+STATEMENT_OPERANDS = {
+    par.EXP_KIND_CO_JUMP: lambda exp: [exp.left, exp.right],
+    par.EXP_KIND_COPY: lambda exp: [exp.source],
+    par.EXP_KIND_UN_OP: lambda exp: [exp.source],
+    par.EXP_KIND_BIN_OP: lambda exp: [exp.left, exp.right],
+    par.EXP_KIND_PRO_CALL: lambda exp: exp.params
+}
+
+STATEMENT_BUILDERS = {
+    par.EXP_KIND_CO_JUMP: lambda exp, dest, operands: par.ECoJump(exp.name, operands[0], operands[1], exp.labelName),
+    par.EXP_KIND_COPY: lambda exp, dest, operands: par.ECopy(dest, operands[0]),
+    par.EXP_KIND_UN_OP: lambda exp, dest, operands: par.EUnOp(dest, exp.op, operands[0]),
+    par.EXP_KIND_BIN_OP: lambda exp, dest, operands: par.EBinOp(dest, exp.op, operands[0], operands[1]),
+    par.EXP_KIND_PRO_CALL: lambda exp, dest, operands: par.EProCall(dest, exp.id, operands)
+}
+
+def getOperands(exp):
+    operands = STATEMENT_OPERANDS.get(exp.kind)
+
+    if operands is None:
+        return []
+
+    return operands(exp)
+
+def getDest(exp):
+    if exp.kind in STATEMENT_BUILDERS and exp.kind != par.EXP_KIND_CO_JUMP:
+        return exp.dest
+
+    return None
+
+def getStatement(exp, dest, operands):
+    return STATEMENT_BUILDERS[exp.kind](exp, dest, operands)
+
+def isVarToken(t):
+    return t.kind == lex.KIND_VAR
+
+def isConstToken(t):
+    return t.kind == lex.KIND_INT or t.kind == lex.KIND_CHAR
+
+# a store or a narrow write reads its destination as well
+def isDestRead(dest):
+    return dest.kind == lex.KIND_POINTER or (dest.kind == lex.KIND_VAR and dest.width < 8)
+
+def getCallTargetVar(exp):
+    id = exp.id
+
+    if (len(id) > 1) and (id[0] == gram.PRO_VAR_CALL) and gram.isVar(id[1:]):
+        return gram.getVarComponents(id[1:])[0]
+
+    return None
+
+#
+# Renaming
+#
+
+def getRenamedToken(t, names):
+    if t.kind == lex.KIND_VAR:
+        name = names.get(t.name)
+        if name is not None:
+            return lex.TVar(name, t.width)
+    elif t.kind == lex.KIND_POINTER:
+        var = par.getTokenVar(t)
+        if var is not None and var in names:
+            return lex.TPointer(names[var])
+
+    return t
+
+# uses maps the names read by the statement, defName is the new name of the variable it
+# writes
+def getRenamedStatement(exp, uses, defName):
+    if exp.kind not in STATEMENT_BUILDERS:
+        return exp
+
+    operands = [getRenamedToken(t, uses) for t in getOperands(exp)]
+    dest = getDest(exp)
+
+    if dest is not None:
+        if dest.kind == lex.KIND_POINTER:
+            dest = getRenamedToken(dest, uses)
+        elif defName is not None:
+            dest = lex.TVar(defName, dest.width)
+
+    renamed = getStatement(exp, dest, operands)
+
+    if exp.kind == par.EXP_KIND_PRO_CALL:
+        target = getCallTargetVar(exp)
+        if target is not None and target in uses:
+            renamed = par.EProCall(dest, gram.PRO_VAR_CALL + uses[target], operands)
+
+    return renamed
+
+#
+# Jump Targets
+#
+
+def getRetargetedJump(exp, labelName):
+    if exp.kind == par.EXP_KIND_JUMP:
+        return par.EJump(exp.name, labelName)
+
+    return par.ECoJump(exp.name, exp.left, exp.right, labelName)
+
+#
+# Fresh Names
+#
+
+def getVarNumber(name):
+    return int(gram.getVarComponents(name)[0][1:])
+
+# one above the highest variable number in the procedure, so new variables never clash
+def getFirstFreeVar(pro):
+    highest = -1
+
+    for t in pro.params + [pro.ret]:
+        if t.kind == lex.KIND_VAR:
+            highest = max(highest, getVarNumber(t.name))
+
+    for exp in pro.expressions:
+        for name in exp.uses | exp.defs:
+            highest = max(highest, getVarNumber(name))
+
+    return highest + 1
+
+def getVarName(number):
+    return 'x' + str(number)
+
+# labels is the set of label names already in use, and the new label is added to it
+def getFreshLabel(labels, prefix):
+    i = 0
+
+    while (prefix + str(i)) in labels:
+        i += 1
+
+    label = prefix + str(i)
+    labels.add(label)
+    return label
@@ -0,0 +1,118 @@
+import lib.parser as par
+import lib.grammar as gram
+import lib.cfg as cfg
+import lib.ssa as ssa
+import lib.statements as st
+import lib.folding as fold
+import lib.inliner as inl
+
+TAIL_LABEL_PREFIX = '@tail'
+
+#
+# Tail Positions
+#
+
+def getLabelPositions(exps):
+    return {exp.name: i for i, exp in enumerate(exps) if exp.kind == par.EXP_KIND_LABEL}
+
+def isPlainCopy(exp):
+    return exp.kind == par.EXP_KIND_COPY and fold.isWordVar(exp.dest) and fold.isWordVar(exp.source)
+
+# the variable holding the result of a call when the procedure returns, as long as only
+# labels, jumps and copies lie in between; a chain of jumps going round in a circle never
+# gets there
+def getReturnedVar(exps, i, positions):
+    name = exps[i].dest.name
+    seen = set()
+    i += 1
+
+    while i < len(exps):
+        exp = exps[i]
+
+        if exp.kind == par.EXP_KIND_LABEL:
+            i += 1
+        elif exp.kind == par.EXP_KIND_JUMP and exp.labelName not in seen:
+            seen.add(exp.labelName)
+            i = positions[exp.labelName]
+        elif isPlainCopy(exp) and (exp.source.name == name or exp.dest.name != name):
+            if exp.source.name == name:
+                name = exp.dest.name
+            i += 1
+        else:
+            return None
+
+    return name
+
+# a call is in tail position when what it returns is what the procedure returns
+def isTailCall(exps, i, positions, ret):
+    exp = exps[i]
+
+    if exp.kind != par.EXP_KIND_PRO_CALL or not (fold.isWordVar(exp.dest) and fold.isWordVar(ret)):
+        return False
+
+    return getReturnedVar(exps, i, positions) == ret.name
+
+# the arguments go through plain copies into the parameters
+def isSelfTailCall(pro, exps, i, positions):
+    exp = exps[i]
+
+    if exp.kind != par.EXP_KIND_PRO_CALL or exp.id != pro.name or len(exp.params) != len(pro.params):
+        return False
+
+    if not all(fold.isWordVar(p) for p in pro.params):
+        return False
+
+    return all(inl.isInlinedOperand(a) for a in exp.params) and isTailCall(exps, i, positions, pro.ret)
+
+#
+# Looped Procedure
+#
+
+# the arguments are all read before any parameter is written, the same parallel copy an
+# ssa phi leaves behind
+class TailCalls:
+    def __init__(self, pro):
+        self.pro = pro
+        self.nextVar = st.getFirstFreeVar(pro)
+        self.labels = {exp.name for exp in pro.expressions if exp.kind == par.EXP_KIND_LABEL}
+        self.label = None
+
+    def getFreshVar(self):
+        name = st.getVarName(self.nextVar)
+        self.nextVar += 1
+        return name
+
+    def getEntryLabel(self):
+        if self.label is None:
+            self.label = st.getFreshLabel(self.labels, TAIL_LABEL_PREFIX)
+
+        return self.label
+
+    def getLoopedCall(self, exp):
+        copies = ssa.getSequentialCopies(self, list(zip(self.pro.params, exp.params)))
+        return copies + [par.EJump(gram.JUMP, self.getEntryLabel())]
+
+    def getLoopedExpressions(self):
+        exps = self.pro.expressions
+        positions = getLabelPositions(exps)
+        looped = []
+
+        for i, exp in enumerate(exps):
+            if isSelfTailCall(self.pro, exps, i, positions):
+                looped.extend(self.getLoopedCall(exp))
+            else:
+                looped.append(exp)
+
+        return looped
+
+# a call to itself in tail position starts the procedure over with new parameters, so the
+# recursion runs in a loop instead of a growing stack
+def getTailCallsLoopedPro(pro):
+    tails = TailCalls(pro)
+    exps = tails.getLoopedExpressions()
+
+    if tails.label is None:
+        return pro
+
+    exps = cfg.getReachableCode([par.ELabel(tails.label)] + exps)
+    return par.EPro(pro.name, pro.params, exps, pro.ret)
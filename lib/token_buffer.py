@@ -0,0 +1,176 @@
+from array import array
+
+import lib.grammar as gram
+import lib.lexer as lex
+
+#
+# Symbol Table
+#
+
+NO_SYMBOL = 0
+
+class SymbolTable:
+    def __init__(self):
+        self.ids = {}
+        self.names = [None]
+
+    def getId(self, name):
+        id = self.ids.get(name)
+
+        if id is None:
+            id = len(self.names)
+            self.ids[name] = id
+            self.names.append(name)
+
+        return id
+
+    def getName(self, id):
+        return self.names[id]
+
+    def __len__(self):
+        return len(self.names) - 1
+
+#
+# Token Buffer
+#
+
+# the buffer is what lib/incremental.py lexes a region into, block boundaries are found on
+# the kind and offset arrays alone; the parser does not read it, it runs on the token
+# objects getTokens builds, and compares names as strings. Names become integer ids
+# when a procedure is lowered to the linear form the allocator and code generator run on
+
+# literal values are sliced from the source, all other words are interned
+LITERAL_KINDS = {
+    lex.KIND_INT, lex.KIND_CHAR, lex.KIND_STRING
+}
+
+class TokenBuffer:
+    def __init__(self, source, symbols):
+        self.source = source
+        self.symbols = symbols
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.ids = array('I')
+        self.widths = array('B')
+
+    def append(self, kind, start, end, id, width):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.ids.append(id)
+        self.widths.append(width)
+
+    def getText(self, i):
+        id = self.ids[i]
+
+        if id != NO_SYMBOL:
+            return self.symbols.getName(id)
+
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def getToken(self, i):
+        kind = self.kinds[i]
+
+        if kind == lex.KIND_SEPARATOR:
+            return lex.TSeparator(gram.SEPARATOR)
+        elif kind == lex.KIND_VAR:
+            return lex.TVar(self.getText(i), self.widths[i])
+        elif kind == lex.KIND_INT:
+            return lex.TInt(gram.INT, self.getText(i))
+        elif kind == lex.KIND_CHAR:
+            return lex.TChar(gram.CHAR, self.getText(i))
+        elif kind == lex.KIND_STRING:
+            return lex.TString(gram.STRING, self.getText(i)[1:-1])
+
+        return KIND_TOKENS[kind](self.getText(i))
+
+    # tokens never change once built, so every interned token is one object shared by
+    # all its occurrences
+    def getTokens(self):
+        kinds = self.kinds
+        ids = self.ids
+        widths = self.widths
+        shared = {}
+        tokens = []
+
+        for i in range(len(kinds)):
+            id = ids[i]
+
+            if id == NO_SYMBOL and kinds[i] != lex.KIND_SEPARATOR:
+                tokens.append(self.getToken(i))
+                continue
+
+            key = (kinds[i], id, widths[i])
+            t = shared.get(key)
+
+            if t is None:
+                t = self.getToken(i)
+                shared[key] = t
+
+            tokens.append(t)
+
+        return tokens
+
+    def __len__(self):
+        return len(self.kinds)
+
+KIND_TOKENS = {
+    lex.KIND_LABEL: lex.TLabel,
+    lex.KIND_JUMP: lex.TJump,
+    lex.KIND_CO_JUMP: lex.TCoJump,
+    lex.KIND_ASSIGN: lex.TAssign,
+    lex.KIND_UN_OP: lex.TUnOp,
+    lex.KIND_BIN_OP: lex.TBinOp,
+    lex.KIND_IDENTIFIER: lex.TIdentifier,
+    lex.KIND_PRO_ID: lex.TProId,
+    lex.KIND_PRO_RET: lex.TProRet,
+    lex.KIND_MEM_ID: lex.TMemId,
+    lex.KIND_MEM_LEFT_B: lex.TMemLeftB,
+    lex.KIND_MEM_RIGHT_B: lex.TMemRightB,
+    lex.KIND_POINT_LEFT_B: lex.TPointLeftB,
+    lex.KIND_POINT_RIGHT_B: lex.TPointRightB
+}
+
+def appendWord(buffer, s, start, end):
+    symbols = buffer.symbols
+    kind = lex.getWordKind(s)
+
+    if kind == lex.KIND_VAR:
+        name, width = gram.getVarComponents(s)
+        buffer.append(kind, start, end, symbols.getId(name), width)
+    elif kind in LITERAL_KINDS and s == buffer.source[start:end]:
+        buffer.append(kind, start, end, NO_SYMBOL, 0)
+    else:
+        buffer.append(kind, start, end, symbols.getId(s), 0)
+
+def getTokenBuffer(source, symbols=None):
+    if symbols is None:
+        symbols = SymbolTable()
+
+    buffer = TokenBuffer(source, symbols)
+    skip = ''.join(gram.SKIP_SET)
+
+    for m in lex.MASTER_PATTERN.finditer(source):
+        group = m.lastindex
+
+        if group == lex.GROUP_SEP:
+            buffer.append(lex.KIND_SEPARATOR, m.start(group), m.end(group), NO_SYMBOL, 0)
+        elif group == lex.GROUP_BRA:
+            s = m.group(group)
+            kind = lex.KEYWORD_TOKENS[s].kind
+            buffer.append(kind, m.start(group), m.end(group), symbols.getId(s), 0)
+        else:
+            s = m.group(lex.GROUP_PLAIN)
+
+            for c in skip:
+                if c in s:
+                    s = s.replace(c, '')
+
+            if group == lex.GROUP_TAIL:
+                s += m.group(lex.GROUP_TAIL)
+
+            if len(s) > 0:
+                appendWord(buffer, s, m.start(lex.GROUP_PLAIN), m.end())
+
+    return buffer
@@ -1,15 +1,55 @@
 import test.ut_lexer as lex
+import test.ut_token_buffer as tbu
 import test.ut_parser as par
+import test.ut_incremental as inc
+import test.ut_parallel as pll
+import test.ut_linear_ir as lir
+import test.ut_binary_ir as bir
+import test.ut_cfg as cfg
+import test.ut_dataflow as dfa
+import test.ut_ssa as ssa
+import test.ut_inliner as inl
+import test.ut_tail_calls as tails
+import test.ut_folding as fold
+import test.ut_sccp as sccp
+import test.ut_lvn as lvn
+import test.ut_licm as licm
+import test.ut_ivs as ivs
+import test.ut_copies as cps
+import test.ut_dce as dce
+import test.ut_jumps as jumps
+import test.ut_optimizer as opt
 import test.ut_assembly_map as asm
 import test.ut_simple_allocator as sar
+import test.ut_clobbers as clb
 import test.ut_gen_code as gen
 import test.ut_gen_pro_code as pro
 import test.ut_gen_combo_code as combo
 
 lex.runAllTests()
+tbu.runAllTests()
 par.runAllTests()
+inc.runAllTests()
+pll.runAllTests()
+lir.runAllTests()
+bir.runAllTests()
+cfg.runAllTests()
+dfa.runAllTests()
+ssa.runAllTests()
+inl.runAllTests()
+tails.runAllTests()
+fold.runAllTests()
+sccp.runAllTests()
+lvn.runAllTests()
+licm.runAllTests()
+ivs.runAllTests()
+cps.runAllTests()
+dce.runAllTests()
+jumps.runAllTests()
+opt.runAllTests()
 asm.runAllTests()
 sar.runAllTests()
+clb.runAllTests()
 gen.runAllTests()
 pro.runAllTests()
 combo.runAllTests()
\ No newline at end of file
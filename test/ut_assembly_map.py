@@ -166,7 +166,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r8',
             'mov rdi, rax',
@@ -182,7 +181,6 @@ GasIntelX8664SystemVTestSets = [
             'push r11',
             'mov r11, rdx',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r11',
             'mov rdi, rax',
@@ -197,7 +195,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rdx',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rdi, rax',
@@ -210,7 +207,6 @@ GasIntelX8664SystemVTestSets = [
         [
             'push rax',
             'mov rax, rdi',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rdx, rax',
@@ -225,7 +221,6 @@ GasIntelX8664SystemVTestSets = [
             'push r11',
             'mov r11, rax',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r11',
             'mov rdi, rax',
@@ -240,7 +235,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rax',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rdi, rax',
@@ -253,7 +247,6 @@ GasIntelX8664SystemVTestSets = [
         [
             'push rdx',
             'mov rax, rdi',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'pop rdx'
@@ -265,7 +258,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r8',
             'mov rdi, rdx',
@@ -281,7 +273,6 @@ GasIntelX8664SystemVTestSets = [
             'push r11',
             'mov r11, rdx',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r11',
             'mov rdi, rdx',
@@ -296,7 +287,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rdx',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rdi, rdx',
@@ -309,7 +299,6 @@ GasIntelX8664SystemVTestSets = [
         [
             'push rax',
             'mov rax, rdi',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'pop rax',
@@ -323,7 +312,6 @@ GasIntelX8664SystemVTestSets = [
             'push r11',
             'mov r11, rax',
             'mov rax, rsi',
-            'xor rdx, rdx',
             'cqo',
             'idiv r11',
             'mov rdi, rdx',
@@ -338,7 +326,6 @@ GasIntelX8664SystemVTestSets = [
             'push rdx',
             'push rax',
             'mov rax, rax',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rdi, rdx',
@@ -351,13 +338,135 @@ GasIntelX8664SystemVTestSets = [
         [
             'push rdx',
             'mov rax, rdi',
-            'xor rdx, rdx',
             'cqo',
             'idiv rsi',
             'mov rax, rdx',
             'pop rdx'
         ]
     ],
+    [
+        lambda asmap: asmap.emitBinOp('rdx', gram.DIV, 'rdi', 'rdx'),
+        [
+            'push rax',
+            'push r11',
+            'mov r11, rdx',
+            'mov rax, rdi',
+            'cqo',
+            'idiv r11',
+            'mov rdx, rax',
+            'pop r11',
+            'pop rax'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.DIV, 'rsi', '-3'),
+        [
+            'push rdx',
+            'push rax',
+            'push r11',
+            'mov r11, -3',
+            'mov rax, rsi',
+            'cqo',
+            'idiv r11',
+            'mov rdi, rax',
+            'pop r11',
+            'pop rax',
+            'pop rdx'
+        ]
+    ],
+    #
+    # constant operands
+    #
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.MUL, 'rsi', '8'),
+        [
+            'mov rdi, rsi',
+            'shl rdi, 3'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.MUL, 'rsi', '20'),
+        [
+            'lea rdi, [rsi + rsi*4]',
+            'shl rdi, 2'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.MUL, 'rdi', '9'),
+        [
+            'lea rdi, [rdi + rdi*8]'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.MUL, 'rsi', '7'),
+        [
+            'imul rdi, rsi, 7'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.DIV, 'rsi', '2'),
+        [
+            'mov rdi, rsi',
+            'shr rdi, 63',
+            'add rdi, rsi',
+            'sar rdi, 1'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.DIV, 'rdi', '0x10'),
+        [
+            'mov r11, rdi',
+            'sar r11, 63',
+            'shr r11, 60',
+            'add rdi, r11',
+            'sar rdi, 4'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.MOD, 'rsi', '8'),
+        [
+            'mov r11, rsi',
+            'sar r11, 63',
+            'shr r11, 61',
+            'add r11, rsi',
+            'and r11, -8',
+            'mov rdi, rsi',
+            'sub rdi, r11'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdi', gram.DIV, 'rsi', '3'),
+        [
+            'push rdx',
+            'push rax',
+            'mov r11, rsi',
+            'mov rax, 6148914691236517206',
+            'imul r11',
+            'mov rax, r11',
+            'shr rax, 63',
+            'add rdx, rax',
+            'mov rdi, rdx',
+            'pop rax',
+            'pop rdx'
+        ]
+    ],
+    [
+        lambda asmap: asmap.emitBinOp('rdx', gram.MOD, 'rdi', '7'),
+        [
+            'push rax',
+            'mov r11, rdi',
+            'mov rax, 5270498306774157605',
+            'imul r11',
+            'sar rdx, 1',
+            'mov rax, r11',
+            'shr rax, 63',
+            'add rdx, rax',
+            'imul rdx, rdx, 7',
+            'sub r11, rdx',
+            'mov rdx, r11',
+            'pop rax'
+        ]
+    ],
     #
     # end binary operations
     #
@@ -367,6 +476,12 @@ GasIntelX8664SystemVTestSets = [
             'call fun'
         ]
     ],
+    [
+        lambda asmap: asmap.emitTailCall('fun'),
+        [
+            'jmp fun'
+        ]
+    ],
     [
         lambda asmap: asmap.emitRet(),
         [
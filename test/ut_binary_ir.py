@@ -0,0 +1,140 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.binary_ir as bir
+import lib.gen_code as gen
+import lib.assembly_map as asm
+import test.ut_component_vars as vars
+
+#
+# test helpers
+#
+
+def getModuleStrings(module):
+    strings = [p.toString() for p in module.procedures]
+    strings.extend([m.toString() for m in module.memories])
+    strings.extend([n + ' ' + str(module.props.usesInt[n]) for n in module.props.usesInt])
+    return strings
+
+def areModulesEqual(generated, expected):
+    generatedStrings = getModuleStrings(generated)
+    expectedStrings = getModuleStrings(expected)
+
+    if generatedStrings != expectedStrings:
+        print('test failed\n')
+        print('generated:')
+        print('\n'.join(generatedStrings))
+        print('\nexpected:')
+        print('\n'.join(expectedStrings))
+        print('')
+        return False
+
+    return True
+
+def getSwappedModuleBytes(module):
+    # rewrites the header as if the module was written on a machine of the other byte order
+    data = bytearray(bir.getModuleBytes(module))
+    fields = list(bir.HEADER.unpack_from(data, 0))
+    fields[2] = 1 - fields[2]
+    bir.HEADER.pack_into(data, 0, *fields)
+    return bytes(data)
+
+#
+# round trip tests
+#
+
+SOURCE_MODULE = vars.SOURCE_2 + vars.SOURCE_0 + vars.SOURCE_1 + vars.SOURCE_3 + """
+mem text {"ab" "cd"}
+
+mem chars {'a' 'b'}
+
+mem buffer 64
+"""
+
+def getSourceModule():
+    return bir.getModule(par.getExpressions(lex.getTokens(SOURCE_MODULE)))
+
+def runRoundTripTests():
+    module = getSourceModule()
+    loaded = bir.getModuleFromBuffer(bir.getModuleBytes(module))
+
+    if not areModulesEqual(loaded, module):
+        return False
+
+    # native arrays are views into the buffer
+    if not isinstance(loaded.procedures[0].dests, memoryview):
+        print('procedure arrays were copied on load')
+        return False
+
+    return True
+
+def runCodeTests():
+    asmap = asm.GasIntelX8664SystemVMap()
+    module = bir.getModuleFromBuffer(bir.getModuleBytes(getSourceModule()))
+    generated = gen.generateCodeLinesFromSections(asmap, module.memories, module.procedures, module.props)
+    expected = gen.generateCodeLinesFromText(SOURCE_MODULE, asmap)
+
+    if generated != expected:
+        print('test failed\n')
+        print('generated:')
+        print('\n'.join(generated))
+        print('\nexpected:')
+        print('\n'.join(expected))
+        return False
+
+    return True
+
+def runByteOrderTests():
+    module = getSourceModule()
+    loaded = bir.getModuleFromBuffer(getSwappedModuleBytes(module))
+
+    if isinstance(loaded.procedures[0].dests, memoryview):
+        print('foreign byte order arrays must be copied')
+        return False
+
+    if list(loaded.procedures[0].dests) == list(module.procedures[0].dests):
+        print('foreign byte order arrays were not swapped')
+        return False
+
+    return True
+
+#
+# error tests
+#
+
+errorTestSets = [
+    [b'', 'binary module is truncated'],
+    [b'NOPE' + bytes(bir.HEADER.size), 'source is not a binary module'],
+    [bir.HEADER.pack(bir.BINARY_MAGIC, bir.BINARY_VERSION + 1, 0, 4, 0, 0), 'binary module version not supported'],
+    [bir.getModuleBytes(getSourceModule())[:-3], 'binary module is truncated']
+]
+
+def runErrorTests():
+    for s in errorTestSets:
+        try:
+            bir.getModuleFromBuffer(s[0])
+        except Exception as ex:
+            if str(ex) != s[1]:
+                print('unexpected error: ' + str(ex))
+                return False
+            continue
+
+        print('expected error: ' + s[1])
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runRoundTripTests()
+    allPass = allPass and runCodeTests()
+    allPass = allPass and runByteOrderTests()
+    allPass = allPass and runErrorTests()
+
+    if allPass:
+        print('all binary ir tests passed')
+    else:
+        print('at least one binary ir test failed')
@@ -0,0 +1,201 @@
+import lib.cfg as cfg
+import test.ut_component_vars as vars
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getSourceCfg(source):
+    return cfg.getProCfg(hlp.getSourcePros(source)[0])
+
+#
+# graph tests
+#
+
+SOURCE_NESTED = """
+pro nested x0 x1
+    x2 = 0
+    @outer
+    jige x2 x0 @done
+    x3 = 0
+    @inner
+    jige x3 x1 @next
+    x3 = add x3 1
+    jump @inner
+    @next
+    x2 = add x2 1
+    jump @outer
+    @done
+    ret x2
+"""
+
+SOURCE_DIAMOND = """
+pro diamond x0
+    jie x0 0 @zero
+    x1 = 1
+    jump @join
+    @zero
+    x1 = 2
+    @join
+    ret x1
+"""
+
+SOURCE_UNREACHABLE = """
+pro unreachable x0
+    jump @end
+    x0 = add x0 1
+    @first
+    @second
+    x0 = sub x0 1
+    @end
+    ret x0
+"""
+
+graphTestSets = [
+    [
+        vars.SOURCE_0,
+        'block 0 [] -> []\n' +
+        'idoms None\n'
+    ],
+    [
+        vars.SOURCE_1,
+        'block 0 [] -> [1]\n' +
+        'block 1 [0 2] -> [2 3]\n' +
+        'block 2 [1] -> [1]\n' +
+        'block 3 [1] -> []\n' +
+        'idoms None 0 1 1\n' +
+        'loop 1 depth 1 [1 2]\n'
+    ],
+    [
+        SOURCE_NESTED,
+        'block 0 [] -> [1]\n' +
+        'block 1 [0 5] -> [2 6]\n' +
+        'block 2 [1] -> [3]\n' +
+        'block 3 [2 4] -> [4 5]\n' +
+        'block 4 [3] -> [3]\n' +
+        'block 5 [3] -> [1]\n' +
+        'block 6 [1] -> []\n' +
+        'idoms None 0 1 2 3 3 1\n' +
+        'loop 1 depth 1 [1 2 3 4 5]\n' +
+        'loop 3 depth 2 [3 4]\n'
+    ],
+    [
+        SOURCE_DIAMOND,
+        'block 0 [] -> [1 2]\n' +
+        'block 1 [0] -> [3]\n' +
+        'block 2 [0] -> [3]\n' +
+        'block 3 [1 2] -> []\n' +
+        'idoms None 0 0 0\n'
+    ],
+    [
+        SOURCE_UNREACHABLE,
+        'block 0 [] -> [3]\n' +
+        'block 1 [] -> [2]\n' +
+        'block 2 [1] -> [3]\n' +
+        'block 3 [0 2] -> []\n' +
+        'idoms None None None 0\n'
+    ]
+]
+
+def runGraphTests():
+    for s in graphTestSets:
+        if not hlp.areStringsEqual(getSourceCfg(s[0]).toString(), s[1]):
+            return False
+
+    return True
+
+#
+# property tests
+#
+
+def runPropertyTests():
+    graph = getSourceCfg(SOURCE_NESTED)
+
+    if graph.labels != {'@outer': 1, '@inner': 3, '@next': 5, '@done': 6}:
+        print('unexpected label index: ' + str(graph.labels))
+        return False
+
+    if graph.getBlock('@next').start != 8 or graph.exits != [6]:
+        print('unexpected block layout')
+        return False
+
+    if not graph.dominates(1, 4) or graph.dominates(3, 6):
+        print('unexpected dominance')
+        return False
+
+    if [graph.getLoopDepth(b.id) for b in graph.blocks] != [0, 1, 1, 2, 2, 1, 0]:
+        print('unexpected loop depths')
+        return False
+
+    frontiers = [sorted(f) for f in cfg.getDominanceFrontiers(graph)]
+    if frontiers != [[], [1], [1], [1, 3], [3], [1], []]:
+        print('unexpected dominance frontiers: ' + str(frontiers))
+        return False
+
+    # labels that follow each other share one block
+    graph = getSourceCfg(SOURCE_UNREACHABLE)
+    if graph.labels['@first'] != graph.labels['@second']:
+        print('consecutive labels were split')
+        return False
+
+    if graph.getExpressions() != graph.expressions:
+        print('blocks do not cover the procedure')
+        return False
+
+    # unreachable statements go, and so do the labels no jump is left for
+    code = [exp.toString() for exp in cfg.getReachableCode(graph.expressions)]
+    if code != ['{ EJump: jump @end }', '{ ELabel: @end }']:
+        print('unexpected reachable code: ' + str(code))
+        return False
+
+    return True
+
+#
+# error tests
+#
+
+errorTestSets = [
+    ["""
+pro undefined x0
+    jump @nowhere
+    ret x0
+""", 'jump label must be defined in procedure'],
+    ["""
+pro twice x0
+    @here
+    jie x0 0 @here
+    @here
+    ret x0
+""", 'label must not be defined more than once']
+]
+
+def runErrorTests():
+    for s in errorTestSets:
+        try:
+            getSourceCfg(s[0])
+        except Exception as ex:
+            if str(ex) != s[1]:
+                print('unexpected error: ' + str(ex))
+                return False
+            continue
+
+        print('expected error: ' + s[1])
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runGraphTests()
+    allPass = allPass and runPropertyTests()
+    allPass = allPass and runErrorTests()
+
+    if allPass:
+        print('all cfg tests passed')
+    else:
+        print('at least one cfg test failed')
@@ -0,0 +1,92 @@
+import lib.parser as par
+import lib.linear_ir as lir
+import lib.simple_allocator as sar
+import lib.assembly_map as asm
+import lib.clobbers as clb
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getLinearPros(source):
+    return [lir.getLinearPro(pro) for pro in hlp.getSourcePros(source)]
+
+def getClobbers(source, asmap):
+    pros = getLinearPros(source)
+    allRegs = asmap.getRegistersToMap()
+    maxArgs = len(asmap.getArgumentRegs())
+    generalDicts = [sar.getLinearAssignmentDict(allRegs, lpro, maxArgs) for lpro in pros]
+    return clb.getClobbers(pros, generalDicts, asmap)
+
+#
+# clobber tests
+#
+
+SOURCE_CALLS = """
+pro leaf x0
+    x1 = add x0 1
+    ret x1
+
+pro mid x0 x1
+    x2 = leaf x1
+    ret x2
+
+pro rec x0
+    jie x0 0 @done
+    x0 = sub x0 1
+    x0 = rec x0
+    @done
+    ret x0
+
+pro indirect x0 x1
+    x2 = !x0 x1
+    ret x2
+
+pro outside x0
+    x1 = puts x0
+    ret x1
+"""
+
+ALL_CALLER_SAVED = ['r10', 'r11', 'r8', 'r9', 'rcx', 'rdi', 'rdx', 'rsi']
+
+clobberTestSets = [
+    # a parameter that is only read keeps its register, the intermediate registers are
+    # always taken
+    ['leaf', ['r10', 'r11', 'rsi']],
+    # a call adds the argument registers it moves into and what the callee clobbers
+    ['mid', ['r10', 'r11', 'rdi', 'rdx', 'rsi']],
+    # a procedure calling itself only clobbers what it does on its own
+    ['rec', ['r10', 'r11', 'rdi']],
+    # a call through a variable or out of the module may clobber anything
+    ['indirect', ALL_CALLER_SAVED],
+    ['outside', ALL_CALLER_SAVED]
+]
+
+def runClobberTests():
+    asmap = asm.GasIntelX8664SystemVMap()
+    clobbers = getClobbers(SOURCE_CALLS, asmap)
+
+    for s in clobberTestSets:
+        if not hlp.areValuesEqual(sorted(clobbers[s[0]]), s[1]):
+            return False
+
+    props = par.ProcedureProperties({}, clobbers)
+    if not hlp.areValuesEqual(sorted(clb.getCallClobbers(props, '!x0', asmap)), ALL_CALLER_SAVED):
+        return False
+
+    # properties built before registers are assigned know no clobbers yet
+    return hlp.areValuesEqual(par.getProcedureProperties(getLinearPros(SOURCE_CALLS)).clobbers, {})
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runClobberTests()
+
+    if allPass:
+        print('all clobber tests passed')
+    else:
+        print('at least one clobber test failed')
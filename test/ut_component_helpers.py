@@ -0,0 +1,44 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.assembly_map as asm
+
+# the registers the allocator hands out on the x86-64 map, for passes that keep values
+# in registers across loops
+REGISTER_COUNT = len(asm.GasIntelX8664SystemVMap().getRegistersToMap())
+
+#
+# source helpers
+#
+
+def getSourcePros(source):
+    return par.getExpressions(lex.getTokens(source))
+
+def getSourcePro(source):
+    return [exp for exp in getSourcePros(source) if exp.kind == par.EXP_KIND_PRO][0]
+
+def getProLines(pro):
+    return [exp.toString() for exp in pro.expressions] + [pro.ret.toString()]
+
+#
+# comparison helpers
+#
+
+def areValuesEqual(generated, expected):
+    if generated != expected:
+        print('test failed\n')
+        print('generated: ' + str(generated))
+        print('expected: ' + str(expected) + '\n')
+        return False
+
+    return True
+
+def areStringsEqual(generated, expected):
+    if generated != expected:
+        print('test failed\n')
+        print('generated:')
+        print(generated)
+        print('expected:')
+        print(expected)
+        return False
+
+    return True
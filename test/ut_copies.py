@@ -0,0 +1,94 @@
+import lib.copies as cps
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getPropagatedLines(source):
+    pro = cps.getCopyPropagatedPro(hlp.getSourcePro(source))
+    return [exp.toString() for exp in pro.expressions] + [pro.ret.toString()]
+
+#
+# propagation tests
+#
+
+propagationTestSets = [
+    # uses read the source of a chain of copies, and so does a store through a copy
+    ["""
+pro chain x0 x1
+    x2 = x0
+    x3 = x2
+    [x3] = x1
+    x4 = add x3 x1
+    ret x4
+""", [
+        '{ ECopy: { TPointer: x0 } = { TVar: x1 8 } }',
+        '{ EBinOp: { TVar: x7 8 } = add { TVar: x0 8 } { TVar: x1 8 } }',
+        '{ TVar: x7 8 }'
+    ]],
+    # a copy carried around a loop that only ever holds the parameter goes with its phi
+    ["""
+pro loop x0 x1
+    x2 = x0
+    x3 = 0
+    @top
+    jige x3 x1 @done
+    x4 = x2
+    x3 = add x3 x4
+    x2 = x4
+    jump @top
+    @done
+    x5 = x3
+    ret x5
+""", [
+        '{ ECopy: { TVar: x7 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x7 8 } }',
+        '{ ELabel: @top }',
+        '{ ECoJump: jige { TVar: x9 8 } { TVar: x1 8 } @done }',
+        '{ EBinOp: { TVar: x12 8 } = add { TVar: x9 8 } { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x12 8 } }',
+        '{ EJump: jump @top }',
+        '{ ELabel: @done }',
+        '{ TVar: x9 8 }'
+    ]],
+    # a copy that changes width is kept
+    ["""
+pro narrow x0
+    x1 = x0b
+    x2 = x1
+    ret x2
+""", [
+        '{ ECopy: { TVar: x3 8 } = { TVar: x0 1 } }',
+        '{ TVar: x3 8 }'
+    ]]
+]
+
+def runPropagationTests():
+    for s in propagationTestSets:
+        if not hlp.areValuesEqual(getPropagatedLines(s[0]), s[1]):
+            return False
+
+    pro = hlp.getSourcePro("""
+pro none x0
+    x1 = add x0 1
+    ret x1
+""")
+    if cps.getCopyPropagatedPro(pro) is not pro:
+        print('procedure without copies must be left unchanged')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runPropagationTests()
+
+    if allPass:
+        print('all copy propagation tests passed')
+    else:
+        print('at least one copy propagation test failed')
@@ -0,0 +1,129 @@
+import lib.token_buffer as tb
+import lib.cfg as cfg
+import lib.dataflow as dfa
+import test.ut_component_vars as vars
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getSourceLiveness(source):
+    pro = hlp.getSourcePro(source)
+    return dfa.getLiveness(cfg.getProCfg(pro), [pro.ret.name])
+
+#
+# bitset tests
+#
+
+def runBitTests():
+    table = tb.SymbolTable()
+    bits = dfa.getBits(table, ['x3', 'x1', 'x3'])
+
+    if not hlp.areValuesEqual(dfa.getBitIds(bits), [1, 2]):
+        return False
+
+    return hlp.areValuesEqual(dfa.getBitNames(table, bits), ['x3', 'x1'])
+
+#
+# liveness tests
+#
+
+SOURCE_HOLES = """
+pro holes x0
+    x1 = add x0 1
+    x2 = add x1 1
+    x3 = add x2 x0
+    x1 = add x3 x0
+    ret x1
+"""
+
+livenessTestSets = [
+    [
+        vars.SOURCE_1,
+        [['x0', 'x1'], ['x0', 'x1'], ['x0', 'x1'], ['x1']],
+        [['x0', 'x1'], ['x0', 'x1'], ['x0', 'x1'], ['x1']]
+    ],
+    [
+        SOURCE_HOLES,
+        [['x0']],
+        [['x1']]
+    ]
+]
+
+def runLivenessTests():
+    for s in livenessTestSets:
+        liveness = getSourceLiveness(s[0])
+        ins = [sorted(liveness.getLiveIn(b.id)) for b in liveness.cfg.blocks]
+        outs = [sorted(liveness.getLiveOut(b.id)) for b in liveness.cfg.blocks]
+
+        if not hlp.areValuesEqual(ins, s[1]) or not hlp.areValuesEqual(outs, s[2]):
+            return False
+
+    return True
+
+rangeTestSets = [
+    [
+        vars.SOURCE_1,
+        {'x0': [[0, 4]], 'x1': [[0, 5]]}
+    ],
+    [
+        SOURCE_HOLES,
+        {'x0': [[0, 3]], 'x1': [[0, 1], [3, 3]], 'x2': [[1, 2]], 'x3': [[2, 3]]}
+    ]
+]
+
+def runRangeTests():
+    for s in rangeTestSets:
+        if not hlp.areValuesEqual(dfa.getLiveRanges(getSourceLiveness(s[0])), s[1]):
+            return False
+
+    if dfa.areRangesOverlapping([[0, 1], [4, 5]], [[2, 3], [6, 6]]):
+        print('ranges in holes must not overlap')
+        return False
+
+    return dfa.areRangesOverlapping([[0, 1], [4, 5]], [[2, 4]])
+
+#
+# solver tests
+#
+
+SOURCE_DEFINED = """
+pro defined x0
+    jie x0 0 @zero
+    x1 = 1
+    x2 = 2
+    jump @join
+    @zero
+    x1 = 3
+    @join
+    ret x1
+"""
+
+# variables defined on every path, a forward problem with an intersection meet
+def runForwardTests():
+    graph = cfg.getProCfg(hlp.getSourcePro(SOURCE_DEFINED))
+    table = tb.SymbolTable()
+    defs = [dfa.getBits(table, [d for exp in b.expressions for d in exp.defs]) for b in graph.blocks]
+    everything = (1 << (len(table) + 1)) - 1
+
+    transfer = lambda id, value: value | defs[id]
+    solution = dfa.getSolution(graph, dfa.FORWARD, transfer, dfa.meetIntersection, dfa.NO_BITS, everything)
+
+    return hlp.areValuesEqual(dfa.getBitNames(table, solution.ins[3]), ['x1'])
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runBitTests()
+    allPass = allPass and runLivenessTests()
+    allPass = allPass and runRangeTests()
+    allPass = allPass and runForwardTests()
+
+    if allPass:
+        print('all dataflow tests passed')
+    else:
+        print('at least one dataflow test failed')
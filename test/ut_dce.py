@@ -0,0 +1,101 @@
+import lib.dce as dce
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getLiveLines(source):
+    return [exp.toString() for exp in dce.getDeadCodeRemovedPro(hlp.getSourcePro(source)).expressions]
+
+#
+# removal tests
+#
+
+removalTestSets = [
+    # stores, calls and divisions that may trap stay, code behind a jump goes
+    ["""
+pro effects x0 x1
+    x2 = add x0 1
+    x3 = mul x2 x2
+    x4 = div x0 x1
+    x5 = div x0 3
+    [x1] = x2
+    x6 = p x0
+    jump @end
+    x7 = add x0 2
+    @end
+    ret x0
+""", [
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x4 8 } = div { TVar: x0 8 } { TVar: x1 8 } }',
+        '{ ECopy: { TPointer: x1 } = { TVar: x2 8 } }',
+        '{ EProCall: { TVar: x6 8 } = p { TVar: x0 8 } }',
+        '{ EJump: jump @end }',
+        '{ ELabel: @end }'
+    ]],
+    # a dead chain reaching back over a branch needs liveness solved again
+    ["""
+pro chain x0
+    x1 = add x0 1
+    x2 = not x1
+    jie x0 0 @zero
+    x3 = add x2 x1
+    @zero
+    x4 = x3
+    x5 = mul x0 2
+    ret x5
+""", [
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @zero }',
+        '{ ELabel: @zero }',
+        '{ EBinOp: { TVar: x5 8 } = mul { TVar: x0 8 } { TInt: 2 } }'
+    ]],
+    # values carried around a loop stay as long as the loop reads them
+    ["""
+pro loop x0
+    x1 = 0
+    x2 = 0
+    @top
+    jige x1 x0 @done
+    x2 = add x2 x1
+    x3 = mul x2 3
+    x1 = add x1 1
+    jump @top
+    @done
+    ret x2
+""", [
+        '{ ECopy: { TVar: x1 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x2 8 } = { TInt: 0 } }',
+        '{ ELabel: @top }',
+        '{ ECoJump: jige { TVar: x1 8 } { TVar: x0 8 } @done }',
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x2 8 } { TVar: x1 8 } }',
+        '{ EBinOp: { TVar: x1 8 } = add { TVar: x1 8 } { TInt: 1 } }',
+        '{ EJump: jump @top }',
+        '{ ELabel: @done }'
+    ]]
+]
+
+def runRemovalTests():
+    for s in removalTestSets:
+        if not hlp.areValuesEqual(getLiveLines(s[0]), s[1]):
+            return False
+
+    pro = hlp.getSourcePro(removalTestSets[2][0].replace('    x3 = mul x2 3\n', ''))
+    if dce.getDeadCodeRemovedPro(pro) is not pro:
+        print('procedure without dead code must be left unchanged')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runRemovalTests()
+
+    if allPass:
+        print('all dce tests passed')
+    else:
+        print('at least one dce test failed')
@@ -0,0 +1,138 @@
+import lib.lexer as lex
+import lib.folding as fold
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getFoldedLines(source):
+    return [exp.toString() for exp in fold.getFoldedPro(hlp.getSourcePro(source)).expressions]
+
+#
+# value tests
+#
+
+valueTestSets = [
+    ['add', 9223372036854775807, 1, 8, -9223372036854775808],
+    ['mul', 4611686018427387904, 4, 8, 0],
+    ['sub', 0, 1, 1, -1],
+    ['add', 127, 1, 1, -128],
+    ['div', -7, 2, 8, -3],
+    ['mod', -7, 2, 8, -1],
+    ['mod', 7, -2, 8, 1],
+    ['div', 7, 0, 8, None],
+    ['div', -9223372036854775808, -1, 8, None],
+    ['div', 100, 3, 1, None]
+]
+
+def runValueTests():
+    for s in valueTestSets:
+        if not hlp.areValuesEqual(fold.getBinOpValue(s[0], s[1], s[2], s[3]), s[4]):
+            return False
+
+    if not hlp.areValuesEqual(fold.getConstValue(lex.TInt('INT', '0xFFFFFFFFFFFFFFFF')), -1):
+        return False
+
+    return hlp.areValuesEqual(fold.getConstValue(lex.TChar('CHAR', "'a'")), 97)
+
+#
+# statement tests
+#
+
+statementTestSets = [
+    # constants are folded and carried to later statements
+    ["""
+pro consts x0
+    x1 = 4
+    x2 = add x1 3
+    x3 = not x2
+    x4 = mul x2 x3
+    ret x4
+""", [
+        '{ ECopy: { TVar: x1 8 } = { TInt: 4 } }',
+        '{ ECopy: { TVar: x2 8 } = { TInt: 7 } }',
+        '{ ECopy: { TVar: x3 8 } = { TInt: -8 } }',
+        '{ ECopy: { TVar: x4 8 } = { TInt: -56 } }'
+    ]],
+    # identities, and the self copy left by one is dropped
+    ["""
+pro identities x0 x1
+    x2 = mul x0 1
+    x3 = xor x1 x1
+    x4 = and x0 0
+    x5 = sub x0 0
+    x0 = add 0 x0
+    x6 = mul x1 2
+    ret x6
+""", [
+        '{ ECopy: { TVar: x2 8 } = { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x3 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x4 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x5 8 } = { TVar: x0 8 } }',
+        '{ EBinOp: { TVar: x6 8 } = add { TVar: x1 8 } { TVar: x1 8 } }'
+    ]],
+    # constants only go where the code generator can take them
+    ["""
+pro encodable x0
+    x1 = 5
+    x2 = sub x1 x0
+    x3 = add x1 x0
+    x4 = div x0 x1
+    x5 = 5000000000
+    x6 = add x0 x5
+    jil x1 x0 @end
+    [x0] = x1
+    x7 = div 1 0
+    @end
+    x8 = add x1 1
+    ret x8
+""", [
+        '{ ECopy: { TVar: x1 8 } = { TInt: 5 } }',
+        '{ EBinOp: { TVar: x2 8 } = sub { TVar: x1 8 } { TVar: x0 8 } }',
+        '{ EBinOp: { TVar: x3 8 } = add { TVar: x0 8 } { TInt: 5 } }',
+        '{ EBinOp: { TVar: x4 8 } = div { TVar: x0 8 } { TInt: 5 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 5000000000 } }',
+        '{ EBinOp: { TVar: x6 8 } = add { TVar: x0 8 } { TVar: x5 8 } }',
+        '{ ECoJump: jig { TVar: x0 8 } { TInt: 5 } @end }',
+        '{ ECopy: { TPointer: x0 } = { TVar: x1 8 } }',
+        '{ EBinOp: { TVar: x7 8 } = div { TInt: 1 } { TInt: 0 } }',
+        '{ ELabel: @end }',
+        '{ EBinOp: { TVar: x8 8 } = add { TVar: x1 8 } { TInt: 1 } }'
+    ]],
+    # narrow writes keep their upper bits, so the variable is no longer known
+    ["""
+pro narrow x0
+    x1 = 300
+    x1b = add x1b 1
+    x2 = add x1 1
+    x3b = add 255 1
+    ret x2
+""", [
+        '{ ECopy: { TVar: x1 8 } = { TInt: 300 } }',
+        '{ EBinOp: { TVar: x1 1 } = add { TVar: x1 1 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x1 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x3 1 } = { TInt: 0 } }'
+    ]]
+]
+
+def runStatementTests():
+    for s in statementTestSets:
+        if not hlp.areValuesEqual(getFoldedLines(s[0]), s[1]):
+            return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runValueTests()
+    allPass = allPass and runStatementTests()
+
+    if allPass:
+        print('all folding tests passed')
+    else:
+        print('at least one folding test failed')
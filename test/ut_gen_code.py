@@ -89,7 +89,7 @@ basicX8664TestSets = [
     #
     [
         lambda: gen.getAsmLocalLabel(
-            par.ELabel('@test'),
+            '@test',
             'fun',
             basicX8664Asmap
         ),
@@ -99,10 +99,7 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmJump(
-            par.EJump(
-                gram.JUMP,
-                '@test'
-            ),
+            '@test',
             'fun',
             basicX8664Asmap
         ),
@@ -112,12 +109,10 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCoJump(
-            par.ECoJump(
-                gram.JIGE,
-                lex.TVar('x0', 8),
-                lex.TVar('x1', 8),
-                '@test'
-            ),
+            gram.JIGE,
+            lex.TVar('x0', 8),
+            lex.TVar('x1', 8),
+            '@test',
             'fun',
             basicX8664Asmap,
             basicX8664Assignments
@@ -129,12 +124,10 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCoJump(
-            par.ECoJump(
-                gram.JIGE,
-                lex.TVar('x2', 8),
-                lex.TVar('x3', 8),
-                '@test'
-            ),
+            gram.JIGE,
+            lex.TVar('x2', 8),
+            lex.TVar('x3', 8),
+            '@test',
             'fun',
             basicX8664Asmap,
             basicX8664Assignments
@@ -151,10 +144,8 @@ basicX8664TestSets = [
     #
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 8),
-                lex.TInt(gram.INT, '1')
-            ),
+            lex.TVar('x0', 8),
+            lex.TInt(gram.INT, '1'),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -164,10 +155,8 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 8),
-                lex.TVar('x2', 8)
-            ),
+            lex.TVar('x0', 8),
+            lex.TVar('x2', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -178,10 +167,8 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 8),
-                lex.TVar('x0', 8)
-            ),
+            lex.TVar('x2', 8),
+            lex.TVar('x0', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -195,10 +182,8 @@ basicX8664TestSets = [
     #
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 8),
-                lex.TPointer('x1')
-            ),
+            lex.TVar('x0', 8),
+            lex.TPointer('x1'),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -208,10 +193,8 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x0'),
-                lex.TVar('x1', 8)
-            ),
+            lex.TPointer('x0'),
+            lex.TVar('x1', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -221,10 +204,8 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 8),
-                lex.TPointer('x3')
-            ),
+            lex.TVar('x2', 8),
+            lex.TPointer('x3'),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -236,10 +217,8 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x2'),
-                lex.TVar('x3', 8)
-            ),
+            lex.TPointer('x2'),
+            lex.TVar('x3', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -254,11 +233,9 @@ basicX8664TestSets = [
     #
     [
         lambda: gen.getAsmUnOp(
-            par.EUnOp(
-                lex.TVar('x0', 8),
-                gram.NOT,
-                lex.TVar('x1', 8)
-            ),
+            lex.TVar('x0', 8),
+            gram.NOT,
+            lex.TVar('x1', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -269,11 +246,9 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmUnOp(
-            par.EUnOp(
-                lex.TVar('x2', 8),
-                gram.NOT,
-                lex.TVar('x3', 8)
-            ),
+            lex.TVar('x2', 8),
+            gram.NOT,
+            lex.TVar('x3', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -290,12 +265,10 @@ basicX8664TestSets = [
     #
     [
         lambda: gen.getAsmBinOp(
-            par.EBinOp(
-                lex.TVar('x0', 8),
-                gram.ADD,
-                lex.TVar('x1', 8),
-                lex.TVar('x1', 8)
-            ),
+            lex.TVar('x0', 8),
+            gram.ADD,
+            lex.TVar('x1', 8),
+            lex.TVar('x1', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -306,12 +279,38 @@ basicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmBinOp(
-            par.EBinOp(
-                lex.TVar('x2', 8),
-                gram.ADD,
-                lex.TVar('x3', 8),
-                lex.TVar('x4', 8)
-            ),
+            lex.TVar('x0', 8),
+            gram.ADD,
+            lex.TVar('x1', 8),
+            lex.TVar('x0', 8),
+            basicX8664Asmap,
+            basicX8664Assignments
+        ),
+        [
+            'add rdi, rsi'
+        ]
+    ],
+    [
+        lambda: gen.getAsmBinOp(
+            lex.TVar('x0', 8),
+            gram.SUB,
+            lex.TVar('x1', 8),
+            lex.TVar('x0', 8),
+            basicX8664Asmap,
+            basicX8664Assignments
+        ),
+        [
+            'mov r11, rdi',
+            'mov rdi, rsi',
+            'sub rdi, r11'
+        ]
+    ],
+    [
+        lambda: gen.getAsmBinOp(
+            lex.TVar('x2', 8),
+            gram.ADD,
+            lex.TVar('x3', 8),
+            lex.TVar('x4', 8),
             basicX8664Asmap,
             basicX8664Assignments
         ),
@@ -351,12 +350,10 @@ sizedBasicX8664TestSets = [
     #
     [
         lambda: gen.getAsmCoJump(
-            par.ECoJump(
-                gram.JIGE,
-                lex.TVar('x0', 4),
-                lex.TVar('x1', 4),
-                '@test'
-            ),
+            gram.JIGE,
+            lex.TVar('x0', 4),
+            lex.TVar('x1', 4),
+            '@test',
             'fun',
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
@@ -368,12 +365,10 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCoJump(
-            par.ECoJump(
-                gram.JIGE,
-                lex.TVar('x2', 4),
-                lex.TVar('x3', 4),
-                '@test'
-            ),
+            gram.JIGE,
+            lex.TVar('x2', 4),
+            lex.TVar('x3', 4),
+            '@test',
             'fun',
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
@@ -390,10 +385,8 @@ sizedBasicX8664TestSets = [
     #
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 4),
-                lex.TInt(gram.INT, '1')
-            ),
+            lex.TVar('x0', 4),
+            lex.TInt(gram.INT, '1'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -403,10 +396,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 4),
-                lex.TVar('x1', 4)
-            ),
+            lex.TVar('x0', 4),
+            lex.TVar('x1', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -416,10 +407,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 4),
-                lex.TPointer('x1')
-            ),
+            lex.TVar('x0', 4),
+            lex.TPointer('x1'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -429,10 +418,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x0'),
-                lex.TVar('x1', 4)
-            ),
+            lex.TPointer('x0'),
+            lex.TVar('x1', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -442,10 +429,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 4),
-                lex.TPointer('x3')
-            ),
+            lex.TVar('x2', 4),
+            lex.TPointer('x3'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -457,10 +442,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x2'),
-                lex.TVar('x3', 4)
-            ),
+            lex.TPointer('x2'),
+            lex.TVar('x3', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -472,10 +455,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 2),
-                lex.TPointer('x3')
-            ),
+            lex.TVar('x2', 2),
+            lex.TPointer('x3'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -487,10 +468,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x2'),
-                lex.TVar('x3', 2)
-            ),
+            lex.TPointer('x2'),
+            lex.TVar('x3', 2),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -502,10 +481,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 1),
-                lex.TPointer('x3')
-            ),
+            lex.TVar('x2', 1),
+            lex.TPointer('x3'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -517,10 +494,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TPointer('x2'),
-                lex.TVar('x3', 1)
-            ),
+            lex.TPointer('x2'),
+            lex.TVar('x3', 1),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -532,10 +507,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 8),
-                lex.TIdentifier('array_0')
-            ),
+            lex.TVar('x0', 8),
+            lex.TIdentifier('array_0'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -545,10 +518,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 8),
-                lex.TIdentifier('array_0')
-            ),
+            lex.TVar('x2', 8),
+            lex.TIdentifier('array_0'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -559,10 +530,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x0', 8),
-                lex.TPointer('array_0')
-            ),
+            lex.TVar('x0', 8),
+            lex.TPointer('array_0'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -572,10 +541,8 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmCopy(
-            par.ECopy(
-                lex.TVar('x2', 8),
-                lex.TPointer('array_0')
-            ),
+            lex.TVar('x2', 8),
+            lex.TPointer('array_0'),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -589,11 +556,9 @@ sizedBasicX8664TestSets = [
     #
     [
         lambda: gen.getAsmUnOp(
-            par.EUnOp(
-                lex.TVar('x0', 4),
-                gram.NOT,
-                lex.TVar('x1', 4)
-            ),
+            lex.TVar('x0', 4),
+            gram.NOT,
+            lex.TVar('x1', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -604,11 +569,9 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmUnOp(
-            par.EUnOp(
-                lex.TVar('x2', 4),
-                gram.NOT,
-                lex.TVar('x3', 4)
-            ),
+            lex.TVar('x2', 4),
+            gram.NOT,
+            lex.TVar('x3', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -625,12 +588,10 @@ sizedBasicX8664TestSets = [
     #
     [
         lambda: gen.getAsmBinOp(
-            par.EBinOp(
-                lex.TVar('x0', 4),
-                gram.ADD,
-                lex.TVar('x1', 4),
-                lex.TVar('x1', 4)
-            ),
+            lex.TVar('x0', 4),
+            gram.ADD,
+            lex.TVar('x1', 4),
+            lex.TVar('x1', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -641,12 +602,10 @@ sizedBasicX8664TestSets = [
     ],
     [
         lambda: gen.getAsmBinOp(
-            par.EBinOp(
-                lex.TVar('x2', 4),
-                gram.ADD,
-                lex.TVar('x3', 4),
-                lex.TVar('x4', 4)
-            ),
+            lex.TVar('x2', 4),
+            gram.ADD,
+            lex.TVar('x3', 4),
+            lex.TVar('x4', 4),
             sizedBasicX8664Asmap,
             sizedBasicX8664Assignments
         ),
@@ -116,17 +116,9 @@ simple_test_2:
 sub rsp, 32
 mov rsi, rdi
 add rsi, 2
-mov [rsp], rdi
-mov [rsp + 8], rsi
-mov [rsp + 16], rdx
 mov rdi, rsi
-call simple_inc_2
-mov rdi, [rsp]
-mov rsi, [rsp + 8]
-mov rdx, [rsp + 16]
-mov rdx, rax
 add rsp, 32
-ret
+jmp simple_inc_2
 """
 
 SOURCE_CODE_3 = """
@@ -235,28 +227,14 @@ add rdi, r11
 mov r11, [rsp + 120]
 mov rbx, rdi
 add rbx, r11
-mov [rsp + 40], rdi
-mov [rsp + 48], rsi
-mov [rsp + 56], rdx
-mov [rsp + 64], rcx
-mov [rsp + 72], r8
-mov [rsp + 80], r9
 mov rdi, rbx
-call simple_inc_4
-mov rdi, [rsp + 40]
-mov rsi, [rsp + 48]
-mov rdx, [rsp + 56]
-mov rcx, [rsp + 64]
-mov r8, [rsp + 72]
-mov r9, [rsp + 80]
-mov rdi, rax
 mov rbx, [rsp]
 mov r12, [rsp + 8]
 mov r13, [rsp + 16]
 mov r14, [rsp + 24]
 mov r15, [rsp + 32]
 add rsp, 96
-ret
+jmp simple_inc_4
 """
 
 SOURCE_CODE_5 = """
@@ -345,12 +323,6 @@ mov [rsp + 48], rdx
 mov [rsp + 56], rcx
 mov [rsp + 64], r8
 mov [rsp + 72], r9
-mov rdi, [rsp + 32]
-mov rsi, [rsp + 40]
-mov rdx, [rsp + 48]
-mov rcx, [rsp + 56]
-mov r8, [rsp + 64]
-mov r9, [rsp + 72]
 push r13
 push r12
 push rbx
@@ -267,6 +267,9 @@ class SimpleAssemblyMap(asm.AssemblyMap):
     def emitCall(self, proName):
         return ['call ' + proName]
     
+    def emitTailCall(self, proName):
+        return ['jmp ' + proName]
+    
     def emitRet(self):
         return ['ret']
     
@@ -379,22 +382,11 @@ add r4, r10
 mov r10, [sp + 64]
 mov r5, r4
 add r5, r10
-mov [sp + 16], r1
-mov [sp + 24], r2
-mov [sp + 32], r3
-mov [sp + 40], r4
 mov r1, r5
-call simple_inc_0
-mov r1, [sp + 16]
-mov r2, [sp + 24]
-mov r3, [sp + 32]
-mov r4, [sp + 40]
-mov r6, r0
-mov r0, r6
 mov r5, [sp]
 mov r6, [sp + 8]
 add sp, 48
-ret
+jmp simple_inc_0
 """
 
 
@@ -454,8 +446,6 @@ mov [sp + 16], r1
 mov [sp + 24], r2
 mov [sp + 32], r3
 mov [sp + 40], r4
-mov r1, [sp + 16]
-mov r2, [sp + 24]
 push r5
 push r4
 push r3
@@ -554,17 +544,14 @@ ret
 testAdd4:
 sub sp, 16
 mov [sp], r1
-mov [sp + 8], r2
-mov r1, [sp]
-mov r2, 2
 mov r8, 4
 push r8
 mov r8, 3
 push r8
+mov r2, 2
 call add4
 add sp, 16
 mov r1, [sp]
-mov r2, [sp + 8]
 mov r2, r0
 mov r0, r2
 add sp, 16
@@ -592,9 +579,111 @@ ret
 
 runTest:
 sub sp, 32
+mov r9, r1
 mov r1, r2
-call r1
+add sp, 32
+jmp r9
+"""
+
+SOURCE_CODE_6 = """
+pro diff x0 x1
+    x2 = sub x0 x1
+    ret x2
+
+pro flip x0 x1
+    x2 = diff x1 x0
+    ret x2
+"""
+
+TARGET_CODE_6 = """
+.section .text
+
+.global diff
+.global flip
+
+diff:
+mov r3, r1
+sub r3, r2
+mov r0, r3
+ret
+
+flip:
+sub sp, 32
+mov [sp], r1
+mov r1, r2
+mov r2, [sp]
+add sp, 32
+jmp diff
+"""
+
+SOURCE_CODE_7 = """
+pro inc_7 x0
+    x0 = add x0 1
+    ret x0
+
+pro count_7 x0 x1
+    @top
+    x0 = inc_7 x0
+    jil x0 x1 @top
+    ret x0
+"""
+
+TARGET_CODE_7 = """
+.section .text
+
+.global inc_7
+.global count_7
+
+inc_7:
+add r1, 1
+mov r0, r1
+ret
+
+count_7:
+sub sp, 16
+count_7_top:
+call inc_7
+mov r1, r0
+cmp r1, r2
+jl count_7_top
+mov r0, r1
+add sp, 16
+ret
+"""
+
+SOURCE_CODE_8 = """
+pro pick_8 x0 x1 x2
+    ret x2
+
+pro cross_8 x0 x1
+    x2 = pick_8 x1 x0 x0
+    x2 = add x2 x1
+    ret x2
+"""
+
+TARGET_CODE_8 = """
+.section .text
+
+.global pick_8
+.global cross_8
+
+pick_8:
+mov r0, [sp + 8]
+ret
+
+cross_8:
+sub sp, 32
+mov [sp], r1
+mov [sp + 8], r2
+push r1
+mov r1, r2
+mov r2, [sp + 8]
+call pick_8
+add sp, 8
+mov r1, [sp]
+mov r2, [sp + 8]
 mov r3, r0
+add r3, r2
 mov r0, r3
 add sp, 32
 ret
@@ -606,7 +695,10 @@ testSetA = [
     [SOURCE_CODE_2, TARGET_CODE_2],
     [SOURCE_CODE_3, TARGET_CODE_3],
     [SOURCE_CODE_4, TARGET_CODE_4],
-    [SOURCE_CODE_5, TARGET_CODE_5]
+    [SOURCE_CODE_5, TARGET_CODE_5],
+    [SOURCE_CODE_6, TARGET_CODE_6],
+    [SOURCE_CODE_7, TARGET_CODE_7],
+    [SOURCE_CODE_8, TARGET_CODE_8]
 ]
 
 #
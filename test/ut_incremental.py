@@ -0,0 +1,129 @@
+import lib.incremental as inc
+import test.ut_component_vars as vars
+
+#
+# test helpers
+#
+
+def getExpressionStrings(parse):
+    return [e.toString() for e in inc.getParseExpressions(parse)]
+
+def areParsesEqual(generated, expected):
+    generatedStrings = getExpressionStrings(generated)
+    expectedStrings = getExpressionStrings(expected)
+
+    if generatedStrings != expectedStrings:
+        print('test failed\n')
+        print('generated:')
+        print('\n'.join(generatedStrings))
+        print('\nexpected:')
+        print('\n'.join(expectedStrings))
+        print('')
+        return False
+
+    if generated.starts != expected.starts:
+        print('test failed\n')
+        print('generated block starts: ' + str(generated.starts))
+        print('expected block starts: ' + str(expected.starts) + '\n')
+        return False
+
+    if inc.getParseErrors(generated) != inc.getParseErrors(expected):
+        print('test failed\n')
+        print('generated errors: ' + str(inc.getParseErrors(generated)))
+        print('expected errors: ' + str(inc.getParseErrors(expected)) + '\n')
+        return False
+
+    return True
+
+def getEdited(text, old, new):
+    offset = text.index(old)
+    return offset, len(old), new
+
+#
+# edit test variables and functions
+#
+
+SOURCE_EDIT = vars.SOURCE_2 + vars.SOURCE_0
+
+editTestSets = [
+    # change one statement
+    [SOURCE_EDIT, 'x0 = add x0 1', 'x0 = sub x0 2'],
+    # insert a new procedure
+    [SOURCE_EDIT, 'pro addNext', 'pro dec x0\n    ret x0\n\npro addNext'],
+    # break a procedure
+    [SOURCE_EDIT, 'ret 0', 'ret'],
+    # remove a block start so two blocks merge
+    [SOURCE_EDIT, 'pro inc', 'inc'],
+    # open a comment that swallows the separator before the next block
+    [SOURCE_EDIT, '    ret x0\n\npro addNext', '    ret x0 #\\\n\npro addNext'],
+    # delete everything
+    [SOURCE_EDIT, SOURCE_EDIT, '']
+]
+
+def runEditTests():
+    for s in editTestSets:
+        text = s[0]
+        parse = inc.getParse(text)
+        offset, removedLength, insertedText = getEdited(text, s[1], s[2])
+
+        generated = inc.getEditedParse(parse, offset, removedLength, insertedText)
+        expected = inc.getParse(text[:offset] + insertedText + text[offset + removedLength:])
+
+        if (not areParsesEqual(generated, expected)):
+            return False
+
+    return True
+
+def runReuseTests():
+    parse = inc.getParse(SOURCE_EDIT)
+    offset, removedLength, insertedText = getEdited(SOURCE_EDIT, 'x1 = inc x0', 'x1 = inc x1')
+    edited = inc.getEditedParse(parse, offset, removedLength, insertedText)
+
+    before = inc.getParseExpressions(parse)
+    after = inc.getParseExpressions(edited)
+
+    # mem ar, pro setAr and pro inc are untouched, pro addNext is parsed again
+    for i in range(3):
+        if before[i] is not after[i]:
+            print('unchanged expression was not reused: ' + after[i].name)
+            return False
+
+    if before[3] is after[3]:
+        print('edited expression was reused: ' + after[3].name)
+        return False
+
+    return True
+
+def runErrorTests():
+    text = vars.SOURCE_0
+    parse = inc.getParse(text)
+    offset, removedLength, insertedText = getEdited(text, 'ret x0\n\npro', 'jump x0\n\npro')
+    edited = inc.getEditedParse(parse, offset, removedLength, insertedText)
+    errors = inc.getParseErrors(edited)
+
+    if errors != [[1, 'uncondtional jump must be followed by label']]:
+        print('unexpected errors: ' + str(errors))
+        return False
+
+    fixed = inc.getEditedParse(edited, offset, len(insertedText), 'ret x0\n\npro')
+
+    if len(inc.getParseErrors(fixed)) > 0:
+        print('errors were not cleared: ' + str(inc.getParseErrors(fixed)))
+        return False
+
+    return areParsesEqual(fixed, parse)
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runEditTests()
+    allPass = allPass and runReuseTests()
+    allPass = allPass and runErrorTests()
+
+    if allPass:
+        print('all incremental parse tests passed')
+    else:
+        print('at least one incremental parse test failed')
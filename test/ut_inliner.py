@@ -0,0 +1,169 @@
+import lib.parser as par
+import lib.inliner as inl
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+# every procedure is inlined into in turn with the ones before it, the way the optimizer
+# streams them
+def getInlinedPros(source):
+    pros = {}
+    inlined = []
+
+    for pro in hlp.getSourcePros(source):
+        pro = inl.getInlinedPro(pro, pros)
+        pros[pro.name] = pro
+        inlined.append(pro)
+
+    return inlined
+
+#
+# inlining tests
+#
+
+SOURCE_TWICE = """
+pro simple_inc x0
+    x1 = add x0 1
+    ret x1
+
+pro twice x0
+    x1 = simple_inc x0
+    jie x1 0 @zero
+    x1 = simple_inc x1
+    @zero
+    ret x1
+
+pro twice_test
+    x0 = twice 5
+    x1 = !x0 x0
+    ret x0
+"""
+
+inliningTestSets = [
+    # the callee gets fresh variables each time, its parameters are copies of the
+    # arguments and its result a copy into the destination
+    [1, [
+        '{ ECopy: { TVar: x2 8 } = { TVar: x0 8 } }',
+        '{ EBinOp: { TVar: x3 8 } = add { TVar: x2 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x1 8 } = { TVar: x3 8 } }',
+        '{ ECoJump: jie { TVar: x1 8 } { TInt: 0 } @zero }',
+        '{ ECopy: { TVar: x4 8 } = { TVar: x1 8 } }',
+        '{ EBinOp: { TVar: x5 8 } = add { TVar: x4 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x1 8 } = { TVar: x5 8 } }',
+        '{ ELabel: @zero }',
+        '{ TVar: x1 8 }'
+    ]],
+    # labels of an inlined body get fresh names too, and calls through a variable stay
+    [2, [
+        '{ ECopy: { TVar: x2 8 } = { TInt: 5 } }',
+        '{ ECopy: { TVar: x4 8 } = { TVar: x2 8 } }',
+        '{ EBinOp: { TVar: x5 8 } = add { TVar: x4 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x3 8 } = { TVar: x5 8 } }',
+        '{ ECoJump: jie { TVar: x3 8 } { TInt: 0 } @inl0 }',
+        '{ ECopy: { TVar: x6 8 } = { TVar: x3 8 } }',
+        '{ EBinOp: { TVar: x7 8 } = add { TVar: x6 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x3 8 } = { TVar: x7 8 } }',
+        '{ ELabel: @inl0 }',
+        '{ ECopy: { TVar: x0 8 } = { TVar: x3 8 } }',
+        '{ EProCall: { TVar: x1 8 } = !x0 { TVar: x0 8 } }',
+        '{ TVar: x0 8 }'
+    ]]
+]
+
+def runInliningTests():
+    pros = getInlinedPros(SOURCE_TWICE)
+
+    for s in inliningTestSets:
+        if not hlp.areValuesEqual(hlp.getProLines(pros[s[0]]), s[1]):
+            return False
+
+    # a procedure calling nothing once its callees are inlined is a leaf again
+    if not hlp.areValuesEqual([pros[1].isLeaf, pros[2].isLeaf], [True, False]):
+        return False
+
+    props = par.getProcedureProperties(pros)
+    if not hlp.areValuesEqual(props.usesInt, {'simple_inc': True, 'twice': True, 'twice_test': True}):
+        return False
+
+    return True
+
+#
+# limit tests
+#
+
+def getCallCount(pro):
+    return len([exp for exp in pro.expressions if exp.kind == par.EXP_KIND_PRO_CALL])
+
+limitTestSets = [
+    # a procedure is never inlined into itself
+    ["""
+pro rec x0
+    x1 = rec x0
+    ret x1
+""", 1],
+    # calls reached through as many bodies as the depth limit stay calls
+    ["""
+pro top x0
+    x1 = d0 x0
+    ret x1
+""", 1],
+    # a body much larger than the call stays a call
+    ["""
+pro big x0
+    x1 = large x0
+    ret x1
+""", 1]
+]
+
+LIMIT_PROS = """
+pro d3 x0
+    x1 = add x0 1
+    ret x1
+
+pro d2 x0
+    x1 = d3 x0
+    ret x1
+
+pro d1 x0
+    x1 = d2 x0
+    ret x1
+
+pro d0 x0
+    x1 = d1 x0
+    ret x1
+
+pro large x0
+""" + ''.join(['    x0 = add x0 ' + str(i) + '\n' for i in range(16)]) + """    ret x0
+"""
+
+def runLimitTests():
+    pros = {pro.name: pro for pro in hlp.getSourcePros(LIMIT_PROS)}
+    pros['rec'] = hlp.getSourcePros(limitTestSets[0][0])[0]
+
+    for s in limitTestSets:
+        pro = inl.getInlinedPro(hlp.getSourcePros(s[0])[0], pros)
+        if not hlp.areValuesEqual(getCallCount(pro), s[1]):
+            return False
+
+    pro = hlp.getSourcePros(limitTestSets[0][0])[0]
+    if inl.getInlinedPro(pro, pros) is not pro:
+        print('procedure without inlined calls must be left unchanged')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runInliningTests()
+    allPass = allPass and runLimitTests()
+
+    if allPass:
+        print('all inlining tests passed')
+    else:
+        print('at least one inlining test failed')
@@ -0,0 +1,258 @@
+import lib.ivs as ivs
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getReducedLines(source):
+    pro = ivs.getInductionReducedPro(hlp.getSourcePro(source), hlp.REGISTER_COUNT)
+    return [exp.toString() for exp in pro.expressions] + [pro.ret.toString()]
+
+#
+# induction tests
+#
+
+inductionTestSets = [
+    # the counter next to the sum is only read by the exit test, which compares the other
+    # variable against the value it has when the counter stops instead; the first values
+    # and the bound are constants and nothing leaves the word on the way there
+    ["""
+pro count
+    x1 = 0
+    x2 = 0
+    x3 = 0
+    @begin
+    jige x2 10 @end
+    x3 = add x3 x1
+    x1 = add x1 8
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""", [
+        '{ ECopy: { TVar: x4 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x7 8 } = { TVar: x4 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x6 8 } }',
+        '{ ELabel: @begin }',
+        '{ ECoJump: jige { TVar: x7 8 } { TInt: 80 } @end }',
+        '{ EBinOp: { TVar: x10 8 } = add { TVar: x9 8 } { TVar: x7 8 } }',
+        '{ EBinOp: { TVar: x11 8 } = add { TVar: x7 8 } { TInt: 8 } }',
+        '{ ECopy: { TVar: x7 8 } = { TVar: x11 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x10 8 } }',
+        '{ EJump: jump @begin }',
+        '{ ELabel: @end }',
+        '{ TVar: x9 8 }'
+    ]],
+    # an equality test moves whatever the bound when the ratio of the steps is odd
+    ["""
+pro until x0
+    x1 = 0
+    x2 = 0
+    x3 = 0
+    @begin
+    jie x2 x0 @end
+    x3 = add x3 x1
+    x1 = add x1 3
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""", [
+        '{ ECopy: { TVar: x4 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 0 } }',
+        '{ EBinOp: { TVar: x14 8 } = mul { TVar: x0 8 } { TInt: 3 } }',
+        '{ ECopy: { TVar: x7 8 } = { TVar: x4 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x6 8 } }',
+        '{ ELabel: @begin }',
+        '{ ECoJump: jie { TVar: x7 8 } { TVar: x14 8 } @end }',
+        '{ EBinOp: { TVar: x10 8 } = add { TVar: x9 8 } { TVar: x7 8 } }',
+        '{ EBinOp: { TVar: x11 8 } = add { TVar: x7 8 } { TInt: 3 } }',
+        '{ ECopy: { TVar: x7 8 } = { TVar: x11 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x10 8 } }',
+        '{ EJump: jump @begin }',
+        '{ ELabel: @end }',
+        '{ TVar: x9 8 }'
+    ]],
+    # an indexed address becomes a pointer stepped by the element size, the exit test
+    # stays on the index since its bound is not a constant
+    ["""
+mem ar {1 2 3}
+pro index x0
+    x1 = ar
+    x2 = 0
+    x3 = 0
+    @begin
+    jige x2 x0 @end
+    x5 = mul x2 8
+    x6 = add x1 x5
+    x4 = [x6]
+    x3 = add x3 x4
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""", [
+        '{ ECopy: { TVar: x7 8 } = { TIdentifier: ar } }',
+        '{ ECopy: { TVar: x8 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x9 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x10 8 } = { TVar: x8 8 } }',
+        '{ ECopy: { TVar: x11 8 } = { TVar: x9 8 } }',
+        '{ ECopy: { TVar: x18 8 } = { TVar: x7 8 } }',
+        '{ ELabel: @begin }',
+        '{ ECoJump: jige { TVar: x10 8 } { TVar: x0 8 } @end }',
+        '{ ECopy: { TVar: x13 8 } = { TVar: x18 8 } }',
+        '{ ECopy: { TVar: x14 8 } = { TPointer: x13 } }',
+        '{ EBinOp: { TVar: x15 8 } = add { TVar: x11 8 } { TVar: x14 8 } }',
+        '{ EBinOp: { TVar: x16 8 } = add { TVar: x10 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x19 8 } = add { TVar: x18 8 } { TInt: 8 } }',
+        '{ ECopy: { TVar: x10 8 } = { TVar: x16 8 } }',
+        '{ ECopy: { TVar: x11 8 } = { TVar: x15 8 } }',
+        '{ ECopy: { TVar: x18 8 } = { TVar: x19 8 } }',
+        '{ EJump: jump @begin }',
+        '{ ELabel: @end }',
+        '{ TVar: x11 8 }'
+    ]]
+]
+
+unchangedTestSets = [
+    # the counter is read by the sum, so it stays and so does its exit test
+    """
+mem ar {1 2 3}
+pro kept x0
+    x1 = ar
+    x2 = 0
+    x3 = 0
+    @begin
+    jige x2 x0 @end
+    x4 = [x1]
+    x3 = add x3 x2
+    x1 = add x1 8
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""",
+    # a step that is not a constant makes no induction variable
+    """
+pro steps x0 x1
+    x2 = 0
+    @begin
+    jige x2 x0 @end
+    x2 = add x2 x1
+    jump @begin
+    @end
+    ret x2
+""",
+    # an ordered test against a bound that is not a constant stays, the pointer may wrap
+    # around before the counter gets there
+    """
+mem ar {1 2 3}
+pro walk x0
+    x1 = ar
+    x2 = 0
+    x3 = 0
+    @begin
+    jige x2 x0 @end
+    x4 = [x1]
+    x3 = add x3 x4
+    x1 = add x1 8
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""",
+    # and so does one with a first value that is not a constant: f(0, 9223372036854775803)
+    # passes ten times, where a bound of x1 + 20 wraps around and leaves at once
+    """
+pro f x0 x1
+    x2 = 0
+    @L1
+    jige x2 10 @X1
+    x1 = add x1 2
+    x2 = add x2 1
+    jump @L1
+    @X1
+    ret x1
+""",
+    # with constants the other variable still wraps before the counter reaches the bound
+    """
+pro wraps
+    x1 = 9223372036854775803
+    x2 = 0
+    @begin
+    jige x2 10 @end
+    x1 = add x1 2
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x1
+""",
+    # a test skipped on some passes does not stop the loop when it settles
+    """
+pro skips x0
+    x1 = 0
+    x2 = 0
+    x3 = 0
+    @begin
+    jie x0 0 @next
+    jige x2 10 @end
+    @next
+    x3 = add x3 x1
+    x1 = add x1 8
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+""",
+    # an even ratio has no inverse modulo the word, so an equality test stays
+    """
+pro until x0
+    x1 = 0
+    x2 = 0
+    x3 = 0
+    @begin
+    jie x2 x0 @end
+    x3 = add x3 x1
+    x1 = add x1 2
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x3
+"""
+]
+
+def runInductionTests():
+    for s in inductionTestSets:
+        if not hlp.areValuesEqual(getReducedLines(s[0]), s[1]):
+            return False
+
+    for s in unchangedTestSets:
+        pro = hlp.getSourcePro(s)
+        if ivs.getInductionReducedPro(pro, hlp.REGISTER_COUNT) is not pro:
+            print('procedure without redundant induction variables must be left unchanged')
+            return False
+
+    # a scaled index only gets its own variable while the target has a register for it
+    pro = hlp.getSourcePro(inductionTestSets[2][0])
+    if ivs.getInductionReducedPro(pro, 0) is not pro:
+        print('procedure must be left unchanged without free registers')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runInductionTests()
+
+    if allPass:
+        print('all induction variable tests passed')
+    else:
+        print('at least one induction variable test failed')
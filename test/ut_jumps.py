@@ -0,0 +1,116 @@
+import lib.jumps as jumps
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getSimplifiedLines(source):
+    return [exp.toString() for exp in jumps.getJumpsSimplifiedPro(hlp.getSourcePro(source)).expressions]
+
+#
+# simplification tests
+#
+
+simplificationTestSets = [
+    # jumps through a chain of jumps go to its end, which here is the next block, and the
+    # code after a jump nothing goes to is gone
+    ["""
+pro chain x0
+    jie x0 0 @one
+    x0 = add x0 1
+    jump @two
+    @one
+    jump @two
+    @two
+    jump @three
+    x0 = 5
+    @three
+    ret x0
+""", [
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @three }',
+        '{ EBinOp: { TVar: x0 8 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ ELabel: @three }'
+    ]],
+    # a conditional jump over a jump takes the opposite condition
+    ["""
+pro over x0 x1
+    @top
+    jil x0 x1 @skip
+    jump @done
+    @skip
+    x0 = add x0 1
+    jump @top
+    @done
+    ret x0
+""", [
+        '{ ELabel: @top }',
+        '{ ECoJump: jige { TVar: x0 8 } { TVar: x1 8 } @done }',
+        '{ EBinOp: { TVar: x0 8 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ EJump: jump @top }',
+        '{ ELabel: @done }'
+    ]],
+    # blocks only reached by a jump are put in its place until the code reads straight
+    ["""
+pro merge x0
+    jump @far
+    @back
+    x0 = add x0 2
+    jump @end
+    @far
+    x0 = add x0 1
+    jump @back
+    @end
+    ret x0
+""", [
+        '{ EBinOp: { TVar: x0 8 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x0 8 } = add { TVar: x0 8 } { TInt: 2 } }'
+    ]],
+    # a chain of jumps going round in a circle stays a loop
+    ["""
+pro spin x0
+    jie x0 0 @end
+    @one
+    jump @two
+    @two
+    jump @one
+    @end
+    ret x0
+""", [
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @end }',
+        '{ ELabel: @one }',
+        '{ EJump: jump @one }',
+        '{ ELabel: @end }'
+    ]]
+]
+
+def runSimplificationTests():
+    for s in simplificationTestSets:
+        if not hlp.areValuesEqual(getSimplifiedLines(s[0]), s[1]):
+            return False
+
+    pro = hlp.getSourcePro("""
+pro loop x0
+    @top
+    x0 = sub x0 1
+    jig x0 0 @top
+    ret x0
+""")
+    if jumps.getJumpsSimplifiedPro(pro) is not pro:
+        print('procedure without jumps to simplify must be left unchanged')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runSimplificationTests()
+
+    if allPass:
+        print('all jump simplification tests passed')
+    else:
+        print('at least one jump simplification test failed')
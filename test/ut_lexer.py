@@ -1,3 +1,5 @@
+import io
+
 import lib.lexer as lex
 import test.ut_component_vars as vars
 
@@ -8,6 +10,16 @@ tokenTestPairs = [
     [vars.SOURCE_3, vars.TOKENS_3]
 ]
 
+engineTestSources = [
+    vars.SOURCE_0,
+    vars.SOURCE_1,
+    vars.SOURCE_2,
+    vars.SOURCE_3,
+    'mem text {"a \\"b\\" c" "d"}\r\nmem hex {0x1F -2 \'a\'}\r\n',
+    'pro f x0\n\t[x0] = x1b # note\n  x2d = xor x0w x1\nret x2\n',
+    '@a @ab ab"c d"e !x1 x1q'
+]
+
 def printAllTokens(tokens):
     for t in tokens:
         print(t.toString())
@@ -24,10 +36,9 @@ def printBoth(generated, expected):
     printAllTokens(expected)
     print(' ')
 
-def runTokenTest(source, expected):
+def runTokenTest(source, expected, engine=lex.ENGINE_SEGMENTS):
     try:
-        segments = lex.getSegments(source)
-        generated = lex.getCodeTokens(segments)
+        generated = lex.getTokens(source, engine)
         generatedLength = len(generated)
 
         if generatedLength != len(expected):
@@ -53,12 +64,37 @@ def runTokenTest(source, expected):
         print(ex)
         return False
 
+def runEngineTest(source):
+    expected = lex.getTokens(source, lex.ENGINE_SEGMENTS)
+    return runTokenTest(source, expected, lex.ENGINE_REGEX)
+
+def runStreamTest(source):
+    expected = lex.getTokens(source, lex.ENGINE_SEGMENTS)
+    generated = list(lex.getStreamTokens(io.BytesIO(source.encode(lex.STREAM_ENCODING))))
+    printable = [t.toString() for t in generated]
+
+    if printable != [t.toString() for t in expected]:
+        print('streamed tokens different from expected\n')
+        printBoth(generated, expected)
+        return False
+
+    return True
+
 def runAllTests():
     allPass = True
 
     for pair in tokenTestPairs:
         allPass = allPass and runTokenTest(pair[0], pair[1])
 
+    for pair in tokenTestPairs:
+        allPass = allPass and runTokenTest(pair[0], pair[1], lex.ENGINE_REGEX)
+
+    for source in engineTestSources:
+        allPass = allPass and runEngineTest(source)
+
+    for source in engineTestSources:
+        allPass = allPass and runStreamTest(source)
+
     if allPass:
         print('all lexer tests passed')
     else:
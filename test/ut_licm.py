@@ -0,0 +1,258 @@
+import lib.ssa as ssa
+import lib.licm as licm
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getHoistedLines(source):
+    pro = licm.getLoopInvariantsHoistedPro(hlp.getSourcePro(source), hlp.REGISTER_COUNT)
+    return [exp.toString() for exp in pro.expressions] + [pro.ret.toString()]
+
+def getPreheaderLines(source):
+    return [exp.toString() for exp in licm.getPreheaderCode(hlp.getSourcePro(source).expressions)]
+
+SOURCE_INVARIANT = """
+pro invariant x0 x1
+    x2 = 0
+    x3 = 0
+    @begin
+    jige x3 x0 @end
+    x4 = mul x1 8
+    x5 = add x4 3
+    x2 = add x2 x5
+    x3 = add x3 1
+    jump @begin
+    @end
+    ret x2
+"""
+
+SOURCE_ENTRIES = """
+pro entries x0 x1
+    x2 = 0
+    jil x0 x1 @loop
+    x2 = 5
+    @loop
+    x3 = xor x1 7
+    x2 = add x2 x3
+    x0 = sub x0 1
+    jig x0 0 @loop
+    ret x2
+"""
+
+#
+# preheader tests
+#
+
+preheaderTestSets = [
+    # both ways into the loop go through the new block, the back edge does not
+    [SOURCE_ENTRIES, [
+        '{ ECopy: { TVar: x2 8 } = { TInt: 0 } }',
+        '{ ECoJump: jil { TVar: x0 8 } { TVar: x1 8 } @pre0 }',
+        '{ ECopy: { TVar: x2 8 } = { TInt: 5 } }',
+        '{ ELabel: @pre0 }',
+        '{ EJump: jump @loop }',
+        '{ ELabel: @loop }',
+        '{ EBinOp: { TVar: x3 8 } = xor { TVar: x1 8 } { TInt: 7 } }',
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x2 8 } { TVar: x3 8 } }',
+        '{ EBinOp: { TVar: x0 8 } = sub { TVar: x0 8 } { TInt: 1 } }',
+        '{ ECoJump: jig { TVar: x0 8 } { TInt: 0 } @loop }'
+    ]],
+    # a loop block falling into the header jumps over the new block
+    ["""
+pro over x0
+    jie x0 0 @head
+    x0 = 3
+    jump @head
+    @body
+    x0 = sub x0 1
+    @head
+    jig x0 0 @body
+    ret x0
+""", [
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @pre0 }',
+        '{ ECopy: { TVar: x0 8 } = { TInt: 3 } }',
+        '{ EJump: jump @pre0 }',
+        '{ ELabel: @body }',
+        '{ EBinOp: { TVar: x0 8 } = sub { TVar: x0 8 } { TInt: 1 } }',
+        '{ EJump: jump @head }',
+        '{ ELabel: @pre0 }',
+        '{ EJump: jump @head }',
+        '{ ELabel: @head }',
+        '{ ECoJump: jig { TVar: x0 8 } { TInt: 0 } @body }'
+    ]]
+]
+
+def runPreheaderTests():
+    for s in preheaderTestSets:
+        if not hlp.areValuesEqual(getPreheaderLines(s[0]), s[1]):
+            return False
+
+    pro = hlp.getSourcePro(SOURCE_INVARIANT)
+    if licm.getPreheaderCode(pro.expressions) is not pro.expressions:
+        print('loops entered from one block must be left as they are')
+        return False
+
+    return True
+
+#
+# hoisting tests
+#
+
+hoistingTestSets = [
+    # a chain of invariant statements moves in order, the counter and the sum stay
+    [SOURCE_INVARIANT, [
+        '{ ECopy: { TVar: x6 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x7 8 } = { TInt: 0 } }',
+        '{ EBinOp: { TVar: x10 8 } = mul { TVar: x1 8 } { TInt: 8 } }',
+        '{ EBinOp: { TVar: x11 8 } = add { TVar: x10 8 } { TInt: 3 } }',
+        '{ ECopy: { TVar: x8 8 } = { TVar: x6 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x7 8 } }',
+        '{ ELabel: @begin }',
+        '{ ECoJump: jige { TVar: x9 8 } { TVar: x0 8 } @end }',
+        '{ EBinOp: { TVar: x12 8 } = add { TVar: x8 8 } { TVar: x11 8 } }',
+        '{ EBinOp: { TVar: x13 8 } = add { TVar: x9 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x8 8 } = { TVar: x12 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x13 8 } }',
+        '{ EJump: jump @begin }',
+        '{ ELabel: @end }',
+        '{ TVar: x8 8 }'
+    ]],
+    # an address moves out of both loops, an offset of the outer counter out of the inner
+    # one only, and the load stays
+    ["""
+mem ar {1 2 3}
+pro nest x0
+    x1 = 0
+    x2 = 0
+    @outer
+    jige x2 x0 @done
+    x3 = 0
+    @inner
+    jige x3 x0 @next
+    x4 = ar
+    x5 = mul x2 8
+    x6 = add x4 x5
+    x7 = [x6]
+    x1 = add x1 x7
+    x3 = add x3 1
+    jump @inner
+    @next
+    x2 = add x2 1
+    jump @outer
+    @done
+    ret x1
+""", [
+        '{ ECopy: { TVar: x8 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x9 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x16 8 } = { TIdentifier: ar } }',
+        '{ ECopy: { TVar: x10 8 } = { TVar: x8 8 } }',
+        '{ ECopy: { TVar: x11 8 } = { TVar: x9 8 } }',
+        '{ ELabel: @outer }',
+        '{ ECoJump: jige { TVar: x11 8 } { TVar: x0 8 } @done }',
+        '{ ECopy: { TVar: x12 8 } = { TInt: 0 } }',
+        '{ EBinOp: { TVar: x17 8 } = mul { TVar: x11 8 } { TInt: 8 } }',
+        '{ EBinOp: { TVar: x18 8 } = add { TVar: x16 8 } { TVar: x17 8 } }',
+        '{ ECopy: { TVar: x13 8 } = { TVar: x10 8 } }',
+        '{ ECopy: { TVar: x14 8 } = { TVar: x12 8 } }',
+        '{ ELabel: @inner }',
+        '{ ECoJump: jige { TVar: x14 8 } { TVar: x0 8 } @next }',
+        '{ ECopy: { TVar: x19 8 } = { TPointer: x18 } }',
+        '{ EBinOp: { TVar: x20 8 } = add { TVar: x13 8 } { TVar: x19 8 } }',
+        '{ EBinOp: { TVar: x21 8 } = add { TVar: x14 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x13 8 } = { TVar: x20 8 } }',
+        '{ ECopy: { TVar: x14 8 } = { TVar: x21 8 } }',
+        '{ EJump: jump @inner }',
+        '{ ELabel: @next }',
+        '{ EBinOp: { TVar: x15 8 } = add { TVar: x11 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x10 8 } = { TVar: x13 8 } }',
+        '{ ECopy: { TVar: x11 8 } = { TVar: x15 8 } }',
+        '{ EJump: jump @outer }',
+        '{ ELabel: @done }',
+        '{ TVar: x10 8 }'
+    ]]
+]
+
+unchangedTestSets = [
+    # loads, divisions that may trap and narrow results stay in the loop
+    """
+pro stays x0 x1
+    x2 = 0
+    @begin
+    jige x2 x0 @end
+    x3 = [x1]
+    x4 = div x0 x1
+    x5b = add x1 1
+    x2 = add x2 1
+    jump @begin
+    @end
+    ret x2
+""",
+    # nothing moves without a loop
+    """
+pro straight x0 x1
+    x2 = mul x1 8
+    x3 = add x0 x2
+    ret x3
+"""
+]
+
+def runHoistingTests():
+    for s in hoistingTestSets:
+        if not hlp.areValuesEqual(getHoistedLines(s[0]), s[1]):
+            return False
+
+    for s in unchangedTestSets:
+        pro = hlp.getSourcePro(s)
+        if licm.getLoopInvariantsHoistedPro(pro, hlp.REGISTER_COUNT) is not pro:
+            print('procedure without invariant statements must be left unchanged')
+            return False
+
+    return True
+
+#
+# register budget tests
+#
+
+def getBudgetHoisted(source, budget):
+    form = ssa.getSsaPro(hlp.getSourcePro(source))
+    hoisted, cost = licm.getHoisted(form, form.cfg.loops[0], budget)
+    return [exp.toString() for exp in hoisted], cost
+
+budgetTestSets = [
+    # the product is only read by the sum, so moving both keeps one value in a register
+    [1, ([
+        '{ EBinOp: { TVar: x10 8 } = mul { TVar: x1 8 } { TInt: 8 } }',
+        '{ EBinOp: { TVar: x11 8 } = add { TVar: x10 8 } { TInt: 3 } }'
+    ], 1)],
+    [0, ([], 0)]
+]
+
+def runBudgetTests():
+    for s in budgetTestSets:
+        if not hlp.areValuesEqual(getBudgetHoisted(SOURCE_INVARIANT, s[0]), s[1]):
+            return False
+
+    # a target without a register to spare keeps the loop as it is
+    pro = hlp.getSourcePro(SOURCE_INVARIANT)
+    if licm.getLoopInvariantsHoistedPro(pro, 0) is not pro:
+        print('procedure must be left unchanged without free registers')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runPreheaderTests()
+    allPass = allPass and runHoistingTests()
+    allPass = allPass and runBudgetTests()
+
+    if allPass:
+        print('all loop invariant code motion tests passed')
+    else:
+        print('at least one loop invariant code motion test failed')
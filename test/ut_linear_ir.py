@@ -0,0 +1,91 @@
+import lib.grammar as gram
+import lib.parser as par
+import lib.linear_ir as lir
+import test.ut_component_vars as vars
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+#
+# round trip tests
+#
+
+SOURCE_WIDTHS = """
+pro widths x0 x1
+    x2b = x0b
+    [x1w] = x2w
+    x3d = [x1d]
+    x4 = !x0b x2 'a' ar
+    x5 = ar
+    jie x3d x4d @out
+    x0 = not x0
+    @out
+    ret x4
+"""
+
+roundTripTestSets = [
+    vars.EXPRESSIONS_0,
+    vars.EXPRESSIONS_1,
+    vars.EXPRESSIONS_2,
+    vars.EXPRESSIONS_3,
+    hlp.getSourcePros(SOURCE_WIDTHS)
+]
+
+def runRoundTripTests():
+    for exps in roundTripTestSets:
+        for exp in exps:
+            if exp.kind == par.EXP_KIND_PRO:
+                lpro = lir.getLinearPro(exp)
+                if not hlp.areStringsEqual(lpro.toString(), exp.toString()):
+                    return False
+
+    return True
+
+#
+# layout tests
+#
+
+def runLayoutTests():
+    lpro = lir.getLinearPro(vars.EXPRESSIONS_1[0])
+
+    if len(lpro) != 6 or list(lpro.opcodes[:2]) != [lir.OP_LABEL, lir.OPCODE_IDS[(par.EXP_KIND_CO_JUMP, gram.JILE)]]:
+        print('unexpected opcodes: ' + str(list(lpro.opcodes)))
+        return False
+
+    # the body is lowered first, so x0 of the conditional jump gets the first id
+    if lpro.vars.getName(1) != 'x0' or lpro.vars.getName(2) != 'x1':
+        print('unexpected variable ids: ' + str(lpro.vars.names))
+        return False
+
+    # a constant used twice is pooled once
+    if len(lpro.consts) != 2:
+        print('unexpected constant pool: ' + str(lpro.consts.names))
+        return False
+
+    dest = lpro.dests[1]
+    if lir.getOperandTag(dest) != lir.OPERAND_LABEL or lpro.getLabelName(dest) != '@end':
+        print('unexpected jump label operand: ' + str(dest))
+        return False
+
+    width = lir.getOperandWidth(lpro.getVarOperand('x0', 1))
+    if width != 1:
+        print('unexpected operand width: ' + str(width))
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runRoundTripTests()
+    allPass = allPass and runLayoutTests()
+
+    if allPass:
+        print('all linear ir tests passed')
+    else:
+        print('at least one linear ir test failed')
@@ -0,0 +1,123 @@
+import lib.lvn as lvn
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getNumberedLines(source):
+    return [exp.toString() for exp in lvn.getValueNumberedPro(hlp.getSourcePro(source)).expressions]
+
+#
+# numbering tests
+#
+
+numberingTestSets = [
+    # operands of commutative ops are taken in either order, copies and constants carry
+    # the value they hold
+    ["""
+pro commute x0 x1
+    x2 = add x0 x1
+    x3 = add x1 x0
+    x4 = mul x2 x3
+    x5 = mul x3 x2
+    x6 = 4
+    x7 = and x0 x6
+    x8 = and 4 x0
+    x9 = sub x0 x1
+    x10 = sub x1 x0
+    ret x10
+""", [
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x0 8 } { TVar: x1 8 } }',
+        '{ ECopy: { TVar: x3 8 } = { TVar: x2 8 } }',
+        '{ EBinOp: { TVar: x4 8 } = mul { TVar: x2 8 } { TVar: x3 8 } }',
+        '{ ECopy: { TVar: x5 8 } = { TVar: x4 8 } }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 4 } }',
+        '{ EBinOp: { TVar: x7 8 } = and { TVar: x0 8 } { TVar: x6 8 } }',
+        '{ ECopy: { TVar: x8 8 } = { TVar: x7 8 } }',
+        '{ EBinOp: { TVar: x9 8 } = sub { TVar: x0 8 } { TVar: x1 8 } }',
+        '{ EBinOp: { TVar: x10 8 } = sub { TVar: x1 8 } { TVar: x0 8 } }'
+    ]],
+    # a value is lost when its operands or its holder change, and at a label
+    ["""
+pro kill x0 x1
+    x2 = not x0
+    x0 = 1
+    x3 = not x0
+    x4 = add x1 1
+    x4 = add x1 1
+    x1 = 2
+    x5 = add x1 1
+    @next
+    x6 = add x1 1
+    ret x6
+""", [
+        '{ EUnOp: { TVar: x2 8 } = not { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x0 8 } = { TInt: 1 } }',
+        '{ EUnOp: { TVar: x3 8 } = not { TVar: x0 8 } }',
+        '{ EBinOp: { TVar: x4 8 } = add { TVar: x1 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x1 8 } = { TInt: 2 } }',
+        '{ EBinOp: { TVar: x5 8 } = add { TVar: x1 8 } { TInt: 1 } }',
+        '{ ELabel: @next }',
+        '{ EBinOp: { TVar: x6 8 } = add { TVar: x1 8 } { TInt: 1 } }'
+    ]],
+    # a repeated load is a copy until a store or a call, which may change any address
+    ["""
+pro loads x0 x1
+    x2 = [x0]
+    x3 = [x0]
+    [x1] = x2
+    x4 = [x0]
+    x5 = [x0]
+    x6 = p x0
+    x7 = [x0]
+    ret x7
+""", [
+        '{ ECopy: { TVar: x2 8 } = { TPointer: x0 } }',
+        '{ ECopy: { TVar: x3 8 } = { TVar: x2 8 } }',
+        '{ ECopy: { TPointer: x1 } = { TVar: x2 8 } }',
+        '{ ECopy: { TVar: x4 8 } = { TPointer: x0 } }',
+        '{ ECopy: { TVar: x5 8 } = { TVar: x4 8 } }',
+        '{ EProCall: { TVar: x6 8 } = p { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x7 8 } = { TPointer: x0 } }'
+    ]],
+    # narrow reads are told apart from full ones and narrow results are not numbered
+    ["""
+pro narrow x0
+    x1 = add x0 1
+    x2 = add x0b 1
+    x3b = add x0 1
+    x4b = add x0 1
+    ret x4
+""", [
+        '{ EBinOp: { TVar: x1 8 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x2 8 } = add { TVar: x0 1 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x3 1 } = add { TVar: x0 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x4 1 } = add { TVar: x0 8 } { TInt: 1 } }'
+    ]]
+]
+
+def runNumberingTests():
+    for s in numberingTestSets:
+        if not hlp.areValuesEqual(getNumberedLines(s[0]), s[1]):
+            return False
+
+    pro = hlp.getSourcePro(numberingTestSets[1][0].replace('    x4 = add x1 1\n    x4 = add x1 1\n', ''))
+    if lvn.getValueNumberedPro(pro) is not pro:
+        print('procedure without redundant statements must be left unchanged')
+        return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runNumberingTests()
+
+    if allPass:
+        print('all value numbering tests passed')
+    else:
+        print('at least one value numbering test failed')
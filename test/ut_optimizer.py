@@ -0,0 +1,63 @@
+import lib.assembly_map as asm
+import lib.optimizer as opt
+import lib.gen_code as gen
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+SOURCE_FOLD = """
+pro fold x0
+    x1 = 6
+    x2 = mul x1 7
+    x3 = add x0 x2
+    ret x3
+"""
+
+#
+# level tests
+#
+
+def runLevelTests():
+    exps = hlp.getSourcePros(SOURCE_FOLD)
+
+    if opt.getOptimizedExpressions(exps, 0, hlp.REGISTER_COUNT) is not exps:
+        print('level 0 must leave the expressions as they are')
+        return False
+
+    folded = opt.getOptimizedPro(exps[0], ['fold'], hlp.REGISTER_COUNT)
+    if not hlp.areValuesEqual(folded.expressions[1].toString(), '{ ECopy: { TVar: x2 8 } = { TInt: 42 } }'):
+        return False
+
+    optimized = list(opt.getOptimizedExpressions(exps, 1, hlp.REGISTER_COUNT))
+    if not hlp.areValuesEqual([exp.toString() for exp in optimized[0].expressions], ['{ EBinOp: { TVar: x3 8 } = add { TVar: x0 8 } { TInt: 42 } }']):
+        return False
+
+    try:
+        opt.getOptimizedExpressions(exps, len(opt.OPTIMIZATION_LEVELS), hlp.REGISTER_COUNT)
+    except Exception as ex:
+        return hlp.areValuesEqual(str(ex), 'optimization level not supported')
+
+    print('expected error: optimization level not supported')
+    return False
+
+def runCodeTests():
+    asmap = asm.GasIntelX8664SystemVMap()
+    code = gen.generateCodeLinesFromText(SOURCE_FOLD, asmap, 1)
+
+    return hlp.areValuesEqual([line for line in code if line.startswith('imul')], [])
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runLevelTests()
+    allPass = allPass and runCodeTests()
+
+    if allPass:
+        print('all optimizer tests passed')
+    else:
+        print('at least one optimizer test failed')
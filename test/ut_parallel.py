@@ -0,0 +1,135 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.parallel as pll
+import test.ut_component_vars as vars
+
+#
+# test helpers
+#
+
+def getSerialExpressions(text):
+    try:
+        return par.getExpressions(lex.getTokens(text)), None
+    except Exception as ex:
+        return [], str(ex)
+
+def getChunkedExpressions(text, count):
+    chunks = pll.getChunks(text, count, 0)
+
+    if ''.join(chunks) != text:
+        return None, 'chunks do not cover the text'
+
+    results = [pll.getChunkResult(c) for c in chunks]
+
+    try:
+        return pll.getMergedExpressions(chunks, results), None
+    except Exception as ex:
+        return [], str(ex)
+
+def areResultsEqual(generated, expected):
+    generatedStrings = [e.toString() for e in generated[0]]
+    expectedStrings = [e.toString() for e in expected[0]]
+
+    if generatedStrings != expectedStrings or generated[1] != expected[1]:
+        print('test failed\n')
+        print('generated:')
+        print('\n'.join(generatedStrings))
+        print('error: ' + str(generated[1]))
+        print('\nexpected:')
+        print('\n'.join(expectedStrings))
+        print('error: ' + str(expected[1]))
+        print('')
+        return False
+
+    return True
+
+#
+# chunk test variables and functions
+#
+
+SOURCE_ALL = vars.SOURCE_2 + vars.SOURCE_0 + vars.SOURCE_1 + vars.SOURCE_3
+
+chunkTestSets = [
+    SOURCE_ALL,
+    # a string that holds a block start must not split its memory block
+    'mem ar {"a\npro b\n"}\n' + vars.SOURCE_0,
+    # a broken block reports the same error as a serial parse
+    vars.SOURCE_0 + 'pro broken x0\n    x0 =\n    ret x0\n' + vars.SOURCE_1,
+    # a chunk ending in a procedure without a return is parsed with the next one
+    vars.SOURCE_0 + 'pro open x0\n    x0 = 1\n' + vars.SOURCE_1,
+    # and so is one ending in a memory collection without a closing bracket
+    vars.SOURCE_0 + 'mem ar {1 2\n' + vars.SOURCE_1,
+    ''
+]
+
+def runChunkTests():
+    for text in chunkTestSets:
+        expected = getSerialExpressions(text)
+
+        for count in [1, 2, 3, 16]:
+            if not areResultsEqual(getChunkedExpressions(text, count), expected):
+                return False
+
+    return True
+
+def runBlockStartTests():
+    starts = pll.getBlockStarts(SOURCE_ALL)
+    expected = [i for i in range(len(SOURCE_ALL)) if SOURCE_ALL.startswith('\npro ', i - 1) or SOURCE_ALL.startswith('\nmem ', i - 1)]
+
+    if starts != expected:
+        print('test failed\n')
+        print('generated block starts: ' + str(starts))
+        print('expected block starts: ' + str(expected) + '\n')
+        return False
+
+    return True
+
+def runPoolTests():
+    text = ''.join(vars.SOURCE_0.replace('inc', 'inc' + str(i)) for i in range(2000))
+    expected = getSerialExpressions(text)
+    generated = pll.getExpressionsFromText(text, 2)
+
+    return areResultsEqual([generated, None], expected)
+
+def getPoolResult(text, jobs):
+    try:
+        return pll.getExpressionsFromText(text, jobs), None
+    except Exception as ex:
+        return [], str(ex)
+
+# the return of the last procedure in the first chunk is dropped, so the split the pool
+# parses on lands right after a procedure without a return
+def runPoolErrorTests():
+    text = ''.join(vars.SOURCE_0.replace('inc', 'inc' + str(i)) for i in range(4000))
+    first = pll.getChunks(text, 2 * pll.CHUNKS_PER_JOB)[0]
+    end = '    ret x0\n\n'
+    text = first[:-len(end)] + '\n' + text[len(first):]
+
+    if not pll.getChunks(text, 2 * pll.CHUNKS_PER_JOB)[0].endswith('x0 = add x0 1\n\n'):
+        print('test failed\n')
+        print('the first chunk must end in the procedure without a return\n')
+        return False
+
+    expected = getSerialExpressions(text)
+    if expected[1] is None:
+        print('test failed\n')
+        print('a procedure without a return must be an error\n')
+        return False
+
+    return areResultsEqual(getPoolResult(text, 2), expected)
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runBlockStartTests()
+    allPass = allPass and runChunkTests()
+    allPass = allPass and runPoolTests()
+    allPass = allPass and runPoolErrorTests()
+
+    if allPass:
+        print('all parallel parse tests passed')
+    else:
+        print('at least one parallel parse test failed')
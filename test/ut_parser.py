@@ -149,7 +149,6 @@ groupTestSets = [
             lex.TAssign(gram.ASSIGN),
             lex.TInt(gram.INT, '1')
         ],
-        par.getECopy,
         par.ECopy(
             lex.TVar('x1', 8),
             lex.TInt(gram.INT, '1')
@@ -162,7 +161,6 @@ groupTestSets = [
             lex.TUnOp(gram.NOT),
             lex.TVar('x0', 8)
         ],
-        par.getEUnOp,
         par.EUnOp(
             lex.TVar('x1', 8),
             gram.NOT,
@@ -177,7 +175,6 @@ groupTestSets = [
             lex.TVar('x0', 8),
             lex.TVar('x1', 8)
         ],
-        par.getEBinOp,
         par.EBinOp(
             lex.TVar('x2', 8),
             gram.AND,
@@ -194,7 +191,6 @@ groupTestSets = [
             lex.TInt(gram.INT, '0'),
             lex.TInt(gram.INT, '1')
         ],
-        par.getEProCall,
         par.EProCall(
             lex.TVar('x1', 8),
             'fib',
@@ -209,8 +205,8 @@ groupTestSets = [
 
 def runGroupTests():
     for g in groupTestSets:
-        generated = g[1](g[0])
-        expected = g[2]
+        _, generated = par.getEAssignment(0, g[0], len(g[0]))
+        expected = g[1]
 
         if (not areExpressionStringsEqual(generated.toString(), expected.toString())):
             return False
@@ -230,11 +226,10 @@ pointerTestSets = [
             lex.TAssign(gram.ASSIGN),
             lex.TVar('x1', 8)
         ],
-        [
+        par.ECopy(
             lex.TPointer('x0'),
-            lex.TAssign(gram.ASSIGN),
             lex.TVar('x1', 8)
-        ]
+        )
     ],
     [
         [
@@ -244,24 +239,56 @@ pointerTestSets = [
             lex.TVar('x0', 8),
             lex.TPointRightB(gram.POINT_RIGHT_BRACKET)
         ],
-        [
+        par.ECopy(
             lex.TVar('x1', 8),
-            lex.TAssign(gram.ASSIGN),
             lex.TPointer('x0')
-        ]
+        )
     ]
 ]
 
 def runPointerTests():
     for p in pointerTestSets:
-        generated = par.getParsedPointerGroup(p[0])
+        _, generated = par.getEAssignment(0, p[0], len(p[0]))
         expected = p[1]
 
-        if (not areListsOfExpressionsEqual(generated, expected)):
+        if (not areExpressionStringsEqual(generated.toString(), expected.toString())):
             return False
         
     return True
 
+assignmentErrorTestSets = [
+    ['x0 = x1 x2', 'assignment must be followed by separator'],
+    ['x0 = add x1 2 3', 'assignment must be followed by separator'],
+    ['x0 = add x1', 'invalid number of tokens for assignment'],
+    ['x0 = [] ', 'pointer reference must not be blank'],
+    ['x0 = [1]', 'pointer reference must be variable'],
+    ['x0 = [x1', 'pointer must be closed'],
+    ['x0 = [x1 x2]', 'pointer must not have more than one token'],
+    ['x0 x1', 'second token must be assignment'],
+    ['x0 =', 'invalid number of tokens for assignment'],
+    ['[x0] = not x1', 'first token must be variable or memory pointer in unary operation']
+]
+
+def runAssignmentErrorTests():
+    for s in assignmentErrorTestSets:
+        tokens = lex.getTokens(s[0])
+
+        try:
+            par.getEAssignment(0, tokens, len(tokens))
+        except Exception as ex:
+            if str(ex) != s[1]:
+                print('test failed: ' + s[0])
+                print('generated error: ' + str(ex))
+                print('expected error: ' + s[1] + '\n')
+                return False
+            continue
+
+        print('test failed: ' + s[0])
+        print('expected error: ' + s[1] + '\n')
+        return False
+
+    return True
+
 #
 # assignment test variables and functions
 #
@@ -714,6 +741,97 @@ def runExpressionTests():
         
     return True
 
+def runStreamExpressionTests():
+    for s in expressionTestSets:
+        generated = par.getExpressionsFromStream(iter(s[0]))
+        expected = s[1]
+
+        if (not areListsOfExpressionsEqual(generated, expected)):
+            return False
+        
+    return True
+
+streamErrorTestSets = [
+    # a procedure without a return runs into the next block
+    vars.SOURCE_0 + 'pro open x0\n    x0 = 1\n' + vars.SOURCE_1,
+    # the error is raised at the first invalid block and later blocks are never parsed
+    vars.SOURCE_0 + 'pro broken x0\n    x0 =\n    ret x0\n' + vars.SOURCE_1 + 'pro open x0\n'
+]
+
+def getStreamError(source):
+    # the blocks before the invalid one are still produced
+    stream = par.getExpressionStream(iter(lex.getTokens(source)))
+    count = 0
+
+    try:
+        for exp in stream:
+            count += 1
+    except Exception as ex:
+        return count, str(ex)
+
+    return count, None
+
+def runStreamErrorTests():
+    valid = len(par.getExpressions(lex.getTokens(vars.SOURCE_0)))
+
+    for source in streamErrorTestSets:
+        try:
+            par.getExpressions(lex.getTokens(source))
+            expected = None
+        except Exception as ex:
+            expected = str(ex)
+
+        generated = getStreamError(source)
+        if generated != (valid, expected) or expected is None:
+            print('test failed\n')
+            print('generated: ' + str(generated))
+            print('expected: ' + str((valid, expected)) + '\n')
+            return False
+
+    return True
+
+kindMaskTestSets = [
+    [lex.TInt(gram.INT, '1'), par.INTEGER_MASK, True],
+    [lex.TChar(gram.CHAR, "'a'"), par.INTEGER_MASK, True],
+    [lex.TVar('x0', 8), par.INTEGER_MASK, True],
+    [lex.TIdentifier('ar'), par.INTEGER_MASK, False],
+    [lex.TString(gram.STRING, '"ab"'), par.LITERAL_MASK, True],
+    [lex.TVar('x0', 8), par.LITERAL_MASK, False],
+    [lex.TPointer('x0'), par.COPY_DEST_MASK, True],
+    [lex.TLabel('@top'), par.COPY_SOURCE_MASK, False]
+]
+
+def runKindMaskTests():
+    for s in kindMaskTestSets:
+        if par.isValidTokenInKindMask(s[0], s[1]) != s[2]:
+            return False
+
+    return True
+
+useDefTestSets = [
+    [par.ECopy(lex.TVar('x0', 8), lex.TVar('x1', 8)), {'x1'}, {'x0'}],
+    [par.ECopy(lex.TPointer('x0'), lex.TVar('x1', 8)), {'x0', 'x1'}, set()],
+    [par.ECopy(lex.TVar('x0', 8), lex.TPointer('x1b')), {'x1'}, {'x0'}],
+    [par.ECopy(lex.TVar('x0', 8), lex.TIdentifier('ar')), set(), {'x0'}],
+    [par.EUnOp(lex.TVar('x0', 1), gram.NOT, lex.TVar('x1', 1)), {'x0', 'x1'}, {'x0'}],
+    [par.EBinOp(lex.TVar('x0', 8), gram.ADD, lex.TVar('x0', 8), lex.TInt(gram.INT, '1')), {'x0'}, {'x0'}],
+    [par.ECoJump(gram.JIE, lex.TVar('x2', 4), lex.TVar('x3', 8), '@end'), {'x2', 'x3'}, set()],
+    [par.EProCall(lex.TVar('x2', 8), '!x0', [lex.TVar('x1', 8), lex.TInt(gram.INT, '1')]), {'x0', 'x1'}, {'x2'}],
+    [par.EJump(gram.JUMP, '@end'), set(), set()],
+    [par.ELabel('@end'), set(), set()]
+]
+
+def runUseDefTests():
+    for s in useDefTestSets:
+        exp = s[0]
+        if exp.uses != s[1] or exp.defs != s[2]:
+            print('test failed: ' + exp.toString())
+            print('generated uses: ' + str(sorted(exp.uses)) + ' defs: ' + str(sorted(exp.defs)))
+            print('expected uses: ' + str(sorted(s[1])) + ' defs: ' + str(sorted(s[2])) + '\n')
+            return False
+
+    return True
+
 #
 # Run All Tests
 #
@@ -723,6 +841,7 @@ def runAllTests():
     allPass = allPass and runBasicTests()
     allPass = allPass and runGroupTests()
     allPass = allPass and runPointerTests()
+    allPass = allPass and runAssignmentErrorTests()
     allPass = allPass and runAssignmentByOpTests()
     allPass = allPass and runProFirstLineTests()
     allPass = allPass and runProLastLineTests()
@@ -731,6 +850,10 @@ def runAllTests():
     allPass = allPass and runMemSizeTests()
     allPass = allPass and runMemTests()
     allPass = allPass and runExpressionTests()
+    allPass = allPass and runStreamExpressionTests()
+    allPass = allPass and runStreamErrorTests()
+    allPass = allPass and runKindMaskTests()
+    allPass = allPass and runUseDefTests()
 
     if allPass:
         print('all parser tests passed')
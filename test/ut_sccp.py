@@ -0,0 +1,167 @@
+import lib.sccp as sccp
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+def getPropagatedLines(pro):
+    pro = sccp.getPropagatedPro(pro)
+    return [exp.toString() for exp in pro.expressions] + ['ret ' + pro.ret.toString()]
+
+#
+# propagation tests
+#
+
+SOURCE_FLAGS = """
+pro flags x0
+    x1 = 1
+    x2 = 0
+    @top
+    jie x1 0 @skip
+    x2 = add x2 x0
+    @skip
+    x3 = mul x1 10
+    jige x2 x3 @done
+    x1 = 1
+    jump @top
+    @done
+    jin x1 1 @dead
+    jump @end
+    @dead
+    x2 = 99
+    @end
+    ret x2
+"""
+
+SOURCE_MERGE = """
+pro merge x0
+    jil x0 0 @neg
+    x1 = 4
+    x2 = 2
+    jump @join
+    @neg
+    x1 = 4
+    x2 = 3
+    @join
+    x3 = add x1 x2
+    jig x1 3 @big
+    x3 = 0
+    @big
+    ret x1
+"""
+
+SOURCE_LOOP = """
+pro loop x0
+    x1 = 0
+    x2 = 7
+    @top
+    jige x1 x0 @done
+    x2 = mul x2 1
+    x1 = add x1 1
+    jump @top
+    @done
+    ret x2
+"""
+
+propagationTestSets = [
+    # fixed flags decide the branches and the block behind the dead one is removed
+    [SOURCE_FLAGS, [
+        '{ ECopy: { TVar: x4 8 } = { TInt: 1 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x7 8 } = { TInt: 0 } }',
+        '{ ELabel: @top }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 1 } }',
+        '{ EBinOp: { TVar: x8 8 } = add { TVar: x7 8 } { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x9 8 } = { TVar: x8 8 } }',
+        '{ ECopy: { TVar: x10 8 } = { TInt: 10 } }',
+        '{ ECoJump: jige { TVar: x9 8 } { TInt: 10 } @done }',
+        '{ ECopy: { TVar: x13 8 } = { TInt: 1 } }',
+        '{ ECopy: { TVar: x7 8 } = { TVar: x9 8 } }',
+        '{ EJump: jump @top }',
+        '{ ELabel: @done }',
+        '{ ECopy: { TVar: x12 8 } = { TVar: x9 8 } }',
+        '{ EJump: jump @end }',
+        '{ ELabel: @end }',
+        'ret { TVar: x12 8 }'
+    ]],
+    # both paths agree on x1, so the phi is a constant and the branch on it is decided
+    [SOURCE_MERGE, [
+        '{ ECoJump: jil { TVar: x0 8 } { TInt: 0 } @neg }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 4 } }',
+        '{ ECopy: { TVar: x7 8 } = { TInt: 2 } }',
+        '{ ECopy: { TVar: x9 8 } = { TInt: 2 } }',
+        '{ EJump: jump @join }',
+        '{ ELabel: @neg }',
+        '{ ECopy: { TVar: x4 8 } = { TInt: 4 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 3 } }',
+        '{ ECopy: { TVar: x9 8 } = { TInt: 3 } }',
+        '{ ELabel: @join }',
+        '{ ECopy: { TVar: x8 8 } = { TInt: 4 } }',
+        '{ EBinOp: { TVar: x10 8 } = add { TVar: x9 8 } { TInt: 4 } }',
+        '{ EJump: jump @big }',
+        '{ ELabel: @big }',
+        'ret { TInt: 4 }'
+    ]],
+    # a value that stays the same around a loop is still known after it
+    [SOURCE_LOOP, [
+        '{ ECopy: { TVar: x3 8 } = { TInt: 0 } }',
+        '{ ECopy: { TVar: x4 8 } = { TInt: 7 } }',
+        '{ ECopy: { TVar: x5 8 } = { TInt: 0 } }',
+        '{ ELabel: @top }',
+        '{ ECopy: { TVar: x6 8 } = { TInt: 7 } }',
+        '{ ECoJump: jige { TVar: x5 8 } { TVar: x0 8 } @done }',
+        '{ ECopy: { TVar: x7 8 } = { TInt: 7 } }',
+        '{ EBinOp: { TVar: x8 8 } = add { TVar: x5 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x5 8 } = { TVar: x8 8 } }',
+        '{ EJump: jump @top }',
+        '{ ELabel: @done }',
+        'ret { TInt: 7 }'
+    ]]
+]
+
+def runPropagationTests():
+    for s in propagationTestSets:
+        if not hlp.areValuesEqual(getPropagatedLines(hlp.getSourcePro(s[0])), s[1]):
+            return False
+
+    return True
+
+SOURCE_NARROW = """
+pro narrow x0
+    x1 = 1
+    x1b = 2
+    jie x1 1 @one
+    x0 = 0
+    @one
+    ret x0
+"""
+
+# without a constant to put in the procedure is left as it is, and procedures with narrow
+# writes are not in ssa form
+def runUnchangedTests():
+    for source in [SOURCE_NARROW, """
+pro plain x0 x1
+    x2 = add x0 x1
+    ret x2
+"""]:
+        pro = hlp.getSourcePro(source)
+        if sccp.getPropagatedPro(pro) is not pro:
+            print('procedure must be left unchanged')
+            return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runPropagationTests()
+    allPass = allPass and runUnchangedTests()
+
+    if allPass:
+        print('all sccp tests passed')
+    else:
+        print('at least one sccp test failed')
@@ -48,7 +48,7 @@ def runTest(testSet):
     allRegs = testSet[0]
     pro = testSet[1]
 
-    generatedMap = sar.getAssignmentDict(allRegs, pro, 2, lex.TVar)
+    generatedMap = sar.getAssignmentDict(allRegs, pro, 2)
     expectedMap = testSet[2][0]
 
     return areMapsEqual(generatedMap, expectedMap)
@@ -142,6 +142,94 @@ PRO_FUN_POINTER_0 = par.EPro(
     lex.TVar('x4', 8)
 )
 
+# the variable holding the called procedure stays live until the call
+PRO_FUN_CALL_0 = par.EPro(
+    'fun',
+    [],
+    [
+        par.ECopy(
+            lex.TVar('x1', 8), lex.TIdentifier('inc')
+        ),
+        par.ECopy(
+            lex.TVar('x2', 8), lex.TInt(gram.INT, '1')
+        ),
+        par.EProCall(
+            lex.TVar('x3', 8), '!x1', [lex.TVar('x2', 8)]
+        )
+    ],
+    lex.TVar('x3', 8)
+)
+
+# x0 is read once in the loop test but stays live around the back edge
+PRO_FUN_LOOP_0 = par.EPro(
+    'fun',
+    [
+        lex.TVar('x0', 8)
+    ],
+    [
+        par.ECopy(
+            lex.TVar('x1', 8), lex.TInt(gram.INT, '0')
+        ),
+        par.ECopy(
+            lex.TVar('x2', 8), lex.TInt(gram.INT, '1')
+        ),
+        par.ELabel('@top'),
+        par.ECoJump(
+            gram.JIGE, lex.TVar('x1', 8), lex.TVar('x0', 8), '@end'
+        ),
+        par.EBinOp(
+            lex.TVar('x3', 8), gram.ADD,
+            lex.TVar('x1', 8), lex.TVar('x2', 8)
+        ),
+        par.ECopy(
+            lex.TVar('x1', 8), lex.TVar('x3', 8)
+        ),
+        par.EJump(gram.JUMP, '@top'),
+        par.ELabel('@end')
+    ],
+    lex.TVar('x1', 8)
+)
+
+# the copy leaves x0 dead, so x1 can take its register
+PRO_FUN_COPY_0 = par.EPro(
+    'fun',
+    [
+        lex.TVar('x0', 8)
+    ],
+    [
+        par.ECopy(
+            lex.TVar('x1', 8), lex.TVar('x0', 8)
+        ),
+        par.EBinOp(
+            lex.TVar('x2', 8), gram.ADD,
+            lex.TVar('x1', 8), lex.TInt(gram.INT, '1')
+        )
+    ],
+    lex.TVar('x2', 8)
+)
+
+# x0 changes while the copy of it is still live, so the two need their own registers
+PRO_FUN_COPY_1 = par.EPro(
+    'fun',
+    [
+        lex.TVar('x0', 8)
+    ],
+    [
+        par.ECopy(
+            lex.TVar('x1', 8), lex.TVar('x0', 8)
+        ),
+        par.EBinOp(
+            lex.TVar('x0', 8), gram.ADD,
+            lex.TVar('x0', 8), lex.TInt(gram.INT, '1')
+        ),
+        par.EBinOp(
+            lex.TVar('x2', 8), gram.ADD,
+            lex.TVar('x1', 8), lex.TVar('x0', 8)
+        )
+    ],
+    lex.TVar('x2', 8)
+)
+
 simpleTestSets = [
     [
         [
@@ -153,9 +241,9 @@ simpleTestSets = [
                 'x0': 'r1',
                 'x1': 'r2',
                 'x2': 'spill',
-                'x3': 'r1',
-                'x4': 'r2',
-                'x5': 'r1',
+                'x3': 'r2',
+                'x4': 'spill',
+                'x5': 'r2',
                 'x6': 'spill'
             },
             {}
@@ -187,9 +275,9 @@ simpleTestSets = [
                 'x0': 'r1',
                 'x1': 'spill',
                 'x2': 'spill',
-                'x3': 'r1',
+                'x3': 'spill',
                 'x4': 'spill',
-                'x5': 'r1',
+                'x5': 'spill',
                 'x6': 'spill'
             },
             {}
@@ -205,9 +293,9 @@ simpleTestSets = [
                 'x0': 'r1',
                 'x1': 'r2',
                 'x2': 'r3',
-                'x3': 'r1',
-                'x4': 'r2',
-                'x5': 'r1',
+                'x3': 'r2',
+                'x4': 'spill',
+                'x5': 'r2',
                 'x6': 'r3'
             },
             {}
@@ -244,6 +332,78 @@ simpleTestSets = [
             },
             {}
         ]
+    ],
+    [
+        [
+            'r1', 'r2'
+        ],
+        PRO_FUN_CALL_0,
+        [
+            {
+                'x1': 'r1',
+                'x2': 'r2',
+                'x3': 'spill'
+            },
+            {}
+        ]
+    ],
+    [
+        [
+            'r1', 'r2'
+        ],
+        PRO_FUN_LOOP_0,
+        [
+            {
+                'x0': 'r1',
+                'x1': 'r2',
+                'x2': 'spill',
+                'x3': 'r2'
+            },
+            {}
+        ]
+    ],
+    [
+        [
+            'r1', 'r2', 'r3'
+        ],
+        PRO_FUN_LOOP_0,
+        [
+            {
+                'x0': 'r1',
+                'x1': 'r2',
+                'x2': 'r3',
+                'x3': 'r2'
+            },
+            {}
+        ]
+    ],
+    [
+        [
+            'r1', 'r2', 'r3'
+        ],
+        PRO_FUN_COPY_0,
+        [
+            {
+                'x0': 'r1',
+                'x1': 'r1',
+                'x2': 'r2'
+            },
+            {}
+        ]
+    ],
+    [
+        [
+            'r1', 'r2', 'r3'
+        ],
+        PRO_FUN_COPY_1,
+        [
+            {
+                'x0': 'r1',
+                'x1': 'r2',
+                'x2': 'r3'
+            },
+            {}
+        ]
     ]
 ]
 
@@ -0,0 +1,159 @@
+import lib.lexer as lex
+import lib.ssa as ssa
+import test.ut_component_vars as vars
+import test.ut_cfg as graphs
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+#
+# construction tests
+#
+
+constructionTestSets = [
+    [
+        vars.SOURCE_1,
+        'ssa addOne { TVar: x0 8 } { TVar: x1 8 }\n' +
+        '\tblock 0 [] -> [1]\n' +
+        '\tblock 1 [0 2] -> [2 3]\n' +
+        '\t\t{ EPhi: { TVar: x2 8 } = { TVar: x0 8 } { TVar: x5 8 } }\n' +
+        '\t\t{ EPhi: { TVar: x3 8 } = { TVar: x1 8 } { TVar: x4 8 } }\n' +
+        '\t\t{ ELabel: @top }\n' +
+        '\t\t{ ECoJump: jile { TVar: x2 8 } { TInt: 0 } @end }\n' +
+        '\tblock 2 [1] -> [1]\n' +
+        '\t\t{ EBinOp: { TVar: x4 8 } = add { TVar: x3 8 } { TInt: 1 } }\n' +
+        '\t\t{ EBinOp: { TVar: x5 8 } = sub { TVar: x2 8 } { TInt: 1 } }\n' +
+        '\t\t{ EJump: jump @top }\n' +
+        '\tblock 3 [1] -> []\n' +
+        '\t\t{ ELabel: @end }\n' +
+        '\tret { TVar: x3 8 }\n'
+    ],
+    [
+        graphs.SOURCE_UNREACHABLE,
+        'ssa unreachable { TVar: x0 8 }\n' +
+        '\tblock 0 [] -> [1]\n' +
+        '\t\t{ EJump: jump @end }\n' +
+        '\tblock 1 [0] -> []\n' +
+        '\t\t{ ELabel: @end }\n' +
+        '\tret { TVar: x0 8 }\n'
+    ]
+]
+
+def runConstructionTests():
+    for s in constructionTestSets:
+        if not hlp.areStringsEqual(ssa.getSsaPro(hlp.getSourcePro(s[0])).toString(), s[1]):
+            return False
+
+    return True
+
+# phis are only placed for variables live where the paths join
+SOURCE_PRUNED = """
+pro pruned x0
+    jie x0 0 @zero
+    x1 = 1
+    x2 = 1
+    jump @join
+    @zero
+    x1 = 2
+    x2 = 2
+    @join
+    ret x1
+"""
+
+def runPruningTests():
+    form = ssa.getSsaPro(hlp.getSourcePro(SOURCE_PRUNED))
+    join = form.cfg.labels['@join']
+
+    if len(form.phis[join]) != 1 or form.phis[join][0].args[0].name == form.phis[join][0].args[1].name:
+        print('unexpected phis: ' + form.toString())
+        return False
+
+    if ssa.getSsaPro(hlp.getSourcePro(graphs.SOURCE_NESTED.replace('x2 = add x2 1', 'x2b = add x2 1'))) is not None:
+        print('narrow definitions must be left out of ssa form')
+        return False
+
+    return True
+
+#
+# destruction tests
+#
+
+destructionTestSets = [
+    [
+        vars.SOURCE_1,
+        'pro addOne { TVar: x0 8 } { TVar: x1 8 }\n' +
+        '\tisLeaf: True\n' +
+        '\tusesInt: True\n' +
+        '\t{ ECopy: { TVar: x2 8 } = { TVar: x0 8 } }\n' +
+        '\t{ ECopy: { TVar: x3 8 } = { TVar: x1 8 } }\n' +
+        '\t{ ELabel: @top }\n' +
+        '\t{ ECoJump: jile { TVar: x2 8 } { TInt: 0 } @end }\n' +
+        '\t{ EBinOp: { TVar: x4 8 } = add { TVar: x3 8 } { TInt: 1 } }\n' +
+        '\t{ EBinOp: { TVar: x5 8 } = sub { TVar: x2 8 } { TInt: 1 } }\n' +
+        '\t{ ECopy: { TVar: x2 8 } = { TVar: x5 8 } }\n' +
+        '\t{ ECopy: { TVar: x3 8 } = { TVar: x4 8 } }\n' +
+        '\t{ EJump: jump @top }\n' +
+        '\t{ ELabel: @end }\n' +
+        '\tret { TVar: x3 8 }\n'
+    ],
+    # the loop exit edge leaves a conditional jump for a block with phis, so it is split
+    [
+        """
+pro count x0
+    x1 = 0
+    @top
+    x1 = add x1 1
+    jil x1 x0 @top
+    ret x1
+""",
+        'pro count { TVar: x0 8 }\n' +
+        '\tisLeaf: True\n' +
+        '\tusesInt: True\n' +
+        '\t{ ECopy: { TVar: x2 8 } = { TInt: 0 } }\n' +
+        '\t{ ECopy: { TVar: x3 8 } = { TVar: x2 8 } }\n' +
+        '\t{ ELabel: @top }\n' +
+        '\t{ EBinOp: { TVar: x4 8 } = add { TVar: x3 8 } { TInt: 1 } }\n' +
+        '\t{ ECoJump: jil { TVar: x4 8 } { TVar: x0 8 } @ssa0 }\n' +
+        '\t{ EJump: jump @ssa1 }\n' +
+        '\t{ ELabel: @ssa0 }\n' +
+        '\t{ ECopy: { TVar: x3 8 } = { TVar: x4 8 } }\n' +
+        '\t{ EJump: jump @top }\n' +
+        '\t{ ELabel: @ssa1 }\n' +
+        '\tret { TVar: x4 8 }\n'
+    ]
+]
+
+def runDestructionTests():
+    for s in destructionTestSets:
+        if not hlp.areStringsEqual(ssa.getSsaRoundTrip(hlp.getSourcePro(s[0])).toString(), s[1]):
+            return False
+
+    return True
+
+def runParallelCopyTests():
+    form = ssa.getSsaPro(hlp.getSourcePro(vars.SOURCE_1))
+    a = lex.TVar('x0', 8)
+    b = lex.TVar('x1', 8)
+    copies = ssa.getSequentialCopies(form, [(a, b), (b, a), (lex.TVar('x2', 8), a)])
+    generated = ' '.join([c.dest.name + '=' + c.source.name for c in copies])
+
+    # the reader of x0 goes first, then the swap is broken with a fresh variable
+    return hlp.areStringsEqual(generated, 'x2=x0 x6=x0 x0=x1 x1=x6')
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runConstructionTests()
+    allPass = allPass and runPruningTests()
+    allPass = allPass and runDestructionTests()
+    allPass = allPass and runParallelCopyTests()
+
+    if allPass:
+        print('all ssa tests passed')
+    else:
+        print('at least one ssa test failed')
@@ -0,0 +1,162 @@
+import lib.tail_calls as tails
+import test.ut_component_helpers as hlp
+
+#
+# test helpers
+#
+
+#
+# looping tests
+#
+
+loopingTestSets = [
+    # the parameters take the arguments and the procedure starts over
+    ["""
+pro gcd x0 x1
+    x2 = x0
+    jie x1 0 @done
+    x3 = mod x0 x1
+    x2 = gcd x1 x3
+    @done
+    ret x2
+""", [
+        '{ ELabel: @tail0 }',
+        '{ ECopy: { TVar: x2 8 } = { TVar: x0 8 } }',
+        '{ ECoJump: jie { TVar: x1 8 } { TInt: 0 } @done }',
+        '{ EBinOp: { TVar: x3 8 } = mod { TVar: x0 8 } { TVar: x1 8 } }',
+        '{ ECopy: { TVar: x0 8 } = { TVar: x1 8 } }',
+        '{ ECopy: { TVar: x1 8 } = { TVar: x3 8 } }',
+        '{ EJump: jump @tail0 }',
+        '{ ELabel: @done }',
+        '{ TVar: x2 8 }'
+    ]],
+    # parameters trading places go through a fresh variable, one passed as it is stays
+    ["""
+pro swap x0 x1 x2
+    jie x2 0 @done
+    x2 = sub x2 1
+    x0 = swap x1 x0 x2
+    @done
+    ret x0
+""", [
+        '{ ELabel: @tail0 }',
+        '{ ECoJump: jie { TVar: x2 8 } { TInt: 0 } @done }',
+        '{ EBinOp: { TVar: x2 8 } = sub { TVar: x2 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x3 8 } = { TVar: x0 8 } }',
+        '{ ECopy: { TVar: x0 8 } = { TVar: x1 8 } }',
+        '{ ECopy: { TVar: x1 8 } = { TVar: x3 8 } }',
+        '{ EJump: jump @tail0 }',
+        '{ ELabel: @done }',
+        '{ TVar: x0 8 }'
+    ]],
+    # a call jumping to the return is in tail position too, the jump and its label go
+    ["""
+pro count x0 x1
+    jie x0 0 @base
+    x0 = sub x0 1
+    x1 = add x1 1
+    x2 = count x0 x1
+    jump @end
+    @base
+    x2 = x1
+    @end
+    ret x2
+""", [
+        '{ ELabel: @tail0 }',
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @base }',
+        '{ EBinOp: { TVar: x0 8 } = sub { TVar: x0 8 } { TInt: 1 } }',
+        '{ EBinOp: { TVar: x1 8 } = add { TVar: x1 8 } { TInt: 1 } }',
+        '{ EJump: jump @tail0 }',
+        '{ ELabel: @base }',
+        '{ ECopy: { TVar: x2 8 } = { TVar: x1 8 } }',
+        '{ TVar: x2 8 }'
+    ]],
+    # the result may go through copies on its way to the return
+    ["""
+pro down x0
+    x1 = 0
+    jie x0 0 @done
+    x2 = sub x0 1
+    x3 = down x2
+    x1 = x3
+    @done
+    ret x1
+""", [
+        '{ ELabel: @tail0 }',
+        '{ ECopy: { TVar: x1 8 } = { TInt: 0 } }',
+        '{ ECoJump: jie { TVar: x0 8 } { TInt: 0 } @done }',
+        '{ EBinOp: { TVar: x2 8 } = sub { TVar: x0 8 } { TInt: 1 } }',
+        '{ ECopy: { TVar: x0 8 } = { TVar: x2 8 } }',
+        '{ EJump: jump @tail0 }',
+        '{ ELabel: @done }',
+        '{ TVar: x1 8 }'
+    ]]
+]
+
+def runLoopingTests():
+    for s in loopingTestSets:
+        pro = tails.getTailCallsLoopedPro(hlp.getSourcePro(s[0]))
+        if not hlp.areValuesEqual(hlp.getProLines(pro), s[1]):
+            return False
+
+    # a procedure whose only call became a loop is a leaf
+    pro = tails.getTailCallsLoopedPro(hlp.getSourcePro(loopingTestSets[0][0]))
+    return hlp.areValuesEqual(pro.isLeaf, True)
+
+#
+# unchanged tests
+#
+
+unchangedTestSets = [
+    # the result is used after the call
+    """
+pro fact x0
+    x1 = 1
+    jile x0 1 @done
+    x2 = sub x0 1
+    x1 = fact x2
+    x1 = mul x1 x0
+    @done
+    ret x1
+""",
+    # another variable is returned
+    """
+pro drop x0
+    jie x0 0 @done
+    x1 = sub x0 1
+    x2 = drop x1
+    @done
+    ret x0
+""",
+    # a call to another procedure is left to the code generator
+    """
+pro other x0
+    x1 = gcd x0 x0
+    ret x1
+"""
+]
+
+def runUnchangedTests():
+    for source in unchangedTestSets:
+        pro = hlp.getSourcePro(source)
+        if tails.getTailCallsLoopedPro(pro) is not pro:
+            print('test failed\n')
+            print('procedure without a tail call to itself must be left unchanged:')
+            print(source)
+            return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runLoopingTests()
+    allPass = allPass and runUnchangedTests()
+
+    if allPass:
+        print('all tail call tests passed')
+    else:
+        print('at least one tail call test failed')
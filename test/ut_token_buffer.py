@@ -0,0 +1,131 @@
+import lib.lexer as lex
+import lib.parser as par
+import lib.token_buffer as tb
+import test.ut_component_vars as vars
+
+#
+# test helpers
+#
+
+def printAllTokens(tokens):
+    for t in tokens:
+        print(t.toString())
+
+def areTokenListsEqual(generated, expected):
+    generatedStrings = [t.toString() for t in generated]
+    expectedStrings = [t.toString() for t in expected]
+
+    if generatedStrings == expectedStrings:
+        return True
+
+    print('test failed\n')
+    print('generated:')
+    printAllTokens(generated)
+    print('\nexpected:')
+    printAllTokens(expected)
+    print('')
+    return False
+
+#
+# symbol table tests
+#
+
+def runSymbolTableTests():
+    symbols = tb.SymbolTable()
+    first = symbols.getId('x0')
+    second = symbols.getId('fib')
+
+    if first == tb.NO_SYMBOL or second == tb.NO_SYMBOL:
+        print('symbol ids must not be the empty id')
+        return False
+
+    if symbols.getId('x0') != first or first == second:
+        print('symbol ids must be unique per name')
+        return False
+
+    if symbols.getName(second) != 'fib' or len(symbols) != 2:
+        print('symbol table returned the wrong names')
+        return False
+
+    return True
+
+#
+# buffer tests
+#
+
+bufferTestSources = [
+    vars.SOURCE_0,
+    vars.SOURCE_1,
+    vars.SOURCE_2,
+    vars.SOURCE_3,
+    'mem text {"a b" "c"}\r\nmem hex {0x1F -2 \'a\'}\r\n'
+]
+
+def runBufferTests():
+    for source in bufferTestSources:
+        buffer = tb.getTokenBuffer(source)
+        expected = lex.getTokens(source)
+
+        if (not areTokenListsEqual(buffer.getTokens(), expected)):
+            return False
+
+    return True
+
+def runSharedSymbolTests():
+    buffer = tb.getTokenBuffer(vars.SOURCE_0)
+    names = [buffer.symbols.getName(buffer.ids[i]) for i in range(len(buffer)) if buffer.kinds[i] == lex.KIND_VAR]
+
+    if names != ['x0', 'x0', 'x0', 'x0', 'x0', 'x1', 'x0', 'x0', 'x0', 'x1', 'x0']:
+        print('variable tokens must refer to interned names')
+        print(names)
+        return False
+
+    if buffer.ids[3] != buffer.ids[5]:
+        print('equal names must share one symbol id')
+        return False
+
+    tokens = buffer.getTokens()
+    if tokens[3] is not tokens[5] or tokens[3] is tokens[1]:
+        print('tokens with equal names must be one shared object')
+        return False
+
+    return True
+
+def runBufferExpressionTests():
+    pairs = [
+        [vars.SOURCE_0, vars.EXPRESSIONS_0],
+        [vars.SOURCE_1, vars.EXPRESSIONS_1],
+        [vars.SOURCE_2, vars.EXPRESSIONS_2],
+        [vars.SOURCE_3, vars.EXPRESSIONS_3]
+    ]
+
+    for pair in pairs:
+        generated = par.getExpressions(tb.getTokenBuffer(pair[0]).getTokens())
+        expected = pair[1]
+
+        generatedStrings = [e.toString() for e in generated]
+        expectedStrings = [e.toString() for e in expected]
+
+        if generatedStrings != expectedStrings:
+            print('test failed\n')
+            print('\n'.join(generatedStrings))
+            print('\n'.join(expectedStrings))
+            return False
+
+    return True
+
+#
+# Run All Tests
+#
+
+def runAllTests():
+    allPass = True
+    allPass = allPass and runSymbolTableTests()
+    allPass = allPass and runBufferTests()
+    allPass = allPass and runSharedSymbolTests()
+    allPass = allPass and runBufferExpressionTests()
+
+    if allPass:
+        print('all token buffer tests passed')
+    else:
+        print('at least one token buffer test failed')